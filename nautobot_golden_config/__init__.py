@@ -35,6 +35,24 @@ class GoldenConfig(NautobotAppConfig):
         "per_feature_width": 13,
         "per_feature_height": 4,
         "get_custom_compliance": None,
+        "backup_precheck_connectivity": False,
+        "backup_precheck_timeout": 5,
+        "backup_precheck_max_concurrency": 512,
+        "git_stage_with_plumbing": False,
+        "git_push_max_workers": 4,
+        "checkpoint_push_interval": 500,
+        "git_partial_clone": False,
+        "git_remote_check_ttl": 30,
+        "dynamic_group_cache_ttl": 0,
+        "golden_config_sync_cache_ttl": 0,
+        "sot_agg_batch_size": 100,
+        "sot_agg_cache_ttl": 0,
+        "jinja_bytecode_cache_dir": None,
+        "intended_render_processes": 0,
+        "intended_direct_render": False,
+        "generate_intended_config_max_workers": 8,
+        "git_branch_cache_dir": None,
+        "git_branch_cache_max_size": 1024,
         # This is an experimental and undocumented setting that will change in the future!!
         # Use at your own risk!!!!!
         "_manual_dynamic_group_mgmt": False,
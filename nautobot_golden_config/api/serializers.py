@@ -142,6 +142,25 @@ class GenerateIntendedConfigSerializer(serializers.Serializer):  # pylint: disab
     diff_lines = serializers.ListField(read_only=True, child=serializers.CharField())
 
 
+class GenerateIntendedConfigBatchRequestSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Serializer for the request of GenerateIntendedConfigBatchView."""
+
+    device_ids = serializers.ListField(required=False, child=serializers.UUIDField())
+    filter = serializers.DictField(required=False, help_text="Device filter parameters, as for the Device list API.")
+    branch = serializers.CharField(required=False)
+    graphql_query_id = serializers.UUIDField(required=False)
+
+
+class GenerateIntendedConfigBatchSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Serializer for each line streamed by GenerateIntendedConfigBatchView."""
+
+    device_id = serializers.UUIDField(read_only=True)
+    device_name = serializers.CharField(read_only=True)
+    intended_config = serializers.CharField(read_only=True)
+    diff = serializers.CharField(read_only=True)
+    error = serializers.CharField(read_only=True)
+
+
 class GitRepositoryWithBranchesSerializer(GitRepositorySerializer):  # pylint: disable=nb-sub-class-name
     """Serializer for extras.GitRepository with remote branches field."""
 
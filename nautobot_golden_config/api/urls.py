@@ -28,6 +28,11 @@ urlpatterns = [
         views.GenerateIntendedConfigView.as_view(),
         name="generate_intended_config",
     ),
+    path(
+        "generate-intended-config-batch/",
+        views.GenerateIntendedConfigBatchView.as_view(),
+        name="generate_intended_config_batch",
+    ),
     path(
         "git-repository-branches/<pk>/",
         views.GitRepositoryBranchesView.as_view(),
@@ -2,11 +2,16 @@
 
 import datetime
 import difflib
+import json
 import logging
+from collections import Counter
+from contextlib import ExitStack
 from pathlib import Path
 
 from django.conf import settings as nautobot_settings
 from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.http import QueryDict, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import make_aware
 from drf_spectacular.types import OpenApiTypes
@@ -21,6 +26,7 @@ from nautobot.apps.api import (
 )
 from nautobot.apps.utils import render_jinja2
 from nautobot.core.api.views import NautobotAPIVersionMixin  # core-import-update
+from nautobot.dcim.filters import DeviceFilterSet
 from nautobot.dcim.models import Device
 from nautobot.extras.datasources.git import ensure_git_repository  # core-import-update
 from nautobot.extras.models import GitRepository, GraphQLQuery
@@ -38,8 +44,17 @@ from rest_framework.viewsets import GenericViewSet
 
 from nautobot_golden_config import filters, models
 from nautobot_golden_config.api import serializers
-from nautobot_golden_config.utilities.graphql import graph_ql_query
-from nautobot_golden_config.utilities.helper import dispatch_params, get_django_env
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.direct_render import can_render_directly, get_render_host, render_intended_config
+from nautobot_golden_config.utilities.git import branch_checkout_context
+from nautobot_golden_config.utilities.graphql import SotAggBatch, graph_ql_query
+from nautobot_golden_config.utilities.helper import (
+    DispatchParamsTable,
+    dispatch_params,
+    get_device_to_settings_map,
+    get_django_env,
+    get_inventory_queryset,
+)
 
 
 class SOTAggDeviceDetailView(NautobotAPIVersionMixin, GenericAPIView):
@@ -342,11 +357,11 @@ class GenerateIntendedConfigView(NautobotAPIVersionMixin, GenericAPIView):
         if status_code == status.HTTP_200_OK:
             try:
                 if branch_param:
-                    with git_repository.clone_to_directory_context(branch=branch_param, depth=1) as git_repo_path:
+                    with branch_checkout_context(git_repository, branch_param) as git_repo_path:
                         filesystem_path = self._get_jinja_template_path(
                             settings, device, git_repository, base_path=git_repo_path
                         )
-                        intended_config = self._render_config_nornir_serial(
+                        intended_config = self._render_config(
                             device=device,
                             jinja_template=str(filesystem_path.relative_to(git_repo_path)),
                             jinja_root_path=git_repo_path,
@@ -354,7 +369,7 @@ class GenerateIntendedConfigView(NautobotAPIVersionMixin, GenericAPIView):
                         )
                 else:
                     filesystem_path = self._get_jinja_template_path(settings, device, git_repository)
-                    intended_config = self._render_config_nornir_serial(
+                    intended_config = self._render_config(
                         device=device,
                         jinja_template=str(filesystem_path.relative_to(git_repository.filesystem_path)),
                         jinja_root_path=git_repository.filesystem_path,
@@ -378,6 +393,15 @@ class GenerateIntendedConfigView(NautobotAPIVersionMixin, GenericAPIView):
 
         raise GenerateIntendedConfigException("Unable to generate the intended config for this device")
 
+    def _render_config(self, device, jinja_template, jinja_root_path, graphql_data):
+        """Render the Jinja template for the device, without Nornir when the `intended_direct_render` setting allows it."""
+        if not can_render_directly(device):
+            return self._render_config_nornir_serial(device, jinja_template, jinja_root_path, graphql_data)
+        host = get_render_host(device, make_aware(datetime.datetime.now()), graphql_data)
+        return render_intended_config(
+            host, logging.getLogger(dispatcher.__module__), get_django_env(), jinja_root_path, jinja_template
+        )
+
     def _render_config_nornir_serial(self, device, jinja_template, jinja_root_path, graphql_data):
         """Render the Jinja template for the device using Nornir serial runner.
 
@@ -392,7 +416,7 @@ class GenerateIntendedConfigView(NautobotAPIVersionMixin, GenericAPIView):
                 "options": {
                     "credentials_class": NORNIR_SETTINGS.get("credentials"),
                     "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": Device.objects.filter(pk=device.pk),
+                    "queryset": get_inventory_queryset(Device.objects.filter(pk=device.pk)),
                     "defaults": {"now": make_aware(datetime.datetime.now())},
                 },
             },
@@ -425,6 +449,249 @@ class GenerateIntendedConfigView(NautobotAPIVersionMixin, GenericAPIView):
                 return results[device.name][1][1][0].result["config"]
 
 
+def _nornir_task_inject_batch_graphql_data(  # pylint: disable=too-many-arguments
+    task, graphql_data, jinja_template, jinja_root_path, dispatch_params_table, **kwargs
+):
+    """Run `_nornir_task_inject_graphql_data` with the GraphQL data, template and dispatcher of the host's device."""
+    device = task.host.data["obj"]
+    try:
+        _nornir_task_inject_graphql_data(
+            task,
+            graphql_data[device.pk],
+            obj=device,
+            logger=logging.getLogger(dispatcher.__module__),
+            jinja_template=jinja_template[device.pk],
+            jinja_root_path=jinja_root_path[device.pk],
+            output_file_location="/dev/null",
+            **kwargs,
+            **dispatch_params_table.get(
+                "generate_config", device.platform.network_driver, logging.getLogger(dispatch_params.__module__)
+            ),
+        )
+    finally:
+        # The hosts are always rendered by threads here, whatever the runner of the Nornir settings.
+        connections.close_all()
+
+
+class GenerateIntendedConfigBatchView(GenerateIntendedConfigView):
+    """API view for generating the intended config of many Devices, streaming the result of each of them."""
+
+    name = "Generate Intended Config for Devices"
+    serializer_class = serializers.GenerateIntendedConfigBatchSerializer
+    http_method_names = ["post", "options"]
+
+    def _get_devices(self, request, data):
+        """Get the requested devices, from a list of ids and/or a Device filter, restricted to requesting user."""
+        device_ids = data.get("device_ids")
+        device_filter = data.get("filter")
+        if not device_ids and not device_filter:
+            raise GenerateIntendedConfigException("Parameter device_ids or filter is required")
+        queryset = Device.objects.restrict(request.user, "view")
+        if device_ids:
+            queryset = queryset.filter(pk__in=device_ids)
+        if device_filter:
+            filter_data = QueryDict(mutable=True)
+            for key, value in device_filter.items():
+                filter_data.setlist(key, value if isinstance(value, list) else [value])
+            filterset = DeviceFilterSet(data=filter_data, queryset=queryset)
+            if not filterset.is_valid():
+                raise GenerateIntendedConfigException(f"Invalid filter: {filterset.errors}")
+            queryset = filterset.qs
+        queryset = queryset.select_related("platform", "goldenconfig")
+        if not queryset.exists():
+            raise GenerateIntendedConfigException("No devices found")
+        return queryset
+
+    @extend_schema(request=serializers.GenerateIntendedConfigBatchRequestSerializer)
+    def post(self, request, *args, **kwargs):
+        """Generate intended configuration for many Devices.
+
+        The result of each device is streamed as a line of JSON as soon as its config is rendered.
+        """
+        request_serializer = serializers.GenerateIntendedConfigBatchRequestSerializer(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+        data = request_serializer.validated_data
+        branch = data.get("branch")
+        if branch and version.parse(nautobot_settings.VERSION) < version.parse("2.4.2"):
+            raise GenerateIntendedConfigException("Branch support requires Nautobot v2.4.2 or later")
+        graphql_query = None
+        graphql_query_id = data.get("graphql_query_id")
+        if graphql_query_id:
+            try:
+                graphql_query = GraphQLQuery.objects.get(pk=graphql_query_id)
+            except GraphQLQuery.DoesNotExist as exc:
+                raise GenerateIntendedConfigException(f"GraphQLQuery with id '{graphql_query_id}' not found") from exc
+            if "device_id" not in graphql_query.variables:
+                raise GenerateIntendedConfigException("The selected GraphQL query is missing a 'device_id' variable")
+
+        devices = list(self._get_devices(request, data))
+        errors = self._get_inventory_errors(devices)
+        device_to_settings_map = get_device_to_settings_map(Device.objects.filter(pk__in=[d.pk for d in devices]))
+        # The setup shared by all the devices, each Jinja repository is synchronized once.
+        for git_repository in {
+            settings.jinja_repository for settings in device_to_settings_map.values() if settings.jinja_repository
+        }:
+            try:
+                ensure_git_repository(git_repository)
+            except Exception as exc:
+                raise GenerateIntendedConfigException(f"Error trying to sync git repository {git_repository}") from exc
+
+        return StreamingHttpResponse(
+            self._stream_results(request, devices, device_to_settings_map, graphql_query, branch, errors),
+            content_type="application/x-ndjson",
+        )
+
+    @staticmethod
+    def _get_inventory_errors(devices):
+        """Return the error of each device that can not be part of the Nornir inventory, before the stream starts.
+
+        The Nornir hosts are named after the devices, so the devices without a name, or with the same name as another
+        requested device, are rejected along with the devices the inventory can not be built with.
+        """
+        name_counts = Counter(device.name for device in devices)
+        errors = {}
+        for device in devices:
+            if not device.name:
+                errors[device.pk] = "The device has no name"
+            elif name_counts[device.name] > 1:
+                errors[device.pk] = f"Another requested device is also named {device.name}, request them separately"
+            elif device.platform is None:
+                errors[device.pk] = "The device has no platform"
+            elif not device.platform.network_driver:
+                errors[device.pk] = f"The platform {device.platform.name} has no network driver"
+        return errors
+
+    def _get_device_query(self, settings, graphql_query):
+        """Return the GraphQL query of a device, raising an error when none is usable."""
+        if not settings:
+            raise GenerateIntendedConfigException("No Golden Config settings found for this device")
+        if not settings.jinja_repository:
+            raise GenerateIntendedConfigException("Golden Config settings jinja_repository not set")
+        if graphql_query is None:
+            if settings.sot_agg_query is None:
+                raise GenerateIntendedConfigException("Golden Config settings sot_agg_query not set")
+            graphql_query = settings.sot_agg_query
+            if "device_id" not in graphql_query.variables:
+                raise GenerateIntendedConfigException("The selected GraphQL query is missing a 'device_id' variable")
+        return graphql_query.query
+
+    def _stream_results(  # pylint: disable=too-many-arguments,too-many-locals,too-many-positional-arguments
+        self, request, devices, device_to_settings_map, graphql_query, branch, errors
+    ):
+        """Render the devices in chunks with bounded concurrency, yielding the result of each device as a JSON line."""
+        max_workers = PLUGIN_CFG["generate_intended_config_max_workers"]
+        device_queries = {}
+        for device in devices:
+            if device.pk in errors:
+                continue
+            try:
+                device_queries[device.pk] = self._get_device_query(device_to_settings_map.get(device.pk), graphql_query)
+            except GenerateIntendedConfigException as exc:
+                errors[device.pk] = str(exc.detail)
+        sot_agg = SotAggBatch(request, device_queries, PLUGIN_CFG["sot_agg_batch_size"])
+        jinja_env = get_django_env()
+        dispatch_params_table = DispatchParamsTable(
+            ["generate_config"], [device.platform.network_driver for device in devices if device.platform]
+        )
+
+        with ExitStack() as stack:
+            # The branch of each Jinja repository is cloned once, for the whole stream.
+            base_paths = {}
+            for device in devices:
+                settings = device_to_settings_map.get(device.pk)
+                git_repository = settings.jinja_repository if settings else None
+                if git_repository is None or git_repository.pk in base_paths:
+                    continue
+                base_paths[git_repository.pk] = git_repository.filesystem_path
+                if branch:
+                    try:
+                        base_paths[git_repository.pk] = stack.enter_context(
+                            branch_checkout_context(git_repository, branch)
+                        )
+                    except Exception as exc:  # pylint: disable=broad-exception-caught
+                        base_paths[git_repository.pk] = None
+                        for device_id, settings in device_to_settings_map.items():
+                            if settings.jinja_repository == git_repository:
+                                errors.setdefault(device_id, f"Error cloning branch {branch}: {exc}")
+
+            try:
+                nornir_obj = InitNornir(
+                    runner={"plugin": "threaded", "options": {"num_workers": max_workers}},
+                    logging={"enabled": False},
+                    inventory={
+                        "plugin": "nautobot-inventory",
+                        "options": {
+                            "credentials_class": NORNIR_SETTINGS.get("credentials"),
+                            "params": NORNIR_SETTINGS.get("inventory_params"),
+                            "queryset": get_inventory_queryset(Device.objects.filter(pk__in=device_queries.keys())),
+                            "defaults": {"now": make_aware(datetime.datetime.now())},
+                        },
+                    },
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # The stream has started, so every device still gets its line.
+                for device in devices:
+                    errors.setdefault(device.pk, f"Error building the Nornir inventory: {exc}")
+                    yield json.dumps(self._get_device_result(device, {}, errors)) + "\n"
+                return
+            with nornir_obj:
+                for index in range(0, len(devices), max_workers):
+                    chunk = devices[index : index + max_workers]
+                    graphql_data, jinja_template, jinja_root_path = {}, {}, {}
+                    for device in chunk:
+                        if device.pk in errors:
+                            continue
+                        settings = device_to_settings_map[device.pk]
+                        status_code, data = sot_agg.get(device, device_queries[device.pk])
+                        if status_code != status.HTTP_200_OK:
+                            errors[device.pk] = f"Unable to generate the GraphQL data for this device: {data}"
+                            continue
+                        base_path = base_paths[settings.jinja_repository.pk]
+                        try:
+                            filesystem_path = self._get_jinja_template_path(
+                                settings, device, settings.jinja_repository, base_path=base_path
+                            )
+                        except GenerateIntendedConfigException as exc:
+                            errors[device.pk] = str(exc.detail)
+                            continue
+                        graphql_data[device.pk] = data
+                        jinja_template[device.pk] = str(filesystem_path.relative_to(base_path))
+                        jinja_root_path[device.pk] = base_path
+
+                    results = {}
+                    if graphql_data:
+                        results = nornir_obj.filter(
+                            filter_func=lambda host, device_ids=graphql_data.keys(): host.data["obj"].pk in device_ids
+                        ).run(
+                            task=_nornir_task_inject_batch_graphql_data,
+                            name="REST API GENERATE CONFIG",
+                            graphql_data=graphql_data,
+                            jinja_template=jinja_template,
+                            jinja_root_path=jinja_root_path,
+                            dispatch_params_table=dispatch_params_table,
+                            jinja_filters=jinja_env.filters,
+                            jinja_env=jinja_env,
+                        )
+                    for device in chunk:
+                        yield json.dumps(self._get_device_result(device, results, errors)) + "\n"
+
+    def _get_device_result(self, device, results, errors):
+        """Return the result of a device of the stream."""
+        result = {"device_id": str(device.pk), "device_name": device.name}
+        if device.pk in errors:
+            return {**result, "error": errors[device.pk]}
+        host_result = results[device.name]
+        if host_result.failed:
+            return {**result, "error": f"Error rendering Jinja template: {host_result.exception or host_result.result}"}
+        intended_config = host_result[1][1][0].result["config"]
+        diff = self._get_diff(device, intended_config)
+        return {
+            **result,
+            "intended_config": intended_config,
+            "diff": diff,
+        }
+
+
 @extend_schema(exclude=True)
 class GitRepositoryBranchesView(NautobotAPIVersionMixin, RetrieveAPIView):
     """API view for extras.GitRepository with branches."""
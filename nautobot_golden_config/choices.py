@@ -43,3 +43,17 @@ class ConfigPlanTypeChoice(ChoiceSet):
         (TYPE_REMEDIATION, "Remediation"),
         (TYPE_MANUAL, "Manual"),
     )
+
+
+class GoldenConfigJobStageChoice(ChoiceSet):
+    """Choiceset used by GoldenConfigJobCheckpoint."""
+
+    STAGE_BACKUP = "backup"
+    STAGE_INTENDED = "intended"
+    STAGE_COMPLIANCE = "compliance"
+
+    CHOICES = (
+        (STAGE_BACKUP, "Backup"),
+        (STAGE_INTENDED, "Intended"),
+        (STAGE_COMPLIANCE, "Compliance"),
+    )
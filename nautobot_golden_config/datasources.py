@@ -17,11 +17,13 @@ from nautobot_golden_config.models import (
     RemediationSetting,
 )
 from nautobot_golden_config.utilities.constant import ENABLE_BACKUP, ENABLE_COMPLIANCE, ENABLE_INTENDED
-from nautobot_golden_config.utilities.helper import get_error_message
+from nautobot_golden_config.utilities.helper import JINJA_BYTECODE_CACHE, get_error_message
 
 
 def refresh_git_jinja(repository_record, job_result, delete=False):  # pylint: disable=unused-argument
     """Callback for gitrepository updates on Jinja Template repo."""
+    # The templates changed by the sync no longer match their compiled code, drop it instead of keeping it around.
+    JINJA_BYTECODE_CACHE.clear()
     job_result.log(
         "Successfully Pulled git repo",
         level_choice=LogLevelChoices.LOG_DEBUG,
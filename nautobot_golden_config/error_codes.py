@@ -23,4 +23,22 @@ ERROR_CODES = {
         error_message="Reference to {yaml_attr_name}: {yaml_attr_value} is not available.",
         recommendation="Check the YAML file for misspellings or incorrect values, if using `platform_slug` or `platform_network_driver`, then migrate to `platform_name` key instead.",
     ),
+    "E3034": ErrorCode(
+        troubleshooting="Verify the device is powered on, that its primary IP or FQDN is correct and that the management port is reachable from the Nautobot worker.",
+        description="The connectivity pre-check run before a Backup Job could not open a TCP connection to the device management port.",
+        error_message="Device is not reachable on {hostname}:{port}, the connectivity pre-check failed and the backup was skipped.",
+        recommendation="Fix the reachability of the device or set the `tcp_port` custom field or config context if the device does not listen on port 22.",
+    ),
+    "E3035": ErrorCode(
+        troubleshooting="Find the original error message in the Job Result logs, it usually points to an authentication, network or conflict issue with the remote Git repository.",
+        description="The results of a Golden Config Job could not be committed or pushed to one of the Git repositories, the other repositories were still pushed.",
+        error_message="Failed to commit and push to the Git repository {repository}, original error message ```{error}```",
+        recommendation="Fix the issue with the Git repository and run the Job again, the Git repository can also be synchronized manually.",
+    ),
+    "E3036": ErrorCode(
+        troubleshooting="Find the original error message in the Job Result logs, it usually points to an error in the Jinja templates, or to a render process that could not set up Nautobot.",
+        description="The intended configuration of a device could not be rendered by the render processes of the `intended_render_processes` setting.",
+        error_message="Failed to render the template {template} in a render process, original error message ```{error}```",
+        recommendation="Fix the template, or make the `NAUTOBOT_CONFIG` environment variable of the worker point to the Nautobot configuration, then run the Job again.",
+    ),
 }
@@ -29,5 +29,9 @@ class ComplianceFailure(GoldenConfigError):
     """Custom error for when there's a failure in Compliance Job."""
 
 
+class RepositoryPushFailure(GoldenConfigError):
+    """Custom error for when there's a failure committing or pushing to a Golden Config repository."""
+
+
 class ConfigPlanDeploymentFailure(GoldenConfigError):
     """Custom error for when there's a failure in Config Plan Deployment Job."""
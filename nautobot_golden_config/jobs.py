@@ -4,8 +4,12 @@
 # TODO: Remove the following ignore, added to be able to pass pylint in CI.
 # pylint: disable=arguments-differ
 
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
 
+from django.db import connection
 from django.utils.timezone import make_aware
 from nautobot.apps.jobs import (
     BooleanVar,
@@ -23,29 +27,38 @@ from nautobot.extras.datasources.git import (  # core-import-update
     ensure_git_repository,
     get_repo_from_url_to_path_and_from_branch,
 )
-from nautobot.extras.models import DynamicGroup, Role, Status, Tag
+from nautobot.extras.models import Role, Status, Tag
 from nautobot.tenancy.models import Tenant, TenantGroup
 from nautobot_plugin_nornir.plugins.inventory.nautobot_orm import NautobotORMInventory
 from nornir.core.plugins.inventory import InventoryPluginRegister
 from nornir_nautobot.exceptions import NornirNautobotException
 
 from nautobot_golden_config.choices import ConfigPlanTypeChoice
-from nautobot_golden_config.exceptions import BackupFailure, ComplianceFailure, IntendedGenerationFailure
+from nautobot_golden_config.exceptions import (
+    BackupFailure,
+    ComplianceFailure,
+    IntendedGenerationFailure,
+    RepositoryPushFailure,
+)
 from nautobot_golden_config.models import ComplianceFeature, ConfigPlan, GoldenConfig
 from nautobot_golden_config.nornir_plays.config_backup import config_backup
 from nautobot_golden_config.nornir_plays.config_compliance import config_compliance
 from nautobot_golden_config.nornir_plays.config_deployment import config_deployment
 from nautobot_golden_config.nornir_plays.config_intended import config_intended
 from nautobot_golden_config.utilities import constant
+from nautobot_golden_config.utilities.checkpoint import record_pushed_checkpoints, resume_checkpoints
 from nautobot_golden_config.utilities.config_plan import (
     config_plan_default_status,
     generate_config_set_from_compliance_feature,
     generate_config_set_from_manual,
 )
-from nautobot_golden_config.utilities.git import GitRepo
+from nautobot_golden_config.utilities.git import GitRepo, is_repository_up_to_date, prepare_sparse_repository
 from nautobot_golden_config.utilities.helper import (
     get_device_to_settings_map,
+    get_error_message,
     get_job_filter,
+    get_repository_sparse_paths,
+    set_golden_config_in_sync,
     update_dynamic_groups_cache,
 )
 
@@ -53,6 +66,9 @@ InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 
 name = "Golden Configuration"  # pylint: disable=invalid-name
 
+# Seconds between the checks of the number of pending checkpoints of a running job.
+CHECKPOINT_PUSH_POLL_INTERVAL = 5
+
 
 def get_repo_types_for_job(job):
     """Logic to determine which repo_types are needed based on job + plugin settings."""
@@ -72,19 +88,33 @@ def get_repo_types_for_job(job):
 
 def get_refreshed_repos(job_obj, repo_types, data=None):
     """Small wrapper to pull latest branch, and return a GitRepo app specific object."""
-    dynamic_groups = DynamicGroup.objects.exclude(golden_config_setting__isnull=True)
-    repository_records = set()
-    for group in dynamic_groups:
-        # Make sure the data(device qs) device exist in the dg first.
-        if data.filter(group.generate_query()).exists():
-            for repo_type in repo_types:
-                repo = getattr(group.golden_config_setting, repo_type, None)
-                if repo:
-                    repository_records.add(repo)
+    repository_records = {}
+    # The settings of the in-scope devices are already known, no need to query the dynamic groups again.
+    for settings in set(job_obj.device_to_settings_map.values()):
+        for repo_type in repo_types:
+            repo = getattr(settings, repo_type, None)
+            if repo:
+                repository_records.setdefault(repo, set()).add(repo_type)
 
     repositories = {}
-    for repository_record in repository_records:
-        ensure_git_repository(repository_record, job_obj.logger)
+    for repository_record, repository_types in repository_records.items():
+        # Jinja repositories are always fully checked out, as the templates can include any other file.
+        if constant.PLUGIN_CFG["git_partial_clone"] and "jinja_repository" not in repository_types:
+            job_obj.logger.debug(
+                f"Preparing the sparse checkout of repository {repository_record.name}.",
+                extra={"grouping": "GC Repo Syncs", "object": repository_record},
+            )
+            prepare_sparse_repository(
+                repository_record,
+                get_repository_sparse_paths(repository_record, data, job_obj.device_to_settings_map, job_obj.logger),
+            )
+        if is_repository_up_to_date(repository_record):
+            job_obj.logger.debug(
+                f"Repository {repository_record.name} is already at the tip of its remote branch, skipping the sync.",
+                extra={"grouping": "GC Repo Syncs", "object": repository_record},
+            )
+        else:
+            ensure_git_repository(repository_record, job_obj.logger)
         # TODO: Should this not point to non-nautobot.core import
         # We should ask in nautobot core for the `from_url` constructor to be it's own function
         git_info = get_repo_from_url_to_path_and_from_branch(repository_record)
@@ -124,6 +154,18 @@ def gc_repo_prep(job, data):
     job.logger.debug("Compiling device data for GC job.", extra={"grouping": "Get Job Filter"})
     job.qs = get_job_filter(data)
     job.logger.debug(f"In scope device count for this job: {job.qs.count()}", extra={"grouping": "Get Job Filter"})
+    if data.get("resume"):
+        job.resumed_from, carried_over = resume_checkpoints(job.job_result, job.qs)
+        if job.resumed_from is None:
+            job.logger.warning(
+                "No previous run of this job to resume from, all devices will be processed.",
+                extra={"grouping": "Resume"},
+            )
+        else:
+            job.logger.info(
+                f"Resuming from {job.resumed_from}, {carried_over} completed device stage(s) will be skipped.",
+                extra={"grouping": "Resume", "object": job.resumed_from},
+            )
     job.logger.debug("Mapping device(s) to GC Settings.", extra={"grouping": "Device to Settings Map"})
     job.device_to_settings_map = get_device_to_settings_map(queryset=job.qs)
     gitrepo_types = get_repo_types_for_job(job)
@@ -135,36 +177,156 @@ def gc_repo_prep(job, data):
     return current_repos
 
 
+def _commit_and_push(git_repo, commit_message, paths):
+    """Commit the work of the job to a git repo and push it, run in a worker thread of `gc_repo_push`."""
+    git_repo.commit_with_added(
+        commit_message,
+        paths=paths,
+        use_plumbing=constant.PLUGIN_CFG["git_stage_with_plumbing"],
+    )
+    git_repo.push()
+    return git_repo.head
+
+
+def push_checkpoints(job, current_repos, commit_message):
+    """Commit and push the files of the pending checkpoints of a running job, then record the checkpoints.
+
+    The files written meanwhile by the Nornir threads are left to the next push. As the Nornir threads still write to
+    the working trees, a push rejected by a newer remote tip is not rebased: it is only logged, and the checkpoints
+    of the repo are kept pending for the push at the end of the job.
+
+    Args:
+        job (Job): Nautobot Job with logger and other attributes.
+        current_repos (List[GitRepo]): List of GitRepos to be used with Job(s).
+        commit_message (str): The message of the commits.
+    """
+    paths = set(job.pending_checkpoints.copy())
+    pushed_directories = []
+    for repo in current_repos.values():
+        git_repo = repo["repo_obj"]
+        if not repo["to_commit"]:
+            pushed_directories.append(git_repo.nautobot_repo_obj.filesystem_path)
+            continue
+        try:
+            git_repo.commit_with_added(
+                commit_message,
+                paths=paths,
+                use_plumbing=constant.PLUGIN_CFG["git_stage_with_plumbing"],
+            )
+            git_repo.push(max_retries=1)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            job.logger.warning(
+                get_error_message("E3035", repository=git_repo.nautobot_repo_obj.name, error=error),
+                extra={"grouping": "GC Repo Checkpoint Push", "object": git_repo.nautobot_repo_obj},
+            )
+            continue
+        pushed_directories.append(git_repo.nautobot_repo_obj.filesystem_path)
+    recorded = record_pushed_checkpoints(job.job_result, job.pending_checkpoints, pushed_directories)
+    job.logger.debug(f"Pushed and recorded {recorded} checkpoint(s).", extra={"grouping": "GC Repo Checkpoint Push"})
+
+
+@contextmanager
+def periodic_checkpoint_push(job, current_repos, commit_message=""):
+    """Push the files of the pending checkpoints of the job every `checkpoint_push_interval` devices while it runs.
+
+    The backup and intended files are otherwise only pushed at the end of the job, so an interrupted run would lose
+    them and a resumed run would process every device again.
+
+    Args:
+        job (Job): Nautobot Job with logger and other attributes.
+        current_repos (List[GitRepo]): List of GitRepos to be used with Job(s).
+        commit_message (str): The message of the commits, defaults to the name of the job and the time.
+    """
+    interval = constant.PLUGIN_CFG["checkpoint_push_interval"]
+    if not interval or not current_repos:
+        yield
+        return
+    if not commit_message:
+        commit_message = f"{job.Meta.name.upper()} JOB {make_aware(datetime.now())}"
+    stop = threading.Event()
+
+    def push_loop():
+        try:
+            while not stop.wait(CHECKPOINT_PUSH_POLL_INTERVAL):
+                if len(job.pending_checkpoints) >= interval:
+                    push_checkpoints(job, current_repos, commit_message)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=push_loop, name="gc-checkpoint-push", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
 def gc_repo_push(job, current_repos, commit_message=""):
     """Push any work from worker to git repos in Job.
 
+    The repos are committed and pushed concurrently, a failure on one repo does not prevent the others to be pushed.
+    The pending checkpoints of the job are then recorded for the files of the repos that were pushed, and of the repos
+    the job does not commit to.
+
     Args:
         job (Job): Nautobot Job with logger and other attributes.
         current_repos (List[GitRepo]): List of GitRepos to be used with Job(s).
+
+    Raises:
+        RepositoryPushFailure: If the work could not be committed or pushed to any of the repos.
     """
     now = make_aware(datetime.now())
     job.logger.debug(
         f"Finished the {job.Meta.name} job execution.",
         extra={"grouping": "GC After Run"},
     )
-    if current_repos:
-        for _, repo in current_repos.items():
-            if repo["to_commit"]:
-                job.logger.debug(
-                    f"Pushing {job.Meta.name} results to repo {repo['repo_obj'].base_url}.",
-                    extra={"grouping": "GC Repo Commit and Push"},
-                )
-                if not commit_message:
-                    commit_message = f"{job.Meta.name.upper()} JOB {now}"
-                repo["repo_obj"].commit_with_added(commit_message)
-                repo["repo_obj"].push()
-                job.logger.info(
-                    f'{repo["repo_obj"].nautobot_repo_obj.name}: the new Git repository hash is "{repo["repo_obj"].head}"',
-                    extra={
-                        "grouping": "GC Repo Commit and Push",
-                        "object": repo["repo_obj"].nautobot_repo_obj,
-                    },
+    repos_to_commit = [repo["repo_obj"] for repo in (current_repos or {}).values() if repo["to_commit"]]
+    pushed_directories = [
+        repo["repo_obj"].nautobot_repo_obj.filesystem_path
+        for repo in (current_repos or {}).values()
+        if not repo["to_commit"]
+    ]
+    if not repos_to_commit:
+        record_pushed_checkpoints(job.job_result, job.pending_checkpoints, pushed_directories)
+        return
+    if not commit_message:
+        commit_message = f"{job.Meta.name.upper()} JOB {now}"
+
+    job.logger.debug(
+        f"Pushing {job.Meta.name} results to repo(s) {', '.join(git_repo.base_url for git_repo in repos_to_commit)}.",
+        extra={"grouping": "GC Repo Commit and Push"},
+    )
+    failed = False
+    max_workers = min(constant.PLUGIN_CFG["git_push_max_workers"], len(repos_to_commit))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_commit_and_push, git_repo, commit_message, job.written_files): git_repo
+            for git_repo in repos_to_commit
+        }
+        # Logging is kept in the main thread, as the job logger writes to the database.
+        for future in as_completed(futures):
+            git_repo = futures[future]
+            try:
+                head = future.result()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                failed = True
+                job.logger.error(
+                    get_error_message("E3035", repository=git_repo.nautobot_repo_obj.name, error=error),
+                    extra={"grouping": "GC Repo Push Failure", "object": git_repo.nautobot_repo_obj},
                 )
+                continue
+            pushed_directories.append(git_repo.nautobot_repo_obj.filesystem_path)
+            job.logger.info(
+                f'{git_repo.nautobot_repo_obj.name}: the new Git repository hash is "{head}"',
+                extra={
+                    "grouping": "GC Repo Commit and Push",
+                    "object": git_repo.nautobot_repo_obj,
+                },
+            )
+    record_pushed_checkpoints(job.job_result, job.pending_checkpoints, pushed_directories)
+    if failed:
+        raise RepositoryPushFailure()
 
 
 def gc_repos(func):
@@ -175,7 +337,8 @@ def gc_repos(func):
         current_repos = gc_repo_prep(job=self, data=kwargs)
         # This is where the specific jobs run method runs via this decorator.
         try:
-            func(self, *args, **kwargs)
+            with periodic_checkpoint_push(self, current_repos, kwargs.get("commit_message")):
+                func(self, *args, **kwargs)
         except Exception as error:  # pylint: disable=broad-exception-caught
             error_msg = f"`E3001:` General Exception handler, original error message ```{error}```"
             # Raise error only if the job kwarg (checkbox) is selected to do so on the job execution form.
@@ -224,12 +387,19 @@ class GoldenConfigJobMixin(Job):  # pylint: disable=abstract-method
         min_length=2,
         max_length=72,
     )
+    resume = BooleanVar(
+        description="Skip the devices and stages already completed by the most recent earlier run of this job."
+    )
 
     def __init__(self, *args, **kwargs):
         """Initialize the job."""
         super().__init__(*args, **kwargs)
         self.qs = None
         self.device_to_settings_map = {}
+        self.resumed_from = None
+        self.written_files = set()
+        self.pending_checkpoints = {}
+        self.render_changed_only = False
 
 
 class ComplianceJob(GoldenConfigJobMixin, FormEntry):
@@ -255,6 +425,10 @@ class ComplianceJob(GoldenConfigJobMixin, FormEntry):
 class IntendedJob(GoldenConfigJobMixin, FormEntry):
     """Job to to run generation of intended configurations."""
 
+    changed_only = BooleanVar(
+        description="Only render the devices whose data or templates changed since their last intended configuration."
+    )
+
     class Meta:
         """Meta object boilerplate for intended."""
 
@@ -269,6 +443,7 @@ class IntendedJob(GoldenConfigJobMixin, FormEntry):
         if not constant.ENABLE_INTENDED:
             self.logger.critical("Intended Generation is disabled in application settings.")
             raise ValueError("Intended Generation is disabled in application settings.")
+        self.render_changed_only = data.get("changed_only", False)
         config_intended(self)
 
 
@@ -600,7 +775,7 @@ class SyncGoldenConfigWithDynamicGroups(Job):
     def run(self):
         """Run GoldenConfig sync."""
         self.logger.debug("Updating Dynamic Group Cache.")
-        update_dynamic_groups_cache()
+        update_dynamic_groups_cache(force=True)
         self.logger.debug("Starting sync of GoldenConfig with DynamicGroup membership.")
         gc_dynamic_group_device_pks = GoldenConfig.get_dynamic_group_device_pks()
         gc_device_pks = GoldenConfig.get_golden_config_device_ids()
@@ -617,6 +792,7 @@ class SyncGoldenConfigWithDynamicGroups(Job):
         for device in devices_to_add_gc_entries:
             self.logger.debug(f"Adding GoldenConfig entry for device {device.name}")
             GoldenConfig.objects.create(device=device)
+        set_golden_config_in_sync()
 
 
 register_jobs(BackupJob)
@@ -19,6 +19,7 @@ from nautobot_golden_config.models import (
     ComplianceRule,
     ConfigCompliance,
 )
+from nautobot_golden_config.utilities.helper import update_compliance_matrix
 
 SAMPLE_FEATURES = [
     {"name": "NTP", "slug": "ntp"},
@@ -190,6 +191,8 @@ class Command(BaseCommand):
         if to_create:
             self._bulk_insert(to_create)
 
+        # The bulk inserts do not send the signals keeping the compliance matrix of the list view current.
+        update_compliance_matrix()
         total_created = ConfigCompliance.objects.count()
         self.stdout.write(
             self.style.SUCCESS(
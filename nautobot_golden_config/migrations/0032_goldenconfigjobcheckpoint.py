@@ -0,0 +1,50 @@
+# Generated by Django 5.2.13 on 2026-10-19 01:36
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dcim", "0049_remove_slugs_and_change_device_primary_ip_fields"),
+        ("extras", "0098_rename_data_jobresult_result"),
+        ("nautobot_golden_config", "0031_alter_configplan_change_control_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoldenConfigJobCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("stage", models.CharField(max_length=20)),
+                ("completed", models.DateTimeField(auto_now_add=True)),
+                (
+                    "device",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="golden_config_checkpoints",
+                        to="dcim.device",
+                    ),
+                ),
+                (
+                    "job_result",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="golden_config_checkpoints",
+                        to="extras.jobresult",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("job_result", "device", "stage"),
+                "unique_together": {("job_result", "device", "stage")},
+            },
+        ),
+    ]
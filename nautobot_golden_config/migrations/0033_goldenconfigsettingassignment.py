@@ -0,0 +1,46 @@
+# Generated by Django 5.2.13 on 2026-10-19 03:12
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dcim", "0049_remove_slugs_and_change_device_primary_ip_fields"),
+        ("nautobot_golden_config", "0032_goldenconfigjobcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoldenConfigSettingAssignment",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                (
+                    "device",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="golden_config_setting_assignment",
+                        to="dcim.device",
+                    ),
+                ),
+                (
+                    "golden_config_setting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="device_assignments",
+                        to="nautobot_golden_config.goldenconfigsetting",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("device",),
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.13 on 2026-10-19 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nautobot_golden_config", "0033_goldenconfigsettingassignment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goldenconfig",
+            name="intended_inputs_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Digest of the data and templates the intended config was last rendered from.",
+                max_length=64,
+            ),
+        ),
+    ]
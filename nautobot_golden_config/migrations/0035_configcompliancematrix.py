@@ -0,0 +1,70 @@
+# Generated by Django 5.2.13 on 2026-10-19 08:41
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_config_compliance_matrix(apps, schema_editor):
+    ConfigCompliance = apps.get_model("nautobot_golden_config", "ConfigCompliance")
+    ConfigComplianceMatrix = apps.get_model("nautobot_golden_config", "ConfigComplianceMatrix")
+
+    matrix = {}
+    for entry in (
+        ConfigCompliance.objects.values("device_id", "rule__feature__slug")
+        .order_by()
+        .annotate(compliance_int=models.Max("compliance_int"))
+        .iterator()
+    ):
+        features = matrix.setdefault(entry["device_id"], {})
+        if entry["compliance_int"] is not None:
+            features[entry["rule__feature__slug"]] = entry["compliance_int"]
+
+    ConfigComplianceMatrix.objects.bulk_create(
+        [ConfigComplianceMatrix(device_id=device_id, features=features) for device_id, features in matrix.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dcim", "0049_remove_slugs_and_change_device_primary_ip_fields"),
+        ("nautobot_golden_config", "0034_goldenconfig_intended_inputs_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConfigComplianceMatrix",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                (
+                    "features",
+                    models.JSONField(
+                        default=dict,
+                        help_text="The compliance_int of the ConfigCompliance entries of the device, per feature slug.",
+                    ),
+                ),
+                (
+                    "device",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="config_compliance_matrix",
+                        to="dcim.device",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("device",),
+            },
+        ),
+        migrations.RunPython(
+            code=populate_config_compliance_matrix,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
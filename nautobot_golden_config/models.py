@@ -11,7 +11,7 @@ from django.db.models.manager import BaseManager
 from django.utils.module_loading import import_string
 from hier_config import WorkflowRemediation, get_hconfig
 from hier_config.utils import hconfig_v2_os_v3_platform_mapper, load_hconfig_v2_options
-from nautobot.apps.models import RestrictedQuerySet, extras_features
+from nautobot.apps.models import BaseModel, RestrictedQuerySet, extras_features
 from nautobot.apps.utils import render_jinja2
 from nautobot.core.models.generics import PrimaryModel
 from nautobot.core.models.utils import serialize_object, serialize_object_v2
@@ -21,7 +21,12 @@ from nautobot.extras.models.statuses import StatusField
 from netutils.config.compliance import feature_compliance
 from xmldiff import actions, main
 
-from nautobot_golden_config.choices import ComplianceRuleConfigTypeChoice, ConfigPlanTypeChoice, RemediationTypeChoice
+from nautobot_golden_config.choices import (
+    ComplianceRuleConfigTypeChoice,
+    ConfigPlanTypeChoice,
+    GoldenConfigJobStageChoice,
+    RemediationTypeChoice,
+)
 from nautobot_golden_config.utilities.constant import ENABLE_SOTAGG, PLUGIN_CFG
 
 LOGGER = logging.getLogger(__name__)
@@ -489,6 +494,13 @@ class GoldenConfig(PrimaryModel):  # pylint: disable=too-many-ancestors
     intended_config = models.TextField(blank=True, help_text="Intended config for the device.")
     intended_last_attempt_date = models.DateTimeField(null=True, blank=True)
     intended_last_success_date = models.DateTimeField(null=True, blank=True)
+    intended_inputs_digest = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Digest of the data and templates the intended config was last rendered from.",
+    )
 
     compliance_config = models.TextField(blank=True, help_text="Full config diff for device.")
     compliance_last_attempt_date = models.DateTimeField(null=True, blank=True)
@@ -543,10 +555,7 @@ class GoldenConfigSettingManager(BaseManager.from_queryset(RestrictedQuerySet)):
         """Return the highest weighted GoldenConfigSetting assigned to a device."""
         if not isinstance(device, Device):
             raise ValueError("The device argument must be a Device instance.")
-        dynamic_group = device.dynamic_groups.exclude(golden_config_setting__isnull=True)
-        if dynamic_group.exists():
-            return dynamic_group.order_by("-golden_config_setting__weight").first().golden_config_setting
-        return None
+        return self.filter(device_assignments__device=device).first()
 
 
 @extras_features(
@@ -885,3 +894,81 @@ class ConfigPlan(PrimaryModel):  # pylint: disable=too-many-ancestors
     def __str__(self):
         """Return a simple string if model is called."""
         return f"{self.device.name}-{self.plan_type}-{self.created}"
+
+
+class GoldenConfigJobCheckpoint(BaseModel):
+    """Stage of a Golden Config job completed for a device, used to resume interrupted jobs."""
+
+    job_result = models.ForeignKey(
+        to="extras.JobResult",
+        on_delete=models.CASCADE,
+        related_name="golden_config_checkpoints",
+    )
+    device = models.ForeignKey(
+        to="dcim.Device",
+        on_delete=models.CASCADE,
+        related_name="golden_config_checkpoints",
+    )
+    stage = models.CharField(max_length=20, choices=GoldenConfigJobStageChoice)
+    completed = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Meta information for GoldenConfigJobCheckpoint model."""
+
+        ordering = ("job_result", "device", "stage")
+        unique_together = (
+            "job_result",
+            "device",
+            "stage",
+        )
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.device.name}-{self.stage}-{self.job_result_id}"
+
+
+class GoldenConfigSettingAssignment(BaseModel):
+    """Highest weighted GoldenConfigSetting of a device, maintained from the dynamic groups membership."""
+
+    device = models.OneToOneField(
+        to="dcim.Device",
+        on_delete=models.CASCADE,
+        related_name="golden_config_setting_assignment",
+    )
+    golden_config_setting = models.ForeignKey(
+        to="GoldenConfigSetting",
+        on_delete=models.CASCADE,
+        related_name="device_assignments",
+    )
+
+    class Meta:
+        """Meta information for GoldenConfigSettingAssignment model."""
+
+        ordering = ("device",)
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.device.name}-{self.golden_config_setting.name}"
+
+
+class ConfigComplianceMatrix(BaseModel):
+    """Compliance of each feature of a device, maintained from the ConfigCompliance entries for the list view."""
+
+    device = models.OneToOneField(
+        to="dcim.Device",
+        on_delete=models.CASCADE,
+        related_name="config_compliance_matrix",
+    )
+    features = models.JSONField(
+        default=dict,
+        help_text="The compliance_int of the ConfigCompliance entries of the device, per feature slug.",
+    )
+
+    class Meta:
+        """Meta information for ConfigComplianceMatrix model."""
+
+        ordering = ("device",)
+
+    def __str__(self):
+        """Return a simple string if model is called."""
+        return f"{self.device.name}"
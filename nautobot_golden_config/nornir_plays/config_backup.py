@@ -14,12 +14,19 @@ from nornir.core.task import Result, Task
 from nornir_nautobot.exceptions import NornirNautobotException
 from nornir_nautobot.plugins.tasks.dispatcher import dispatcher
 
+from nautobot_golden_config.choices import GoldenConfigJobStageChoice
 from nautobot_golden_config.exceptions import BackupFailure
-from nautobot_golden_config.models import ConfigRemove, ConfigReplace, GoldenConfig
+from nautobot_golden_config.models import ConfigRemove, ConfigReplace
 from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
+from nautobot_golden_config.utilities.checkpoint import defer_checkpoint, get_pending_queryset
+from nautobot_golden_config.utilities.connectivity import get_tcp_port, tcp_probe
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 from nautobot_golden_config.utilities.db_management import close_threaded_db_connections
 from nautobot_golden_config.utilities.helper import (
-    dispatch_params,
+    DispatchParamsTable,
+    get_error_message,
+    get_inventory_queryset,
+    provision_golden_configs,
     render_jinja_template,
     verify_settings,
 )
@@ -30,12 +37,24 @@ InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 
 @close_threaded_db_connections  # TODO: Is this still needed?
 def run_backup(  # pylint: disable=too-many-arguments
-    task: Task, logger: logging.Logger, device_to_settings_map, remove_regex_dict, replace_regex_dict
+    task: Task,
+    logger: logging.Logger,
+    device_to_settings_map,
+    remove_regex_dict,
+    replace_regex_dict,
+    golden_configs,
+    dispatch_params_table,
+    pending_checkpoints=None,
+    written_files=None,
 ) -> Result:
     r"""Backup configurations to disk.
 
     Args:
         task (Task): Nornir task individual object
+        golden_configs (dict): GoldenConfig object of each device id, with the attempt date already set.
+        dispatch_params_table (DispatchParamsTable): The dispatcher parameters of each method and platform.
+        pending_checkpoints (dict): Dict the checkpoint of the device is kept in, to be recorded once the file is pushed.
+        written_files (set): Set the path of the backup file is added to, to be committed at the end of the job.
         remove_regex_dict (dict): {'cisco_ios': ['^Building\\s+configuration.*\\n', '^Current\\s+configuration.*\\n', '^!\\s+Last\\s+configuration.*'], 'arista_eos': ['.s*']}
         replace_regex_dict (dict): {'cisco_ios': [{'regex_replacement': '<redacted_config>', 'regex_search': 'username\\s+\\S+\\spassword\\s+5\\s+(\\S+)\\s+role\\s+\\S+'}]}
 
@@ -45,13 +64,7 @@ def run_backup(  # pylint: disable=too-many-arguments
     obj = task.host.data["obj"]
     settings = device_to_settings_map[obj.id]
 
-    backup_obj = GoldenConfig.objects.filter(device=obj).first()
-    if not backup_obj:
-        backup_obj = GoldenConfig.objects.create(
-            device=obj,
-        )
-    backup_obj.backup_last_attempt_date = task.host.defaults.data["now"]
-    backup_obj.save()
+    backup_obj = golden_configs[obj.id]
 
     backup_directory = settings.backup_repository.filesystem_path
     backup_path_template_obj = render_jinja_template(obj, logger, settings.backup_path_template)
@@ -63,7 +76,7 @@ def run_backup(  # pylint: disable=too-many-arguments
             logger=logger,
             obj=obj,
             name="TEST CONNECTIVITY",
-            **dispatch_params("check_connectivity", obj.platform.network_driver, logger),
+            **dispatch_params_table.get("check_connectivity", obj.platform.network_driver, logger),
         )
     running_config = task.run(
         task=dispatcher,
@@ -73,18 +86,71 @@ def run_backup(  # pylint: disable=too-many-arguments
         backup_file=backup_file,
         remove_lines=remove_regex_dict.get(obj.platform.network_driver, []),
         substitute_lines=replace_regex_dict.get(obj.platform.network_driver, []),
-        **dispatch_params("get_config", obj.platform.network_driver, logger),
+        **dispatch_params_table.get("get_config", obj.platform.network_driver, logger),
     )[1].result["config"]
 
     backup_obj.backup_last_success_date = task.host.defaults.data["now"]
     backup_obj.backup_config = running_config
     backup_obj.save()
+    if written_files is not None:
+        written_files.add(backup_file)
 
+    defer_checkpoint(pending_checkpoints, obj, GoldenConfigJobStageChoice.STAGE_BACKUP, backup_file)
     logger.info("Successfully extracted running configuration from device.", extra={"object": obj})
 
     return Result(host=task.host, result=running_config)
 
 
+def precheck_connectivity(nornir_obj, logger, device_to_settings_map):
+    """Probe the management port of all in-scope devices concurrently before any backup task is started.
+
+    Devices whose Golden Config Setting disables `backup_test_connectivity`, whose platform has a
+    `custom_dispatcher` that may test the connectivity differently, or which have no hostname, are not probed and
+    are left to the connectivity test of their dispatcher. Unreachable devices are logged and removed from the
+    Nornir inventory so that no worker thread is spent on them, their backup attempt is already recorded. The
+    reachable devices still run the connectivity test of their dispatcher.
+
+    Args:
+        nornir_obj (Nornir): The Nornir object holding the full inventory.
+        logger (NornirLogger): Logger to log messages to.
+        device_to_settings_map (dict): Mapping of device id to GoldenConfigSetting.
+
+    Returns:
+        Nornir: The Nornir object filtered to the hosts to back up.
+    """
+    custom_dispatcher = PLUGIN_CFG.get("custom_dispatcher") or {}
+    targets = {}
+    for name, host in nornir_obj.inventory.hosts.items():
+        obj = host.data["obj"]
+        if device_to_settings_map[obj.id].backup_test_connectivity is False:
+            continue
+        if custom_dispatcher.get(obj.platform.network_driver) or not host.hostname:
+            continue
+        targets[name] = (host.hostname, get_tcp_port(obj, host.data.get("config_context")))
+    if not targets:
+        return nornir_obj
+
+    logger.debug(f"Pre-checking connectivity of {len(targets)} device(s).")
+    reachability = tcp_probe(
+        targets,
+        timeout=PLUGIN_CFG["backup_precheck_timeout"],
+        max_concurrency=PLUGIN_CFG["backup_precheck_max_concurrency"],
+    )
+    unreachable_hosts = set()
+    for name, reachable in reachability.items():
+        if reachable:
+            continue
+        obj = nornir_obj.inventory.hosts[name].data["obj"]
+        unreachable_hosts.add(name)
+        hostname, port = targets[name]
+        logger.error(get_error_message("E3034", hostname=hostname, port=port), extra={"object": obj})
+    logger.debug(f"Connectivity pre-check found {len(unreachable_hosts)} unreachable device(s).")
+
+    if unreachable_hosts:
+        nornir_obj = nornir_obj.filter(filter_func=lambda host: host.name not in unreachable_hosts)
+    return nornir_obj
+
+
 def config_backup(job):
     """
     Nornir play to backup configurations.
@@ -99,57 +165,75 @@ def config_backup(job):
         BackupFailure: If failure found in Nornir tasks then Exception will be raised.
     """
     now = make_aware(datetime.now())
-    logger = NornirLogger(job.job_result, job.logger.getEffectiveLevel())
-
-    for settings in set(job.device_to_settings_map.values()):
-        verify_settings(logger, settings, ["backup_path_template"])
-
-    # Build a dictionary, with keys of platform.network_driver, and the regex line in it for the netutils func.
-    remove_regex_dict = {}
-    for regex in ConfigRemove.objects.all():
-        if not remove_regex_dict.get(regex.platform.network_driver):
-            remove_regex_dict[regex.platform.network_driver] = []
-        remove_regex_dict[regex.platform.network_driver].append({"regex": regex.regex})
-
-    # Build a dictionary, with keys of platform.network_driver, and the regex and replace keys for the netutils func.
-    replace_regex_dict = {}
-    for regex in ConfigReplace.objects.all():
-        if not replace_regex_dict.get(regex.platform.network_driver):
-            replace_regex_dict[regex.platform.network_driver] = []
-        replace_regex_dict[regex.platform.network_driver].append({"replace": regex.replace, "regex": regex.regex})
-    try:
-        with InitNornir(
-            runner=NORNIR_SETTINGS.get("runner"),
-            logging={"enabled": False},
-            inventory={
-                "plugin": "nautobot-inventory",
-                "options": {
-                    "credentials_class": NORNIR_SETTINGS.get("credentials"),
-                    "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": job.qs,
-                    "defaults": {"now": now},
+    with NornirLogger(job.job_result, job.logger.getEffectiveLevel()) as logger:
+        precheck_failed = False
+
+        queryset = get_pending_queryset(job, GoldenConfigJobStageChoice.STAGE_BACKUP)
+        if job.resumed_from and not queryset.exists():
+            logger.info("All devices already completed the backup stage, skipping.")
+            return
+
+        for settings in set(job.device_to_settings_map.values()):
+            verify_settings(logger, settings, ["backup_path_template"])
+
+        # Build a dictionary, with keys of platform.network_driver, and the regex line in it for the netutils func.
+        remove_regex_dict = {}
+        for regex in ConfigRemove.objects.all():
+            if not remove_regex_dict.get(regex.platform.network_driver):
+                remove_regex_dict[regex.platform.network_driver] = []
+            remove_regex_dict[regex.platform.network_driver].append({"regex": regex.regex})
+
+        # Build a dictionary, with keys of platform.network_driver, and the regex and replace keys for the netutils func.
+        replace_regex_dict = {}
+        for regex in ConfigReplace.objects.all():
+            if not replace_regex_dict.get(regex.platform.network_driver):
+                replace_regex_dict[regex.platform.network_driver] = []
+            replace_regex_dict[regex.platform.network_driver].append({"replace": regex.replace, "regex": regex.regex})
+
+        golden_configs = provision_golden_configs(queryset, "backup_last_attempt_date", now)
+        try:
+            with InitNornir(
+                runner=NORNIR_SETTINGS.get("runner"),
+                logging={"enabled": False},
+                inventory={
+                    "plugin": "nautobot-inventory",
+                    "options": {
+                        "credentials_class": NORNIR_SETTINGS.get("credentials"),
+                        "params": NORNIR_SETTINGS.get("inventory_params"),
+                        "queryset": get_inventory_queryset(queryset),
+                        "defaults": {"now": now},
+                    },
                 },
-            },
-        ) as nornir_obj:
-            nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
-
-            logger.debug("Run nornir backup tasks.")
-            results = nr_with_processors.run(
-                task=run_backup,
-                name="BACKUP CONFIG",
-                logger=logger,
-                device_to_settings_map=job.device_to_settings_map,
-                remove_regex_dict=remove_regex_dict,
-                replace_regex_dict=replace_regex_dict,
+            ) as nornir_obj:
+                if PLUGIN_CFG["backup_precheck_connectivity"]:
+                    total_hosts = len(nornir_obj.inventory.hosts)
+                    nornir_obj = precheck_connectivity(nornir_obj, logger, job.device_to_settings_map)
+                    precheck_failed = len(nornir_obj.inventory.hosts) < total_hosts
+                nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
+
+                logger.debug("Run nornir backup tasks.")
+                results = nr_with_processors.run(
+                    task=run_backup,
+                    name="BACKUP CONFIG",
+                    logger=logger,
+                    device_to_settings_map=job.device_to_settings_map,
+                    golden_configs=golden_configs,
+                    remove_regex_dict=remove_regex_dict,
+                    replace_regex_dict=replace_regex_dict,
+                    dispatch_params_table=DispatchParamsTable.for_queryset(
+                        ["check_connectivity", "get_config"], queryset
+                    ),
+                    pending_checkpoints=job.pending_checkpoints,
+                    written_files=job.written_files,
+                )
+                logger.debug("Completed configuration from devices.")
+        except NornirNautobotException as err:
+            logger.error(
+                f"`E3027:` NornirNautobotException raised during backup tasks. Original exception message: ```{err}```"
             )
-            logger.debug("Completed configuration from devices.")
-    except NornirNautobotException as err:
-        logger.error(
-            f"`E3027:` NornirNautobotException raised during backup tasks. Original exception message: ```{err}```"
-        )
-        # re-raise Exception if it's raised from nornir-nautobot or nautobot-app-nornir
-        if str(err).startswith("`E2") or str(err).startswith("`E1"):
-            raise NornirNautobotException(err) from err
-    logger.debug("Completed configuration backup job for devices.")
-    if results.failed:
-        raise BackupFailure()
+            # re-raise Exception if it's raised from nornir-nautobot or nautobot-app-nornir
+            if str(err).startswith("`E2") or str(err).startswith("`E1"):
+                raise NornirNautobotException(err) from err
+        logger.debug("Completed configuration backup job for devices.")
+        if results.failed or precheck_failed:
+            raise BackupFailure()
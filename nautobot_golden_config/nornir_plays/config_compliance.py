@@ -9,6 +9,7 @@ from datetime import datetime
 
 from django.utils.timezone import make_aware
 from lxml import etree
+from nautobot.dcim.models import Device
 from nautobot_plugin_nornir.constants import NORNIR_SETTINGS
 from nautobot_plugin_nornir.plugins.inventory.nautobot_orm import NautobotORMInventory
 from netutils.config.compliance import _open_file_config, parser_map, section_config
@@ -17,16 +18,21 @@ from nornir.core.plugins.inventory import InventoryPluginRegister
 from nornir.core.task import Result, Task
 from nornir_nautobot.exceptions import NornirNautobotException
 
-from nautobot_golden_config.choices import ComplianceRuleConfigTypeChoice
+from nautobot_golden_config.choices import ComplianceRuleConfigTypeChoice, GoldenConfigJobStageChoice
 from nautobot_golden_config.exceptions import ComplianceFailure
-from nautobot_golden_config.models import ComplianceRule, ConfigCompliance, GoldenConfig
+from nautobot_golden_config.models import ComplianceRule, ConfigCompliance
 from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
+from nautobot_golden_config.utilities.checkpoint import get_pending_queryset, record_checkpoint
 from nautobot_golden_config.utilities.db_management import close_threaded_db_connections
 from nautobot_golden_config.utilities.helper import (
+    defer_compliance_matrix_update,
+    get_inventory_queryset,
     get_json_config,
     get_xml_config,
     get_xml_subtree_with_full_path,
+    provision_golden_configs,
     render_jinja_template,
+    update_compliance_matrix,
     verify_settings,
 )
 from nautobot_golden_config.utilities.logger import NornirLogger
@@ -121,12 +127,16 @@ def run_compliance(  # pylint: disable=too-many-arguments,too-many-locals
     task: Task,
     logger: logging.Logger,
     device_to_settings_map,
+    golden_configs,
     rules,
+    job_result=None,
 ) -> Result:
     """Prepare data for compliance task.
 
     Args:
         task (Task): Nornir task individual object
+        golden_configs (dict): GoldenConfig object of each device id, with the attempt date already set.
+        job_result (JobResult): JobResult to record the completed stage against.
 
     Returns:
         result (Result): Result from Nornir task
@@ -134,11 +144,7 @@ def run_compliance(  # pylint: disable=too-many-arguments,too-many-locals
     obj = task.host.data["obj"]
     settings = device_to_settings_map[obj.id]
 
-    compliance_obj = GoldenConfig.objects.filter(device=obj).first()
-    if not compliance_obj:
-        compliance_obj = GoldenConfig.objects.create(device=obj)
-    compliance_obj.compliance_last_attempt_date = task.host.defaults.data["now"]
-    compliance_obj.save()
+    compliance_obj = golden_configs[obj.id]
 
     intended_directory = settings.intended_repository.filesystem_path
     intended_path_template_obj = render_jinja_template(obj, logger, settings.intended_path_template)
@@ -170,25 +176,29 @@ def run_compliance(  # pylint: disable=too-many-arguments,too-many-locals
     backup_cfg = _open_file_config(backup_file)
     intended_cfg = _open_file_config(intended_file)
 
-    for rule in rules[obj.platform.network_driver]:
-        _actual = get_config_element(rule, backup_cfg, obj, logger)
-        _intended = get_config_element(rule, intended_cfg, obj, logger)
-
-        # using update_or_create() method to conveniently update actual obj or create new one.
-        ConfigCompliance.objects.update_or_create(
-            device=obj,
-            rule=rule["obj"],
-            defaults={
-                "actual": _actual,
-                "intended": _intended,
-                "missing": "",
-                "extra": "",
-            },
-        )
+    # The compliance matrix row of the device is refreshed once, after all of its rules.
+    with defer_compliance_matrix_update():
+        for rule in rules[obj.platform.network_driver]:
+            _actual = get_config_element(rule, backup_cfg, obj, logger)
+            _intended = get_config_element(rule, intended_cfg, obj, logger)
+
+            # using update_or_create() method to conveniently update actual obj or create new one.
+            ConfigCompliance.objects.update_or_create(
+                device=obj,
+                rule=rule["obj"],
+                defaults={
+                    "actual": _actual,
+                    "intended": _intended,
+                    "missing": "",
+                    "extra": "",
+                },
+            )
+    update_compliance_matrix(Device.objects.filter(pk=obj.pk))
 
     compliance_obj.compliance_last_success_date = task.host.defaults.data["now"]
     compliance_obj.compliance_config = "\n".join(diff_files(backup_file, intended_file))
     compliance_obj.save()
+    record_checkpoint(job_result, obj, GoldenConfigJobStageChoice.STAGE_COMPLIANCE)
     logger.info("Successfully tested compliance job.", extra={"object": obj})
 
     return Result(host=task.host)
@@ -208,43 +218,50 @@ def config_compliance(job):  # pylint: disable=unused-argument
         ComplianceFailure: If failure found in Nornir tasks then Exception will be raised.
     """
     now = make_aware(datetime.now())
-    logger = NornirLogger(job.job_result, job.logger.getEffectiveLevel())
-
-    rules = get_rules()
-
-    for settings in set(job.device_to_settings_map.values()):
-        verify_settings(logger, settings, ["backup_path_template", "intended_path_template"])
-    try:
-        with InitNornir(
-            runner=NORNIR_SETTINGS.get("runner"),
-            logging={"enabled": False},
-            inventory={
-                "plugin": "nautobot-inventory",
-                "options": {
-                    "credentials_class": NORNIR_SETTINGS.get("credentials"),
-                    "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": job.qs,
-                    "defaults": {"now": now},
+    with NornirLogger(job.job_result, job.logger.getEffectiveLevel()) as logger:
+        queryset = get_pending_queryset(job, GoldenConfigJobStageChoice.STAGE_COMPLIANCE)
+        if job.resumed_from and not queryset.exists():
+            logger.info("All devices already completed the compliance stage, skipping.")
+            return
+
+        rules = get_rules()
+        golden_configs = provision_golden_configs(queryset, "compliance_last_attempt_date", now)
+
+        for settings in set(job.device_to_settings_map.values()):
+            verify_settings(logger, settings, ["backup_path_template", "intended_path_template"])
+        try:
+            with InitNornir(
+                runner=NORNIR_SETTINGS.get("runner"),
+                logging={"enabled": False},
+                inventory={
+                    "plugin": "nautobot-inventory",
+                    "options": {
+                        "credentials_class": NORNIR_SETTINGS.get("credentials"),
+                        "params": NORNIR_SETTINGS.get("inventory_params"),
+                        "queryset": get_inventory_queryset(queryset),
+                        "defaults": {"now": now},
+                    },
                 },
-            },
-        ) as nornir_obj:
-            nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
-
-            logger.debug("Run nornir compliance tasks.")
-            results = nr_with_processors.run(
-                task=run_compliance,
-                name="RENDER COMPLIANCE TASK GROUP",
-                logger=logger,
-                device_to_settings_map=job.device_to_settings_map,
-                rules=rules,
+            ) as nornir_obj:
+                nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
+
+                logger.debug("Run nornir compliance tasks.")
+                results = nr_with_processors.run(
+                    task=run_compliance,
+                    name="RENDER COMPLIANCE TASK GROUP",
+                    logger=logger,
+                    device_to_settings_map=job.device_to_settings_map,
+                    golden_configs=golden_configs,
+                    rules=rules,
+                    job_result=job.job_result,
+                )
+        except NornirNautobotException as err:
+            logger.error(
+                f"`E3028:` NornirNautobotException raised during compliance tasks. Original exception message: ```{err}```"
             )
-    except NornirNautobotException as err:
-        logger.error(
-            f"`E3028:` NornirNautobotException raised during compliance tasks. Original exception message: ```{err}```"
-        )
-        # re-raise Exception if it's raised from nornir-nautobot or nautobot-app-nornir
-        if str(err).startswith("`E2") or str(err).startswith("`E1"):
-            raise NornirNautobotException(err) from err
-    logger.debug("Completed compliance job for devices.")
-    if results.failed:
-        raise ComplianceFailure()
+            # re-raise Exception if it's raised from nornir-nautobot or nautobot-app-nornir
+            if str(err).startswith("`E2") or str(err).startswith("`E1"):
+                raise NornirNautobotException(err) from err
+        logger.debug("Completed compliance job for devices.")
+        if results.failed:
+            raise ComplianceFailure()
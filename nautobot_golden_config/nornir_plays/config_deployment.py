@@ -21,14 +21,16 @@ from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
 from nautobot_golden_config.utilities.config_postprocessing import get_config_postprocessing
 from nautobot_golden_config.utilities.constant import DEFAULT_DEPLOY_STATUS, ENABLE_POSTPROCESSING
 from nautobot_golden_config.utilities.db_management import close_threaded_db_connections
-from nautobot_golden_config.utilities.helper import dispatch_params
+from nautobot_golden_config.utilities.helper import DispatchParamsTable, get_inventory_queryset
 from nautobot_golden_config.utilities.logger import NornirLogger
 
 InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 
 
 @close_threaded_db_connections
-def run_deployment(task: Task, logger: logging.Logger, config_plan_qs, deploy_job_result, job_request) -> Result:
+def run_deployment(  # pylint: disable=too-many-arguments
+    task: Task, logger: logging.Logger, config_plan_qs, deploy_job_result, job_request, dispatch_params_table
+) -> Result:
     """Deploy configurations to device."""
     obj = task.host.data["obj"]
     plans_to_deploy = config_plan_qs.filter(device=obj)
@@ -48,7 +50,7 @@ def run_deployment(task: Task, logger: logging.Logger, config_plan_qs, deploy_jo
             logger=logger,
             config=post_config,
             can_diff=False,
-            **dispatch_params("merge_config", obj.platform.network_driver, logger),
+            **dispatch_params_table.get("merge_config", obj.platform.network_driver, logger),
         )[1]
         task_changed, task_result, task_failed = result.changed, result.result, result.failed
         if task_changed and task_failed:
@@ -85,50 +87,50 @@ def config_deployment(job):
         None: Deployment results are written to database.
     """
     now = make_aware(datetime.now())
-    logger = NornirLogger(job.job_result, job.logger.getEffectiveLevel())
-
-    logger.debug("Starting config deployment")
-    config_plan_qs = job.data["config_plan"]
-    if config_plan_qs.filter(status__name=DEFAULT_DEPLOY_STATUS).exists():
-        error_msg = "`E3025:` Cannot deploy configuration(s). One or more config plans are not approved."
-        logger.error(error_msg)
-        raise NornirNautobotException(error_msg)
-    if config_plan_qs.filter(status__name="Completed").exists():
-        error_msg = "`E3026:` Cannot deploy configuration(s). One or more config plans are already completed."
-        logger.error(error_msg)
-        raise NornirNautobotException(error_msg)
-    device_qs = Device.objects.filter(config_plan__in=config_plan_qs).distinct()
-    User = get_user_model()  # pylint: disable=invalid-name
-    job.request.user = User.objects.get(id=job.celery_kwargs["nautobot_job_user_id"])
-    try:
-        with InitNornir(
-            runner=NORNIR_SETTINGS.get("runner"),
-            logging={"enabled": False},
-            inventory={
-                "plugin": "nautobot-inventory",
-                "options": {
-                    "credentials_class": NORNIR_SETTINGS.get("credentials"),
-                    "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": device_qs,
-                    "defaults": {"now": now},
+    with NornirLogger(job.job_result, job.logger.getEffectiveLevel()) as logger:
+        logger.debug("Starting config deployment")
+        config_plan_qs = job.data["config_plan"]
+        if config_plan_qs.filter(status__name=DEFAULT_DEPLOY_STATUS).exists():
+            error_msg = "`E3025:` Cannot deploy configuration(s). One or more config plans are not approved."
+            logger.error(error_msg)
+            raise NornirNautobotException(error_msg)
+        if config_plan_qs.filter(status__name="Completed").exists():
+            error_msg = "`E3026:` Cannot deploy configuration(s). One or more config plans are already completed."
+            logger.error(error_msg)
+            raise NornirNautobotException(error_msg)
+        device_qs = Device.objects.filter(config_plan__in=config_plan_qs).distinct()
+        User = get_user_model()  # pylint: disable=invalid-name
+        job.request.user = User.objects.get(id=job.celery_kwargs["nautobot_job_user_id"])
+        try:
+            with InitNornir(
+                runner=NORNIR_SETTINGS.get("runner"),
+                logging={"enabled": False},
+                inventory={
+                    "plugin": "nautobot-inventory",
+                    "options": {
+                        "credentials_class": NORNIR_SETTINGS.get("credentials"),
+                        "params": NORNIR_SETTINGS.get("inventory_params"),
+                        "queryset": get_inventory_queryset(device_qs),
+                        "defaults": {"now": now},
+                    },
                 },
-            },
-        ) as nornir_obj:
-            nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
+            ) as nornir_obj:
+                nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
 
-            results = nr_with_processors.run(
-                task=run_deployment,
-                name="DEPLOY CONFIG",
-                logger=logger,
-                config_plan_qs=config_plan_qs,
-                deploy_job_result=job.job_result,
-                job_request=job.request,
-            )
-    except Exception as error:
-        error_msg = f"`E3001:` General Exception handler, original error message ```{error}```"
-        logger.error(error_msg)
-        raise NornirNautobotException(error_msg) from error
+                results = nr_with_processors.run(
+                    task=run_deployment,
+                    name="DEPLOY CONFIG",
+                    logger=logger,
+                    config_plan_qs=config_plan_qs,
+                    deploy_job_result=job.job_result,
+                    job_request=job.request,
+                    dispatch_params_table=DispatchParamsTable.for_queryset(["merge_config"], device_qs),
+                )
+        except Exception as error:
+            error_msg = f"`E3001:` General Exception handler, original error message ```{error}```"
+            logger.error(error_msg)
+            raise NornirNautobotException(error_msg) from error
 
-    logger.debug("Completed configuration deployment.")
-    if results.failed:
-        raise ConfigPlanDeploymentFailure()
+        logger.debug("Completed configuration deployment.")
+        if results.failed:
+            raise ConfigPlanDeploymentFailure()
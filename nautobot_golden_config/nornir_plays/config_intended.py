@@ -3,6 +3,7 @@
 # pylint: disable=relative-beyond-top-level
 import logging
 import os
+from contextlib import nullcontext
 from datetime import datetime
 
 from django.utils.timezone import make_aware
@@ -10,22 +11,31 @@ from nautobot_plugin_nornir.constants import NORNIR_SETTINGS
 from nautobot_plugin_nornir.plugins.inventory.nautobot_orm import NautobotORMInventory
 from nornir import InitNornir
 from nornir.core.plugins.inventory import InventoryPluginRegister
+from nornir.core.processor import Processors
 from nornir.core.task import Result, Task
 from nornir_nautobot.exceptions import NornirNautobotException
 from nornir_nautobot.plugins.tasks.dispatcher import dispatcher
 
+from nautobot_golden_config.choices import GoldenConfigJobStageChoice
 from nautobot_golden_config.exceptions import IntendedGenerationFailure
-from nautobot_golden_config.models import GoldenConfig
 from nautobot_golden_config.nornir_plays.processor import ProcessGoldenConfig
+from nautobot_golden_config.utilities.checkpoint import defer_checkpoint, get_pending_queryset
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 from nautobot_golden_config.utilities.db_management import close_threaded_db_connections
-from nautobot_golden_config.utilities.graphql import graph_ql_query
+from nautobot_golden_config.utilities.direct_render import can_render_directly, get_render_host, render_intended_config
+from nautobot_golden_config.utilities.graphql import SotAggBatch
 from nautobot_golden_config.utilities.helper import (
-    dispatch_params,
+    DispatchParamsTable,
     get_django_env,
+    get_error_message,
+    get_inventory_queryset,
+    provision_golden_configs,
     render_jinja_template,
     verify_settings,
 )
+from nautobot_golden_config.utilities.intended_inputs import IntendedInputs
 from nautobot_golden_config.utilities.logger import NornirLogger
+from nautobot_golden_config.utilities.render_pool import IntendedRenderPool
 
 InventoryPluginRegister.register("nautobot-inventory", NautobotORMInventory)
 LOGGER = logging.getLogger(__name__)
@@ -33,7 +43,17 @@ LOGGER = logging.getLogger(__name__)
 
 @close_threaded_db_connections
 def run_template(  # pylint: disable=too-many-arguments,too-many-locals
-    task: Task, logger: NornirLogger, device_to_settings_map, job_class_instance, jinja_env
+    task: Task,
+    logger: NornirLogger,
+    device_to_settings_map,
+    golden_configs,
+    sot_agg,
+    intended_inputs,
+    job_class_instance,
+    jinja_env,
+    dispatch_params_table,
+    render_pool=None,
+    direct_render=False,
 ) -> Result:
     """Render Jinja Template.
 
@@ -43,7 +63,13 @@ def run_template(  # pylint: disable=too-many-arguments,too-many-locals
         task (Task): Nornir task individual object
         logger (NornirLogger): Logger to log messages to.
         global_settings (GoldenConfigSetting): The settings for GoldenConfigApp.
+        golden_configs (dict): GoldenConfig object of each device id, with the attempt date already set.
+        sot_agg (SotAggBatch): Runs the SoT aggregation query of the devices in chunks.
+        intended_inputs (IntendedInputs): Computes the digest of the inputs of the intended configurations.
         job_class_instance (Result): The the output from the Nautobot Job instance being run.
+        dispatch_params_table (DispatchParamsTable): The dispatcher parameters of each method and platform.
+        render_pool (IntendedRenderPool): Renders the template in another process instead of the dispatcher, if set.
+        direct_render (bool): Renders the template in the thread of the task instead of the dispatcher.
 
     Returns:
         result (Result): Result from Nornir task
@@ -51,11 +77,7 @@ def run_template(  # pylint: disable=too-many-arguments,too-many-locals
     obj = task.host.data["obj"]
     settings = device_to_settings_map[obj.id]
 
-    intended_obj = GoldenConfig.objects.filter(device=obj).first()
-    if not intended_obj:
-        intended_obj = GoldenConfig.objects.create(device=obj)
-    intended_obj.intended_last_attempt_date = task.host.defaults.data["now"]
-    intended_obj.save()
+    intended_obj = golden_configs[obj.id]
 
     intended_directory = settings.intended_repository.filesystem_path
     intended_path_template_obj = render_jinja_template(obj, logger, settings.intended_path_template)
@@ -63,30 +85,65 @@ def run_template(  # pylint: disable=too-many-arguments,too-many-locals
 
     jinja_template = render_jinja_template(obj, logger, settings.jinja_path_template)
     job_class_instance.request.user = job_class_instance.user
-    status, device_data = graph_ql_query(job_class_instance.request, obj, settings.sot_agg_query.query)
+    status, device_data = sot_agg.get(obj, settings.sot_agg_query.query)
     if status != 200:  # noqa: PLR2004
         error_msg = f"`E3012:` The GraphQL query return a status of {str(status)} with error of {str(device_data)}"
         logger.error(error_msg, extra={"object": obj})
         raise NornirNautobotException(error_msg)
 
+    jinja_root_path = settings.jinja_repository.filesystem_path
+    inputs_digest = intended_inputs.get_digest(jinja_root_path, jinja_template, output_file_location, device_data)
+    if (
+        job_class_instance.render_changed_only
+        and inputs_digest
+        and inputs_digest == intended_obj.intended_inputs_digest
+        and os.path.isfile(output_file_location)
+    ):
+        intended_obj.intended_last_success_date = task.host.defaults.data["now"]
+        intended_obj.save()
+        defer_checkpoint(
+            job_class_instance.pending_checkpoints, obj, GoldenConfigJobStageChoice.STAGE_INTENDED, output_file_location
+        )
+        logger.info("Data and templates unchanged, skipped the intended configuration.", extra={"object": obj})
+        return Result(host=task.host, result=None)
+
     task.host.data.update(device_data)
 
-    generated_config = task.run(
-        task=dispatcher,
-        name="GENERATE CONFIG",
-        obj=obj,
-        logger=logger,
-        jinja_template=jinja_template,
-        jinja_root_path=settings.jinja_repository.filesystem_path,
-        output_file_location=output_file_location,
-        jinja_filters=jinja_env.filters,
-        jinja_env=jinja_env,
-        **dispatch_params("generate_config", obj.platform.network_driver, logger),
-    )[1].result["config"]
+    if render_pool is not None:
+        try:
+            generated_config = render_pool.render(jinja_root_path, jinja_template, task.host)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            error_msg = get_error_message("E3036", template=jinja_template, error=f"{type(error).__name__}: {error}")
+            logger.error(error_msg, extra={"object": obj})
+            raise NornirNautobotException(error_msg) from error
+    elif direct_render:
+        generated_config = render_intended_config(task.host, logger, jinja_env, jinja_root_path, jinja_template)
+    else:
+        generated_config = task.run(
+            task=dispatcher,
+            name="GENERATE CONFIG",
+            obj=obj,
+            logger=logger,
+            jinja_template=jinja_template,
+            jinja_root_path=jinja_root_path,
+            output_file_location=output_file_location,
+            jinja_filters=jinja_env.filters,
+            jinja_env=jinja_env,
+            **dispatch_params_table.get("generate_config", obj.platform.network_driver, logger),
+        )[1].result["config"]
+    if render_pool is not None or direct_render:
+        os.makedirs(os.path.dirname(output_file_location), exist_ok=True)
+        with open(output_file_location, "w", encoding="utf8") as output_file:
+            output_file.write(generated_config)
     intended_obj.intended_last_success_date = task.host.defaults.data["now"]
     intended_obj.intended_config = generated_config
+    intended_obj.intended_inputs_digest = inputs_digest
     intended_obj.save()
+    job_class_instance.written_files.add(output_file_location)
 
+    defer_checkpoint(
+        job_class_instance.pending_checkpoints, obj, GoldenConfigJobStageChoice.STAGE_INTENDED, output_file_location
+    )
     logger.info("Successfully generated the intended configuration.", extra={"object": obj})
 
     return Result(host=task.host, result=generated_config)
@@ -106,45 +163,95 @@ def config_intended(job):
         IntendedGenerationFailure: If failure found in Nornir tasks then Exception will be raised.
     """
     now = make_aware(datetime.now())
-    logger = NornirLogger(job.job_result, job.logger.getEffectiveLevel())
-
-    for settings in set(job.device_to_settings_map.values()):
-        verify_settings(logger, settings, ["jinja_path_template", "intended_path_template", "sot_agg_query"])
-
-    # Retrieve filters from the Django jinja template engine
-    jinja_env = get_django_env()
-    try:
-        with InitNornir(
-            runner=NORNIR_SETTINGS.get("runner"),
-            logging={"enabled": False},
-            inventory={
-                "plugin": "nautobot-inventory",
-                "options": {
-                    "credentials_class": NORNIR_SETTINGS.get("credentials"),
-                    "params": NORNIR_SETTINGS.get("inventory_params"),
-                    "queryset": job.qs,
-                    "defaults": {"now": now},
-                },
-            },
-        ) as nornir_obj:
-            nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
+    with NornirLogger(job.job_result, job.logger.getEffectiveLevel()) as logger:
+        queryset = get_pending_queryset(job, GoldenConfigJobStageChoice.STAGE_INTENDED)
+        if job.resumed_from and not queryset.exists():
+            logger.info("All devices already completed the intended stage, skipping.")
+            return
+
+        for settings in set(job.device_to_settings_map.values()):
+            verify_settings(logger, settings, ["jinja_path_template", "intended_path_template", "sot_agg_query"])
 
-            logger.debug("Run nornir render config tasks.")
-            # Run the Nornir Tasks
-            results = nr_with_processors.run(
-                task=run_template,
+        # Retrieve filters from the Django jinja template engine
+        jinja_env = get_django_env()
+        golden_configs = provision_golden_configs(queryset, "intended_last_attempt_date", now)
+        job.request.user = job.user
+        sot_agg = SotAggBatch(
+            job.request,
+            {
+                device_id: job.device_to_settings_map[device_id].sot_agg_query.query
+                for device_id in queryset.values_list("pk", flat=True)
+                if device_id in job.device_to_settings_map
+            },
+            PLUGIN_CFG["sot_agg_batch_size"],
+        )
+        dispatch_params_table = DispatchParamsTable.for_queryset(["generate_config"], queryset)
+        device = queryset.first() if len(golden_configs) == 1 else None
+        if device is not None and can_render_directly(device):
+            # A single device, such as the one of the AllGoldenConfig job, is rendered without building an inventory.
+            logger.debug("Run the render config task without Nornir.")
+            task = Task(
+                run_template,
+                nornir=None,
+                global_dry_run=False,
+                processors=Processors([ProcessGoldenConfig(logger)]),
                 name="RENDER CONFIG",
                 logger=logger,
                 device_to_settings_map=job.device_to_settings_map,
+                golden_configs=golden_configs,
+                sot_agg=sot_agg,
+                intended_inputs=IntendedInputs(jinja_env),
                 job_class_instance=job,
                 jinja_env=jinja_env,
+                dispatch_params_table=dispatch_params_table,
+                direct_render=True,
             )
-    except NornirNautobotException as err:
-        logger.error(
-            f"`E3029:` NornirNautobotException raised during intended tasks. Original exception message: ```{err}```"
-        )
-        # re-raise Exception if it's raised from nornir-nautobot or nautobot-app-nornir
-        if str(err).startswith("`E2") or str(err).startswith("`E1"):
-            raise NornirNautobotException(err) from err
-    if results.failed:
-        raise IntendedGenerationFailure()
+            if task.start(get_render_host(device, now)).failed:
+                raise IntendedGenerationFailure()
+            return
+
+        render_processes = PLUGIN_CFG["intended_render_processes"]
+        render_pool_context = IntendedRenderPool(render_processes) if render_processes else nullcontext()
+        try:
+            with (
+                InitNornir(
+                    runner=NORNIR_SETTINGS.get("runner"),
+                    logging={"enabled": False},
+                    inventory={
+                        "plugin": "nautobot-inventory",
+                        "options": {
+                            "credentials_class": NORNIR_SETTINGS.get("credentials"),
+                            "params": NORNIR_SETTINGS.get("inventory_params"),
+                            "queryset": get_inventory_queryset(queryset),
+                            "defaults": {"now": now},
+                        },
+                    },
+                ) as nornir_obj,
+                render_pool_context as render_pool,
+            ):
+                nr_with_processors = nornir_obj.with_processors([ProcessGoldenConfig(logger)])
+
+                logger.debug("Run nornir render config tasks.")
+                # Run the Nornir Tasks
+                results = nr_with_processors.run(
+                    task=run_template,
+                    name="RENDER CONFIG",
+                    logger=logger,
+                    device_to_settings_map=job.device_to_settings_map,
+                    golden_configs=golden_configs,
+                    sot_agg=sot_agg,
+                    intended_inputs=IntendedInputs(jinja_env),
+                    job_class_instance=job,
+                    jinja_env=jinja_env,
+                    dispatch_params_table=dispatch_params_table,
+                    render_pool=render_pool,
+                )
+        except NornirNautobotException as err:
+            logger.error(
+                f"`E3029:` NornirNautobotException raised during intended tasks. Original exception message: ```{err}```"
+            )
+            # re-raise Exception if it's raised from nornir-nautobot or nautobot-app-nornir
+            if str(err).startswith("`E2") or str(err).startswith("`E1"):
+                raise NornirNautobotException(err) from err
+        if results.failed:
+            raise IntendedGenerationFailure()
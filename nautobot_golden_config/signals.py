@@ -1,12 +1,26 @@
 """Signal helpers."""
 
 from django.apps import apps as global_apps
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from nautobot.apps.choices import ColorChoices
-from nautobot.dcim.models import Platform
+from nautobot.dcim.models import Device, Platform
+from nautobot.extras.models import ChangeLoggedModel, DynamicGroup
 
 from nautobot_golden_config import models
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.graphql import invalidate_sot_agg_cache
+from nautobot_golden_config.utilities.helper import (
+    invalidate_dynamic_groups_cache,
+    invalidate_golden_config_in_sync,
+    is_compliance_matrix_update_deferred,
+    schedule_compliance_matrix_update,
+    update_compliance_matrix,
+    update_dynamic_groups_cache_for_device,
+    update_settings_assignments,
+)
 
 
 def post_migrate_create_statuses(sender, apps=global_apps, **kwargs):  # pylint: disable=unused-argument
@@ -85,3 +99,115 @@ def config_compliance_platform_cleanup(sender, instance, **kwargs):  # pylint: d
     )
     if cc_wrong_platform.count() > 0:
         cc_wrong_platform.delete()
+
+
+@receiver(post_save, sender=models.ConfigCompliance)
+def config_compliance_matrix_update(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to refresh the compliance matrix row of the device of a saved ConfigCompliance."""
+    if not raw and not is_compliance_matrix_update_deferred():
+        update_compliance_matrix(Device.objects.filter(pk=instance.device_id))
+
+
+@receiver(post_delete, sender=models.ConfigCompliance)
+def config_compliance_matrix_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to refresh the compliance matrix rows of the devices of deleted ConfigCompliance, once committed."""
+    if not is_compliance_matrix_update_deferred():
+        schedule_compliance_matrix_update(instance.device_id)
+
+
+@receiver(post_save, sender=models.ComplianceRule)
+@receiver(post_save, sender=models.ComplianceFeature)
+def config_compliance_matrix_rules_update(sender, instance, created=False, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to refresh the compliance matrix rows of the devices of a changed rule or feature, e.g. its slug."""
+    if created or raw:
+        return
+    lookup = "rule" if sender is models.ComplianceRule else "rule__feature"
+    update_compliance_matrix(
+        Device.objects.filter(pk__in=models.ConfigCompliance.objects.filter(**{lookup: instance}).values("device"))
+    )
+
+
+@receiver(post_save, sender=Device)
+def device_dynamic_groups_update(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to keep the golden config dynamic groups membership of a changed device current."""
+    if not raw:
+        update_dynamic_groups_cache_for_device(instance)
+        invalidate_golden_config_in_sync()
+
+
+@receiver(m2m_changed, sender=Device.tags.through)
+def device_tags_dynamic_groups_update(sender, instance, action, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to keep the golden config dynamic groups membership of a device current on tag changes."""
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, Device):
+        update_dynamic_groups_cache_for_device(instance)
+        invalidate_golden_config_in_sync()
+
+
+@receiver(post_delete, sender=Device)
+def device_dynamic_groups_remove(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to remove a deleted device from the golden config dynamic groups membership."""
+    update_dynamic_groups_cache_for_device(instance, deleted=True)
+    invalidate_golden_config_in_sync()
+
+
+@receiver(post_save, sender=models.GoldenConfigSetting)
+@receiver(post_delete, sender=models.GoldenConfigSetting)
+@receiver(post_save, sender=DynamicGroup)
+def dynamic_groups_invalidate(sender, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to rebuild the golden config dynamic groups membership after a settings or filter change."""
+    invalidate_dynamic_groups_cache()
+    invalidate_golden_config_in_sync()
+
+
+@receiver(post_save, sender=models.GoldenConfig)
+@receiver(post_delete, sender=models.GoldenConfig)
+def golden_config_in_sync_invalidate(sender, created=True, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to check the GoldenConfig entries again once one is added or deleted, but not when updated."""
+    if created and not raw:
+        invalidate_golden_config_in_sync()
+
+
+@receiver(post_save, sender=models.GoldenConfigSetting)
+def golden_config_setting_assignments_update(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to refresh the settings assigned to the devices of a changed GoldenConfigSetting, e.g. its weight."""
+    if not raw:
+        update_settings_assignments(
+            Device.objects.filter(
+                Q(pk__in=instance.dynamic_group.members.values("pk"))
+                | Q(golden_config_setting_assignment__golden_config_setting=instance)
+            )
+        )
+
+
+@receiver(post_delete, sender=models.GoldenConfigSetting)
+def golden_config_setting_assignments_delete(sender, **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to assign the next highest weighted GoldenConfigSetting to the devices of a deleted one."""
+    update_settings_assignments()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+def sot_agg_cache_invalidate(sender, instance, raw=False, action="post_add", **kwargs):  # pylint: disable=unused-argument
+    """Signal helper to invalidate the cached SoT aggregation data the change of an object may affect.
+
+    The signals of the objects are used rather than their change log entries, as the change log entries of bulk edits
+    are bulk created without signals. The change of a device, or of an object of a single device which is not cabled,
+    only invalidates the data of that device, as the data of the other devices may include a cabled object through its
+    peer. The results written by the Golden Config jobs are not inputs of the queries and are ignored, any other change
+    invalidates the data of all devices. The data is invalidated once the transaction is committed, so a query running
+    meanwhile can not cache the data from before the change again.
+    """
+    if raw or not action.startswith("post_") or not PLUGIN_CFG.get("sot_agg_cache_ttl"):
+        return
+    if not isinstance(instance, ChangeLoggedModel) or isinstance(
+        instance, (models.GoldenConfig, models.ConfigCompliance)
+    ):
+        return
+    if isinstance(instance, Device):
+        device_id = instance.pk
+    elif getattr(instance, "cable_id", None) is None:
+        device_id = getattr(instance, "device_id", None)
+    else:
+        device_id = None
+    transaction.on_commit(lambda: invalidate_sot_agg_cache(device_id))
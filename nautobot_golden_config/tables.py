@@ -164,12 +164,13 @@ class ConfigComplianceTable(BaseTable):
 
     def __init__(self, *args, **kwargs):
         """Override default values to dynamically add columns."""
-        # Used ConfigCompliance.objects on purpose, vs queryset (set in args[0]), as there were issues with that as
-        # well as not as expected from user standpoint (e.g. not always the same values on columns depending on
-        # filtering)
+        # The columns do not depend on the queryset (set in args[0]), as there were issues with that as well as not as
+        # expected from user standpoint (e.g. not always the same values on columns depending on filtering). They are
+        # the features with a rule, as for the compliance matrix, rather than scanning the ConfigCompliance entries.
         features = list(
-            models.ConfigCompliance.objects.order_by("rule__feature__slug")
-            .values_list("rule__feature__slug", flat=True)
+            models.ComplianceFeature.objects.filter(feature__isnull=False)
+            .order_by("slug")
+            .values_list("slug", flat=True)
             .distinct()
         )
         # Nautobot's BaseTable.configurable_columns() only recognizes columns in self.base_columns,
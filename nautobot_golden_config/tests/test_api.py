@@ -1,5 +1,6 @@
 """Unit tests for nautobot_golden_config."""
 
+import json
 import tempfile
 from copy import deepcopy
 from unittest.mock import patch
@@ -15,6 +16,7 @@ from nautobot.extras.models import DynamicGroup, GitRepository, GraphQLQuery, St
 from packaging import version
 from rest_framework import status
 
+from nautobot_golden_config.api.views import GenerateIntendedConfigBatchView
 from nautobot_golden_config.choices import RemediationTypeChoice
 from nautobot_golden_config.models import ConfigPlan, ConfigReplace, GoldenConfigSetting, RemediationSetting
 from nautobot_golden_config.tests.conftest import (
@@ -621,6 +623,132 @@ class GenerateIntendedConfigViewAPITestCase(APITestCase):
         self.assertEqual(response.data["intended_config"], f"Jinja test for device {self.device.name}.")
         self.assertEqual(response.data["intended_config_lines"], [f"Jinja test for device {self.device.name}."])
 
+    @patch.dict("nautobot_golden_config.utilities.direct_render.PLUGIN_CFG", {"intended_direct_render": True})
+    @patch("nautobot_golden_config.api.views.render_intended_config")
+    @patch("nautobot_golden_config.api.views.ensure_git_repository")
+    @patch("nautobot_golden_config.api.views.Path")
+    @patch("nautobot_golden_config.api.views.dispatcher")
+    def test_generate_intended_config_direct_render(
+        self, mock_dispatcher, MockPath, mock_ensure_git_repository, mock_render_intended_config
+    ):  # pylint: disable=invalid-name
+        """Verify that the intended config is rendered without Nornir when the setting is enabled."""
+
+        self.add_permissions("dcim.view_device")
+        self.add_permissions("dcim.view_location")
+        self.add_permissions("extras.view_gitrepository")
+
+        self._setup_mock_path(MockPath)
+        mock_render_intended_config.return_value = f"Jinja test for device {self.device.name}."
+
+        response = self.client.get(
+            reverse("plugins-api:nautobot_golden_config-api:generate_intended_config"),
+            data={"device_id": self.device.pk},
+            **self.header,
+        )
+
+        mock_ensure_git_repository.assert_called_once_with(self.git_repository)
+        mock_dispatcher.assert_not_called()
+        host = mock_render_intended_config.call_args.args[0]
+        self.assertEqual(host["obj"], self.device)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response.data["intended_config"], f"Jinja test for device {self.device.name}.")
+
+    @patch("nautobot_golden_config.api.views.ensure_git_repository")
+    @patch("nautobot_golden_config.api.views.Path")
+    @patch("nautobot_golden_config.api.views.dispatcher")
+    def test_generate_intended_config_batch(self, mock_dispatcher, MockPath, mock_ensure_git_repository):  # pylint: disable=invalid-name
+        """Verify that the intended configs are generated and streamed as expected."""
+
+        self.add_permissions("dcim.view_device")
+        self.add_permissions("dcim.view_location")
+        self.add_permissions("extras.view_gitrepository")
+
+        self._setup_mock_path(MockPath)
+        self._setup_mock_dispatcher(mock_dispatcher)
+
+        response = self.client.post(
+            reverse("plugins-api:nautobot_golden_config-api:generate_intended_config_batch"),
+            data={"device_ids": [str(self.device.pk)]},
+            format="json",
+            **self.header,
+        )
+
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        mock_ensure_git_repository.assert_called_once_with(self.git_repository)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["device_id"], str(self.device.pk))
+        self.assertEqual(lines[0]["intended_config"], f"Jinja test for device {self.device.name}.")
+        self.assertNotIn("error", lines[0])
+
+    @patch("nautobot_golden_config.api.views.ensure_git_repository")
+    @patch("nautobot_golden_config.api.views.Path")
+    @patch("nautobot_golden_config.api.views.dispatcher")
+    def test_generate_intended_config_batch_without_platform(self, mock_dispatcher, MockPath, _):  # pylint: disable=invalid-name
+        """Verify that a device the Nornir inventory can not be built with gets an error line, the others render."""
+
+        self.add_permissions("dcim.view_device")
+        self.add_permissions("dcim.view_location")
+        self.add_permissions("extras.view_gitrepository")
+
+        self._setup_mock_path(MockPath)
+        self._setup_mock_dispatcher(mock_dispatcher)
+        device_without_platform = Device.objects.get(name="Device 2")
+        device_without_platform.platform = None
+        device_without_platform.save()
+
+        response = self.client.post(
+            reverse("plugins-api:nautobot_golden_config-api:generate_intended_config_batch"),
+            data={"device_ids": [str(self.device.pk), str(device_without_platform.pk)]},
+            format="json",
+            **self.header,
+        )
+
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        lines = {
+            line["device_id"]: line
+            for line in map(json.loads, b"".join(response.streaming_content).decode().splitlines())
+        }
+        self.assertEqual(lines[str(self.device.pk)]["intended_config"], f"Jinja test for device {self.device.name}.")
+        self.assertEqual(lines[str(device_without_platform.pk)]["error"], "The device has no platform")
+
+    def test_generate_intended_config_batch_inventory_errors(self):
+        """Verify that the devices without a unique name are rejected before the Nornir inventory is built."""
+        platform = self.device.platform
+        devices = [
+            Device(name="same", platform=platform),
+            Device(name="same", platform=platform),
+            Device(name=None, platform=platform),
+            Device(name="unique", platform=platform),
+        ]
+        errors = GenerateIntendedConfigBatchView._get_inventory_errors(devices)  # pylint: disable=protected-access
+        self.assertEqual(set(errors), {devices[0].pk, devices[1].pk, devices[2].pk})
+        self.assertIn("also named same", errors[devices[0].pk])
+        self.assertEqual(errors[devices[2].pk], "The device has no name")
+
+    def test_generate_intended_config_batch_failures(self):
+        """Verify that the errors preventing the batch from starting are handled as expected."""
+
+        self.add_permissions("dcim.view_device")
+
+        response = self.client.post(
+            reverse("plugins-api:nautobot_golden_config-api:generate_intended_config_batch"),
+            data={},
+            format="json",
+            **self.header,
+        )
+        self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], "Parameter device_ids or filter is required")
+
+        response = self.client.post(
+            reverse("plugins-api:nautobot_golden_config-api:generate_intended_config_batch"),
+            data={"filter": {"name": ["no such device"]}},
+            format="json",
+            **self.header,
+        )
+        self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["detail"], "No devices found")
+
     @patch("nautobot_golden_config.api.views.graph_ql_query")
     @patch("nautobot_golden_config.api.views.ensure_git_repository")
     @patch("nautobot_golden_config.api.views.Path")
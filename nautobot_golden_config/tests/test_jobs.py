@@ -1,12 +1,16 @@
 """Basic Job Test."""
 
+import threading
+from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from git.exc import GitCommandError
 from nautobot.apps.testing import TransactionTestCase, create_job_result_and_run_job
 from nautobot.dcim.models import Device
 from nautobot.extras.models import JobLogEntry
 
 from nautobot_golden_config import jobs
+from nautobot_golden_config.exceptions import RepositoryPushFailure
 from nautobot_golden_config.tests.conftest import (
     create_device,
     create_orphan_device,
@@ -620,3 +624,105 @@ class GCReposRunAllMultipleTestCase(TransactionTestCase):
 
         log_entries = JobLogEntry.objects.filter(job_result=job_result, grouping="GC Repo Commit and Push")
         self.assertEqual(log_entries.count(), 0)
+
+
+class GCRepoPushTestCase(TestCase):
+    """Test the commit and push of the repos at the end of a job."""
+
+    def setUp(self):
+        """Setup a job with a logger and two repos to commit."""
+        self.job = MagicMock(written_files={"/repo/a.cfg"}, pending_checkpoints={})
+        self.job.Meta.name = "Backup Configurations"
+        self.repo1 = MagicMock(base_url="https://fake.git/repo1.git", head="abc123")
+        self.repo1.nautobot_repo_obj.name = "repo1"
+        self.repo1.nautobot_repo_obj.filesystem_path = "/repo1"
+        self.repo2 = MagicMock(base_url="https://fake.git/repo2.git", head="def456")
+        self.repo2.nautobot_repo_obj.name = "repo2"
+        self.repo2.nautobot_repo_obj.filesystem_path = "/repo2"
+        self.repo3 = MagicMock()
+        self.repo3.nautobot_repo_obj.filesystem_path = "/repo3"
+        self.current_repos = {
+            "1": {"repo_obj": self.repo1, "to_commit": True},
+            "2": {"repo_obj": self.repo2, "to_commit": True},
+            "3": {"repo_obj": self.repo3, "to_commit": False},
+        }
+        patcher = patch.object(jobs, "record_pushed_checkpoints")
+        self.mock_record_pushed_checkpoints = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_gc_repo_push_all_repos(self):
+        """Every repo to commit is committed with the written files and pushed."""
+        jobs.gc_repo_push(self.job, self.current_repos, commit_message="message")
+        for repo in (self.repo1, self.repo2):
+            repo.commit_with_added.assert_called_once_with(
+                "message", paths={"/repo/a.cfg"}, use_plumbing=constant.PLUGIN_CFG["git_stage_with_plumbing"]
+            )
+            repo.push.assert_called_once_with()
+        self.current_repos["3"]["repo_obj"].commit_with_added.assert_not_called()
+        self.job.logger.error.assert_not_called()
+        self.mock_record_pushed_checkpoints.assert_called_once()
+        self.assertEqual(sorted(self.mock_record_pushed_checkpoints.call_args.args[2]), ["/repo1", "/repo2", "/repo3"])
+
+    def test_gc_repo_push_failure_is_isolated(self):
+        """A failing repo is reported, the other repos are still pushed."""
+        self.repo1.push.side_effect = GitCommandError("git push", 128, stderr=b"fatal: Authentication failed")
+        with self.assertRaises(RepositoryPushFailure):
+            jobs.gc_repo_push(self.job, self.current_repos, commit_message="message")
+        self.repo2.push.assert_called_once_with()
+        self.job.logger.error.assert_called_once()
+        self.assertIn("E3035", self.job.logger.error.call_args.args[0])
+        self.assertIn("repo1", self.job.logger.error.call_args.args[0])
+        # The checkpoints of the files of the repo that failed to push are not recorded.
+        self.assertEqual(sorted(self.mock_record_pushed_checkpoints.call_args.args[2]), ["/repo2", "/repo3"])
+
+    def test_push_checkpoints(self):
+        """The files of the pending checkpoints are pushed without rebasing, a rejected push is only logged."""
+        self.job.pending_checkpoints = {"/repo1/a.cfg": (1, "backup"), "/repo2/b.cfg": (2, "backup")}
+        self.repo2.push.side_effect = GitCommandError("git push", 1, stderr=b"! [rejected] (non-fast-forward)")
+        jobs.push_checkpoints(self.job, self.current_repos, "message")
+        for repo in (self.repo1, self.repo2):
+            repo.commit_with_added.assert_called_once_with(
+                "message",
+                paths={"/repo1/a.cfg", "/repo2/b.cfg"},
+                use_plumbing=constant.PLUGIN_CFG["git_stage_with_plumbing"],
+            )
+            repo.push.assert_called_once_with(max_retries=1)
+        self.job.logger.warning.assert_called_once()
+        self.assertIn("E3035", self.job.logger.warning.call_args.args[0])
+        self.assertEqual(sorted(self.mock_record_pushed_checkpoints.call_args.args[2]), ["/repo1", "/repo3"])
+
+    @patch.dict(constant.PLUGIN_CFG, {"checkpoint_push_interval": 2})
+    @patch.object(jobs, "CHECKPOINT_PUSH_POLL_INTERVAL", 0.01)
+    @patch.object(jobs, "push_checkpoints")
+    def test_periodic_checkpoint_push(self, mock_push_checkpoints):
+        """The checkpoints are pushed while the job runs once enough of them are pending."""
+        pushed = threading.Event()
+        mock_push_checkpoints.side_effect = lambda job, *args: (job.pending_checkpoints.clear(), pushed.set())
+        with jobs.periodic_checkpoint_push(self.job, self.current_repos, "message"):
+            self.job.pending_checkpoints["/repo1/a.cfg"] = (1, "backup")
+            self.assertFalse(pushed.wait(0.1))
+            self.job.pending_checkpoints["/repo1/b.cfg"] = (2, "backup")
+            self.assertTrue(pushed.wait(5))
+        mock_push_checkpoints.assert_called_once_with(self.job, self.current_repos, "message")
+
+
+@patch.object(jobs, "GitRepo", MagicMock())
+@patch.object(jobs, "get_repo_from_url_to_path_and_from_branch", MagicMock())
+@patch.object(jobs, "is_repository_up_to_date", MagicMock(return_value=False))
+@patch.object(jobs, "ensure_git_repository")
+class GetRefreshedReposTestCase(TestCase):
+    """Test the repos in scope are derived from the device to settings map."""
+
+    def test_repos_from_device_to_settings_map(self, mock_ensure_git_repository):
+        """Only the repos of the settings of the in-scope devices are synced, once each."""
+        backup_repo, intended_repo = MagicMock(), MagicMock()
+        settings1 = MagicMock(backup_repository=backup_repo, intended_repository=intended_repo)
+        settings2 = MagicMock(backup_repository=backup_repo, intended_repository=None)
+        job = MagicMock(device_to_settings_map={1: settings1, 2: settings2, 3: settings1})
+
+        jobs.get_refreshed_repos(job, ["backup_repository", "intended_repository"], data=MagicMock())
+
+        self.assertEqual(
+            {call.args[0] for call in mock_ensure_git_repository.call_args_list}, {backup_repo, intended_repo}
+        )
+        self.assertEqual(mock_ensure_git_repository.call_count, 2)
@@ -20,6 +20,7 @@ from nautobot_golden_config.models import (
     _get_hierconfig_remediation,
 )
 from nautobot_golden_config.tests.conftest import create_git_repos
+from nautobot_golden_config.utilities.helper import update_dynamic_groups_cache
 
 from .conftest import (
     create_config_compliance,
@@ -268,9 +269,7 @@ class GoldenConfigSettingModelTestCase(TestCase):
             dynamic_group=other_dynamic_group,
         )
 
-        self.dynamic_group.update_cached_members()
-        if hasattr(device, "_dynamic_groups"):  # clear Device.dynamic_groups cache in nautobot <2.3
-            delattr(device, "_dynamic_groups")
+        update_dynamic_groups_cache(force=True)
         self.assertEqual(GoldenConfigSetting.objects.get_for_device(device), self.global_settings)
 
         other_settings.weight = 2000
@@ -282,10 +281,7 @@ class GoldenConfigSettingModelTestCase(TestCase):
         other_dynamic_group.filter = {"name": [f"{device.name} nomatch"]}
         self.dynamic_group.save()
         other_dynamic_group.save()
-        self.dynamic_group.update_cached_members()
-        other_dynamic_group.update_cached_members()
-        if hasattr(device, "_dynamic_groups"):  # clear Device.dynamic_groups cache in nautobot <2.3
-            delattr(device, "_dynamic_groups")
+        update_dynamic_groups_cache(force=True)
         self.assertIsNone(GoldenConfigSetting.objects.get_for_device(device))
 
     def test_get_jinja_template_path_for_device(self):
@@ -0,0 +1,87 @@
+"""Unit tests for config_backup.py."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
+
+from nautobot.apps.testing import TestCase
+
+from nautobot_golden_config.nornir_plays.config_backup import precheck_connectivity
+from nautobot_golden_config.tests.conftest import create_device
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+
+
+class PrecheckConnectivityTest(TestCase):
+    """Unit tests for the backup connectivity pre-check."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test fixtures."""
+        super().setUpTestData()
+        cls.reachable = create_device(name="reachable")
+        cls.unreachable = create_device(name="unreachable")
+        cls.untested = create_device(name="untested")
+
+    def setUp(self):
+        """Build a Nornir mock holding the three devices."""
+        self.logger = Mock()
+        self.nornir_obj = MagicMock()
+        self.nornir_obj.inventory.hosts = {
+            device.name: Mock(hostname=f"{device.name}.example.com", data={"obj": device, "config_context": {}})
+            for device in (self.reachable, self.unreachable, self.untested)
+        }
+        self.device_to_settings_map = {
+            self.reachable.id: Mock(backup_test_connectivity=True),
+            self.unreachable.id: Mock(backup_test_connectivity=True),
+            self.untested.id: Mock(backup_test_connectivity=False),
+        }
+
+    @patch("nautobot_golden_config.nornir_plays.config_backup.tcp_probe")
+    def test_precheck_filters_unreachable(self, mock_tcp_probe):
+        """Unreachable devices are logged and filtered out; untested devices are not probed."""
+        mock_tcp_probe.return_value = {"reachable": True, "unreachable": False}
+
+        nornir_obj = precheck_connectivity(self.nornir_obj, self.logger, self.device_to_settings_map)
+
+        self.assertEqual(
+            mock_tcp_probe.call_args.args[0],
+            {"reachable": ("reachable.example.com", 22), "unreachable": ("unreachable.example.com", 22)},
+        )
+        self.assertEqual(nornir_obj, self.nornir_obj.filter.return_value)
+        filter_func = self.nornir_obj.filter.call_args.kwargs["filter_func"]
+        self.assertEqual(
+            [name for name in self.nornir_obj.inventory.hosts if filter_func(SimpleNamespace(name=name))],
+            ["reachable", "untested"],
+        )
+        self.logger.error.assert_called_once()
+        self.assertIn("E3034", self.logger.error.call_args.args[0])
+
+    @patch("nautobot_golden_config.nornir_plays.config_backup.tcp_probe")
+    def test_precheck_all_reachable(self, mock_tcp_probe):
+        """When every device is reachable the inventory is not filtered."""
+        mock_tcp_probe.return_value = {"reachable": True, "unreachable": True}
+
+        nornir_obj = precheck_connectivity(self.nornir_obj, self.logger, self.device_to_settings_map)
+
+        self.assertIs(nornir_obj, self.nornir_obj)
+        self.nornir_obj.filter.assert_not_called()
+        self.logger.error.assert_not_called()
+
+    @patch.dict(PLUGIN_CFG, {"custom_dispatcher": {"cisco_ios": "custom.dispatcher.Driver"}})
+    @patch("nautobot_golden_config.nornir_plays.config_backup.tcp_probe")
+    def test_precheck_custom_dispatcher(self, mock_tcp_probe):
+        """Devices whose platform has a custom dispatcher are left to its own connectivity test."""
+        nornir_obj = precheck_connectivity(self.nornir_obj, self.logger, self.device_to_settings_map)
+
+        self.assertIs(nornir_obj, self.nornir_obj)
+        mock_tcp_probe.assert_not_called()
+
+    @patch("nautobot_golden_config.nornir_plays.config_backup.tcp_probe")
+    def test_precheck_no_hostname(self, mock_tcp_probe):
+        """Devices without a hostname are left to the connectivity test of their dispatcher."""
+        self.nornir_obj.inventory.hosts["unreachable"].hostname = None
+        mock_tcp_probe.return_value = {"reachable": True}
+
+        nornir_obj = precheck_connectivity(self.nornir_obj, self.logger, self.device_to_settings_map)
+
+        self.assertEqual(mock_tcp_probe.call_args.args[0], {"reachable": ("reachable.example.com", 22)})
+        self.assertIs(nornir_obj, self.nornir_obj)
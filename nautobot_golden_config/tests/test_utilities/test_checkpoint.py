@@ -0,0 +1,111 @@
+"""Unit tests for nautobot_golden_config utilities checkpoint."""
+
+from types import SimpleNamespace
+
+from nautobot.apps.testing import TestCase
+from nautobot.dcim.models import Device
+from nautobot.extras.models import Job as JobModel
+from nautobot.extras.models import JobResult
+
+from nautobot_golden_config.choices import GoldenConfigJobStageChoice
+from nautobot_golden_config.models import GoldenConfigJobCheckpoint
+from nautobot_golden_config.tests.conftest import create_device
+from nautobot_golden_config.utilities.checkpoint import (
+    defer_checkpoint,
+    get_pending_queryset,
+    get_previous_job_result,
+    record_checkpoint,
+    record_pushed_checkpoints,
+    resume_checkpoints,
+)
+
+BACKUP = GoldenConfigJobStageChoice.STAGE_BACKUP
+INTENDED = GoldenConfigJobStageChoice.STAGE_INTENDED
+
+
+class CheckpointTest(TestCase):
+    """Test recording and resuming job checkpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test fixtures."""
+        super().setUpTestData()
+        cls.device1 = create_device(name="device1")
+        cls.device2 = create_device(name="device2")
+        cls.job_model = JobModel.objects.get(module_name="nautobot_golden_config.jobs", job_class_name="BackupJob")
+        cls.other_job_model = JobModel.objects.get(
+            module_name="nautobot_golden_config.jobs", job_class_name="IntendedJob"
+        )
+
+    def _job_result(self, job_model=None):
+        return JobResult.objects.create(name="Golden Config", job_model=job_model or self.job_model)
+
+    def test_record_checkpoint_is_idempotent(self):
+        """Recording the same stage twice keeps a single checkpoint."""
+        job_result = self._job_result()
+        record_checkpoint(job_result, self.device1, BACKUP)
+        record_checkpoint(job_result, self.device1, BACKUP)
+        record_checkpoint(None, self.device2, BACKUP)
+        self.assertEqual(GoldenConfigJobCheckpoint.objects.count(), 1)
+
+    def test_record_pushed_checkpoints(self):
+        """Deferred checkpoints are only recorded for the files of the pushed repositories."""
+        job_result = self._job_result()
+        pending_checkpoints = {}
+        defer_checkpoint(pending_checkpoints, self.device1, BACKUP, "/repos/backup/device1.cfg")
+        defer_checkpoint(pending_checkpoints, self.device2, BACKUP, "/repos/backup-other/device2.cfg")
+        defer_checkpoint(None, self.device2, INTENDED, "/repos/intended/device2.cfg")
+        self.assertEqual(GoldenConfigJobCheckpoint.objects.count(), 0)
+
+        self.assertEqual(record_pushed_checkpoints(job_result, pending_checkpoints, ["/repos/backup"]), 1)
+        self.assertEqual(
+            list(GoldenConfigJobCheckpoint.objects.values_list("device", "stage")), [(self.device1.pk, BACKUP)]
+        )
+        # The recorded checkpoints are no longer pending.
+        self.assertEqual(list(pending_checkpoints), ["/repos/backup-other/device2.cfg"])
+
+    def test_get_previous_job_result(self):
+        """Only earlier runs of the same job with checkpoints are resumed from."""
+        previous = self._job_result()
+        record_checkpoint(previous, self.device1, BACKUP)
+        self._job_result()
+        record_checkpoint(self._job_result(self.other_job_model), self.device1, INTENDED)
+        current = self._job_result()
+        self.assertEqual(get_previous_job_result(current), previous)
+        self.assertIsNone(get_previous_job_result(previous))
+
+    def test_resume_checkpoints(self):
+        """Checkpoints of devices in scope are carried over to the running job."""
+        previous = self._job_result()
+        record_checkpoint(previous, self.device1, BACKUP)
+        record_checkpoint(previous, self.device1, INTENDED)
+        record_checkpoint(previous, self.device2, BACKUP)
+        current = self._job_result()
+
+        resumed_from, carried_over = resume_checkpoints(current, Device.objects.filter(pk=self.device1.pk))
+
+        self.assertEqual(resumed_from, previous)
+        self.assertEqual(carried_over, 2)
+        # Checkpoints already carried over are not counted again.
+        self.assertEqual(resume_checkpoints(current, Device.objects.filter(pk=self.device1.pk)), (previous, 0))
+        self.assertEqual(
+            set(GoldenConfigJobCheckpoint.objects.filter(job_result=current).values_list("device", "stage")),
+            {(self.device1.pk, BACKUP), (self.device1.pk, INTENDED)},
+        )
+
+    def test_resume_checkpoints_no_previous_run(self):
+        """Nothing is carried over without a previous run."""
+        self.assertEqual(resume_checkpoints(self._job_result(), Device.objects.all()), (None, 0))
+
+    def test_get_pending_queryset(self):
+        """Only devices that did not complete the stage are pending on a resumed job."""
+        current = self._job_result()
+        record_checkpoint(current, self.device1, BACKUP)
+        queryset = Device.objects.filter(pk__in=[self.device1.pk, self.device2.pk])
+
+        job = SimpleNamespace(job_result=current, qs=queryset, resumed_from=None)
+        self.assertIs(get_pending_queryset(job, BACKUP), queryset)
+
+        job.resumed_from = self._job_result()
+        self.assertEqual(list(get_pending_queryset(job, BACKUP)), [self.device2])
+        self.assertEqual(set(get_pending_queryset(job, INTENDED)), {self.device1, self.device2})
@@ -0,0 +1,92 @@
+"""Unit tests for nautobot_golden_config utilities connectivity."""
+
+import socket
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from nautobot_golden_config.utilities.connectivity import get_tcp_port, resolve_targets, tcp_probe
+
+
+class TcpProbeTest(unittest.TestCase):
+    """Test the concurrent TCP probe."""
+
+    def setUp(self):
+        """Open a listening socket and reserve a port nothing listens on."""
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(16)
+        self.open_port = self.listener.getsockname()[1]
+
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def tearDown(self):
+        """Close the listening socket."""
+        self.listener.close()
+
+    def test_tcp_probe_mixed_targets(self):
+        """Reachable, refused and unresolvable targets are all reported."""
+        results = tcp_probe(
+            {
+                "open": ("127.0.0.1", self.open_port),
+                "closed": ("127.0.0.1", self.closed_port),
+                "unresolvable": ("invalid.invalid", 22),
+            },
+            timeout=2,
+        )
+        self.assertEqual(results, {"open": True, "closed": False, "unresolvable": False})
+
+    def test_tcp_probe_respects_max_concurrency(self):
+        """More targets than the concurrency limit are still all probed."""
+        targets = {f"host{index}": ("127.0.0.1", self.open_port) for index in range(10)}
+        results = tcp_probe(targets, timeout=2, max_concurrency=3)
+        self.assertEqual(results, {key: True for key in targets})
+
+    def test_tcp_probe_no_targets(self):
+        """An empty target list returns an empty result."""
+        self.assertEqual(tcp_probe({}), {})
+
+
+class ResolveTargetsTest(unittest.TestCase):
+    """Test the concurrent resolution of the probed hosts."""
+
+    def test_resolve_targets_concurrently(self):
+        """The hosts are resolved at the same time, and each distinct target only once."""
+        address = (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 22))
+
+        def slow_getaddrinfo(*args, **kwargs):
+            time.sleep(0.2)
+            return [address]
+
+        targets = {f"host{index}": (f"host{index}.example.com", 22) for index in range(10)}
+        targets["alias"] = ("host0.example.com", 22)
+        with patch("socket.getaddrinfo", side_effect=slow_getaddrinfo) as mock_getaddrinfo:
+            start = time.monotonic()
+            results = resolve_targets(targets)
+            self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(results, {key: address for key in targets})
+        self.assertEqual(mock_getaddrinfo.call_count, 10)
+
+
+class GetTcpPortTest(unittest.TestCase):
+    """Test the management TCP port lookup."""
+
+    def test_get_tcp_port_custom_field(self):
+        """The custom field takes precedence over the config context."""
+        obj = Mock(cf={"tcp_port": 830})
+        self.assertEqual(get_tcp_port(obj, {"tcp_port": 2222}), 830)
+
+    def test_get_tcp_port_config_context(self):
+        """The config context is used when no custom field is set."""
+        obj = Mock(cf={})
+        self.assertEqual(get_tcp_port(obj, {"tcp_port": 2222}), 2222)
+        obj.get_config_context.assert_not_called()
+
+    def test_get_tcp_port_default(self):
+        """Port 22 is used when nothing is defined on the device."""
+        obj = Mock(cf={})
+        obj.get_config_context.return_value = {}
+        self.assertEqual(get_tcp_port(obj), 22)
@@ -0,0 +1,88 @@
+"""Unit tests for nautobot_golden_config utilities direct_render."""
+
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+from nornir_nautobot.exceptions import NornirNautobotException
+
+from nautobot_golden_config.utilities import direct_render
+from nautobot_golden_config.utilities.helper import get_django_env
+
+
+class DirectRenderTest(TestCase):
+    """Test the rendering of the templates without Nornir."""
+
+    def setUp(self):
+        """Create a Jinja repository and a device."""
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tempdir.cleanup)
+        with open(os.path.join(self.tempdir.name, "main.j2"), "w", encoding="utf-8") as template_file:
+            template_file.write("hostname {{ host.name | upper }}\n{% include 'ntp.j2' %}\n! {{ now.year }}")
+        with open(os.path.join(self.tempdir.name, "ntp.j2"), "w", encoding="utf-8") as template_file:
+            template_file.write("ntp server {{ ntp }} {{ obj.name }}")
+        self.device = Mock(pk=1, id=1, primary_ip=None, custom_field_data={"tcp_port": 22})
+        self.device.name = "router"
+        self.device.platform.network_driver = "cisco_ios"
+        self.device.platform.network_driver_mappings = {"netmiko": "cisco_ios", "napalm": "ios"}
+        self.device.device_type.model = "CSR1000v"
+        self.device.location.natural_slug = "site-1"
+        self.device.role.name = "edge"
+        self.device.get_config_context.return_value = {"domain": "example.com"}
+        self.logger = Mock()
+
+    def test_render_intended_config(self):
+        """The template gets the host, its data and its defaults as variables."""
+        host = direct_render.get_render_host(self.device, datetime(2024, 1, 1), {"ntp": "10.0.0.1"})
+        self.assertEqual(
+            direct_render.render_intended_config(host, self.logger, get_django_env(), self.tempdir.name, "main.j2"),
+            "hostname ROUTER\nntp server 10.0.0.1 router\n! 2024",
+        )
+
+    def test_render_host_data(self):
+        """The host has the data of the hosts of the Nornir inventory, and the template gets the logger."""
+        host = direct_render.get_render_host(self.device, datetime(2024, 1, 1), {"ntp": "10.0.0.1"})
+        self.assertEqual(
+            {key: host[key] for key in ("id", "type", "location", "role", "config_context", "custom_field_data")},
+            {
+                "id": 1,
+                "type": "CSR1000v",
+                "location": "site-1",
+                "role": "edge",
+                "config_context": {"domain": "example.com"},
+                "custom_field_data": {"tcp_port": 22},
+            },
+        )
+        self.assertEqual((host["netmiko_driver"], host["napalm_driver"]), ("cisco_ios", "ios"))
+        self.assertEqual((host.hostname, host.platform), ("router", "cisco_ios"))
+        with open(os.path.join(self.tempdir.name, "data.j2"), "w", encoding="utf-8") as template_file:
+            template_file.write("{{ role }} {{ config_context.domain }} {{ logger is defined }}")
+        self.assertEqual(
+            direct_render.render_intended_config(host, self.logger, get_django_env(), self.tempdir.name, "data.j2"),
+            "edge example.com True",
+        )
+
+    def test_render_error(self):
+        """A template error is logged and raised as the dispatcher does."""
+        host = direct_render.get_render_host(self.device, datetime(2024, 1, 1))
+        with open(os.path.join(self.tempdir.name, "error.j2"), "w", encoding="utf-8") as template_file:
+            template_file.write("{{ 1 / 0 }}")
+        with self.assertRaises(NornirNautobotException) as context:
+            direct_render.render_intended_config(host, self.logger, get_django_env(), self.tempdir.name, "error.j2")
+        self.assertIn("E1014", str(context.exception))
+        self.logger.error.assert_called_once()
+
+    def test_can_render_directly(self):
+        """Only the devices without a custom dispatcher are rendered directly, once the setting is enabled."""
+        with patch.dict(direct_render.PLUGIN_CFG, {"intended_direct_render": False}):
+            self.assertFalse(direct_render.can_render_directly(self.device))
+        with patch.dict(direct_render.PLUGIN_CFG, {"intended_direct_render": True, "custom_dispatcher": {}}):
+            self.assertTrue(direct_render.can_render_directly(self.device))
+        with patch.dict(
+            direct_render.PLUGIN_CFG,
+            {"intended_direct_render": True, "custom_dispatcher": {"cisco_ios": "mypkg.CustomDriver"}},
+        ):
+            self.assertFalse(direct_render.can_render_directly(self.device))
@@ -1,5 +1,7 @@
 """Unit tests for nautobot_golden_config utilities git."""
 
+import os
+import tempfile
 import unittest
 from unittest.mock import ANY, Mock, patch
 from urllib.parse import quote
@@ -9,7 +11,13 @@ from git.exc import GitCommandError
 from nautobot.extras.datasources.git import get_repo_from_url_to_path_and_from_branch
 from packaging import version
 
-from nautobot_golden_config.utilities.git import GitRepo
+from nautobot_golden_config.utilities import git
+from nautobot_golden_config.utilities.git import (
+    GitRepo,
+    branch_checkout_context,
+    is_repository_up_to_date,
+    prepare_sparse_repository,
+)
 
 
 class GitRepoTest(unittest.TestCase):
@@ -187,3 +195,251 @@ class GitRepoPushTest(unittest.TestCase):
         self.assertEqual(repo.remotes.origin.push.call_count, 3)
         self.assertEqual(mock_fetch.call_count, 2)
         self.assertEqual(repo.git.rebase.call_count, 2)
+
+
+@patch("nautobot.core.utils.git.os.path.isdir", Mock(return_value=True))
+@patch("nautobot.core.utils.git.Repo", autospec=True)
+class GitRepoCommitTest(unittest.TestCase):
+    """Test GitRepo.commit_with_added() staging."""
+
+    PATH = "/fake/path"
+    URL = "https://fake.git/org/repository.git"
+
+    def test_commit_without_paths_stages_working_tree(self, _mock_repo_cls):
+        """Without paths, every untracked and modified file is staged."""
+        git_repo = GitRepo(self.PATH, self.URL, base_url=self.URL)
+        repo = git_repo.repo
+        repo.untracked_files = ["new.cfg"]
+
+        git_repo.commit_with_added("message")
+
+        repo.git.add.assert_any_call(["new.cfg"])
+        repo.git.add.assert_any_call(update=True)
+        repo.index.commit.assert_called_once_with("message")
+
+    def test_commit_with_paths_stages_only_paths(self, _mock_repo_cls):
+        """Only the paths inside of the repository are staged, relative to its root."""
+        git_repo = GitRepo(self.PATH, self.URL, base_url=self.URL)
+        repo = git_repo.repo
+
+        git_repo.commit_with_added(
+            "message", paths={f"{self.PATH}/site1/b.cfg", f"{self.PATH}/a.cfg", "/other/path/c.cfg"}
+        )
+
+        repo.git.add.assert_called_once_with("--", "a.cfg", "site1/b.cfg")
+        repo.git.update_index.assert_not_called()
+        repo.index.commit.assert_called_once_with("message")
+
+    def test_commit_with_paths_using_plumbing(self, _mock_repo_cls):
+        """With plumbing, the paths are written to the index with update-index."""
+        git_repo = GitRepo(self.PATH, self.URL, base_url=self.URL)
+        repo = git_repo.repo
+
+        git_repo.commit_with_added("message", paths=[f"{self.PATH}/a.cfg"], use_plumbing=True)
+
+        repo.git.update_index.assert_called_once_with("--add", "--", "a.cfg")
+        repo.git.add.assert_not_called()
+        repo.index.commit.assert_called_once_with("message")
+
+
+@patch("nautobot_golden_config.utilities.git.Repo", autospec=True)
+class PrepareSparseRepositoryTest(unittest.TestCase):
+    """Test prepare_sparse_repository()."""
+
+    def setUp(self):
+        """Setup a reusable mock GitRepository."""
+        self.mock_obj = Mock(filesystem_path="/fake/path", remote_url="https://fake.git/org/repository.git")
+        self.mock_obj.name = "backups"
+        self.mock_obj.branch = "main"
+        self.mock_obj.secrets_group = None
+
+    def _sparse_checkout_stdin(self, mock_repo):
+        """Return the directories passed on stdin to `git sparse-checkout add`."""
+        sparse_checkout = mock_repo.return_value.git.sparse_checkout
+        sparse_checkout.side_effect = lambda *args, istream: setattr(sparse_checkout, "stdin", istream.read())
+        return sparse_checkout
+
+    @patch("nautobot_golden_config.utilities.git.os.path.isdir", Mock(return_value=False))
+    def test_partial_clone_when_missing(self, mock_repo):
+        """A missing repository is cloned as a blobless partial clone, then sparse checked out."""
+        sparse_checkout = self._sparse_checkout_stdin(mock_repo)
+        prepare_sparse_repository(self.mock_obj, {"site2", "site1", "site2"})
+
+        mock_repo.clone_from.assert_called_once_with(
+            ANY,
+            to_path="/fake/path",
+            branch="main",
+            env=ANY,
+            multi_options=["--filter=blob:none", "--sparse"],
+        )
+        sparse_checkout.assert_called_once_with("add", "--stdin", istream=ANY)
+        self.assertEqual(sparse_checkout.stdin, b"site1\nsite2\n")
+
+    @patch("nautobot_golden_config.utilities.git.os.path.isdir", Mock(return_value=True))
+    def test_sparse_checkout_when_existing(self, mock_repo):
+        """An existing repository is not cloned again, only sparse checked out."""
+        sparse_checkout = self._sparse_checkout_stdin(mock_repo)
+        prepare_sparse_repository(self.mock_obj, [])
+
+        mock_repo.clone_from.assert_not_called()
+        mock_repo.assert_called_once_with(path="/fake/path")
+        sparse_checkout.assert_called_once_with("add", "--stdin", istream=ANY)
+        self.assertEqual(sparse_checkout.stdin, b"")
+
+    @patch("nautobot_golden_config.utilities.git.os.path.isdir", Mock(return_value=True))
+    def test_full_checkout_left_as_is(self, mock_repo):
+        """An existing repository that is fully checked out is not limited to the directories."""
+        mock_repo.return_value.config_reader.return_value.get_value.return_value = False
+        prepare_sparse_repository(self.mock_obj, ["site1"])
+
+        mock_repo.return_value.git.sparse_checkout.assert_not_called()
+
+
+@patch("nautobot_golden_config.utilities.git.os.path.isdir", Mock(return_value=True))
+@patch("nautobot_golden_config.utilities.git.Repo")
+class IsRepositoryUpToDateTest(unittest.TestCase):
+    """Test is_repository_up_to_date()."""
+
+    HEAD = "a" * 40
+
+    def setUp(self):
+        """Setup a reusable mock GitRepository and clear the worker cache."""
+        self.mock_obj = Mock(pk=1, filesystem_path="/fake/path", remote_url="https://fake.git/org/repository.git")
+        self.mock_obj.name = "backups"
+        self.mock_obj.branch = "main"
+        self.mock_obj.secrets_group = None
+        git._REMOTE_HEADS.clear()  # pylint: disable=protected-access
+
+    def _local_repo(self, mock_repo, remote_head):
+        repo = mock_repo.return_value
+        repo.head.commit.hexsha = self.HEAD
+        repo.head.is_detached = False
+        repo.active_branch.name = "main"
+        repo.is_dirty.return_value = False
+        repo.git.ls_remote.return_value = f"{remote_head}\trefs/heads/main"
+        return repo
+
+    def test_up_to_date_is_cached(self, mock_repo):
+        """A repository at the remote tip does not need a sync, and the remote is not checked again right away."""
+        repo = self._local_repo(mock_repo, self.HEAD)
+        self.assertTrue(is_repository_up_to_date(self.mock_obj))
+        self.assertTrue(is_repository_up_to_date(self.mock_obj))
+        repo.git.ls_remote.assert_called_once_with(ANY, "refs/heads/main")
+
+    def test_dirty_after_cached(self, mock_repo):
+        """A repository left dirty after its remote was checked needs a sync, without checking the remote again."""
+        repo = self._local_repo(mock_repo, self.HEAD)
+        self.assertTrue(is_repository_up_to_date(self.mock_obj))
+        repo.is_dirty.return_value = True
+        self.assertFalse(is_repository_up_to_date(self.mock_obj))
+        repo.git.ls_remote.assert_called_once_with(ANY, "refs/heads/main")
+        self.assertEqual(repo.close.call_count, 2)
+
+    def test_remote_moved(self, mock_repo):
+        """A repository behind its remote needs a sync."""
+        self._local_repo(mock_repo, "b" * 40)
+        self.assertFalse(is_repository_up_to_date(self.mock_obj))
+
+    def test_dirty_working_tree(self, mock_repo):
+        """A repository with local changes needs a sync."""
+        self._local_repo(mock_repo, self.HEAD).is_dirty.return_value = True
+        self.assertFalse(is_repository_up_to_date(self.mock_obj))
+
+    def test_remote_unreachable(self, mock_repo):
+        """When the remote cannot be checked, the repository is synchronized as usual."""
+        self._local_repo(mock_repo, self.HEAD).git.ls_remote.side_effect = GitCommandError("git ls-remote", 128)
+        self.assertFalse(is_repository_up_to_date(self.mock_obj))
+
+    @patch("nautobot_golden_config.utilities.git.os.path.isdir", Mock(return_value=False))
+    def test_missing_repository(self, mock_repo):
+        """A repository not cloned yet needs a sync."""
+        self.assertFalse(is_repository_up_to_date(self.mock_obj))
+        mock_repo.assert_not_called()
+
+
+@patch("nautobot_golden_config.utilities.git.Repo")
+class BranchCheckoutContextTest(unittest.TestCase):
+    """Test branch_checkout_context()."""
+
+    HEAD = "a" * 40
+
+    def setUp(self):
+        """Setup a reusable mock GitRepository and a temporary cache directory."""
+        self.mock_obj = Mock(pk=1, filesystem_path="/fake/path", remote_url="https://fake.git/org/repository.git")
+        self.mock_obj.name = "templates"
+        self.mock_obj.branch = "main"
+        self.mock_obj.secrets_group = None
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(git.shutil.rmtree, self.cache_dir, ignore_errors=True)
+        patcher = patch.dict(
+            git.PLUGIN_CFG, {"git_branch_cache_dir": self.cache_dir, "git_branch_cache_max_size": 1024}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _mock_clone(self, mock_repo):
+        mock_repo.clone_from.side_effect = lambda url, to_path, **kwargs: os.makedirs(os.path.join(to_path, ".git"))
+        repo = mock_repo.return_value
+        repo.head.commit.hexsha = self.HEAD
+        repo.is_dirty.return_value = False
+        return repo
+
+    def test_no_cache_dir(self, mock_repo):
+        """Without a cache directory, the branch is cloned into a temporary directory."""
+        self.mock_obj.clone_to_directory_context.return_value.__enter__ = Mock(return_value="/tmp/clone")
+        self.mock_obj.clone_to_directory_context.return_value.__exit__ = Mock(return_value=False)
+        with patch.dict(git.PLUGIN_CFG, {"git_branch_cache_dir": None}):
+            with branch_checkout_context(self.mock_obj, "feature") as path:
+                self.assertEqual(path, "/tmp/clone")
+        self.mock_obj.clone_to_directory_context.assert_called_once_with(branch="feature", depth=1)
+        mock_repo.clone_from.assert_not_called()
+
+    def test_clone_then_reuse(self, mock_repo):
+        """The branch is cloned on first use, then reused while the remote branch does not move."""
+        repo = self._mock_clone(mock_repo)
+        repo.git.ls_remote.return_value = f"{self.HEAD}\trefs/heads/feature"
+
+        with branch_checkout_context(self.mock_obj, "feature") as first_path:
+            self.assertTrue(first_path.startswith(self.cache_dir))
+        with branch_checkout_context(self.mock_obj, "feature") as second_path:
+            self.assertEqual(first_path, second_path)
+
+        mock_repo.clone_from.assert_called_once_with(
+            ANY, to_path=first_path, branch="feature", depth=1, single_branch=True, env=ANY
+        )
+        repo.git.ls_remote.assert_called_once_with(ANY, "refs/heads/feature")
+        repo.git.fetch.assert_not_called()
+
+    def test_fetch_when_remote_moved(self, mock_repo):
+        """A checkout is updated in place when the tip of the remote branch moved."""
+        repo = self._mock_clone(mock_repo)
+        repo.git.ls_remote.return_value = f"{'b' * 40}\trefs/heads/feature"
+
+        with branch_checkout_context(self.mock_obj, "feature"):
+            pass
+        with branch_checkout_context(self.mock_obj, "feature"):
+            pass
+
+        mock_repo.clone_from.assert_called_once()
+        repo.git.fetch.assert_called_once_with("--depth", "1", ANY, "refs/heads/feature")
+        repo.git.reset.assert_called_once_with("--hard", "FETCH_HEAD")
+
+    def test_evict_least_recently_used(self, mock_repo):
+        """The least recently used checkouts are deleted once the cache is over its size."""
+        for age, name in enumerate(["newest", "oldest"]):
+            path = os.path.join(self.cache_dir, name)
+            os.makedirs(path)
+            with open(os.path.join(path, "file"), "wb") as data_file:
+                data_file.write(b"x" * 100)
+            os.utime(path, (1000 - age, 1000 - age))
+        keep = os.path.join(self.cache_dir, "keep")
+        os.makedirs(keep)
+        with open(os.path.join(keep, "file"), "wb") as data_file:
+            data_file.write(b"x" * 100)
+
+        git._evict_branch_checkouts(self.cache_dir, 250, keep=keep)  # pylint: disable=protected-access
+
+        self.assertFalse(os.path.isdir(os.path.join(self.cache_dir, "oldest")))
+        self.assertTrue(os.path.isdir(os.path.join(self.cache_dir, "newest")))
+        self.assertTrue(os.path.isdir(keep))
+        mock_repo.assert_not_called()
@@ -1,12 +1,26 @@
 """Unit tests for nautobot_golden_config utilities graphql."""
 
 from unittest import skip
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+from django.core.cache import cache
+from graphql import parse, print_ast
 from nautobot.apps.testing import TestCase
-from nautobot.dcim.models import Device
+from nautobot.dcim.models import Device, Interface, Location
+from nautobot.extras.models import Status
 
-from nautobot_golden_config.utilities.graphql import graph_ql_query
+from nautobot_golden_config.tests.conftest import create_device
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.graphql import (
+    SotAggBatch,
+    _batch_document,
+    _transpose,
+    _transpose_many,
+    get_sot_agg_cache_keys,
+    graph_ql_query,
+    invalidate_sot_agg_cache,
+    parse_query,
+)
 
 
 class GraphQLTest(TestCase):
@@ -26,3 +40,157 @@ class GraphQLTest(TestCase):
         self.assertEqual(result[0], 400)
         self.assertTrue(result[1]["error"])
         self.assertRegex(result[1].get("error"), r"Syntax Error GraphQL.*")
+
+
+class ParseQueryTest(TestCase):
+    """Test the cache of parsed GraphQL documents."""
+
+    def setUp(self):
+        """Start each test with an empty cache."""
+        super().setUp()
+        parse_query.cache_clear()
+
+    @patch("nautobot_golden_config.utilities.graphql.parse", wraps=parse)
+    def test_parse_query_cached(self, mock_parse):
+        """The same query text is parsed only once."""
+        query = "query ($device_id: ID!) { device(id: $device_id) { name } }"
+        self.assertIs(parse_query(query), parse_query(query))
+        parse_query("query ($device_id: ID!) { device(id: $device_id) { hostname: name } }")
+        self.assertEqual(mock_parse.call_count, 2)
+
+
+class BatchDocumentTest(TestCase):
+    """Test the rewrite of the SoT aggregation query for many devices."""
+
+    def test_batch_document(self):
+        """A single `device(id: $device_id)` selection is rewritten as a `devices` list selection."""
+        document = _batch_document(
+            parse("query ($device_id: ID!) { device(id: $device_id) { name platform { name } } }"), ["1", "2"]
+        )
+        self.assertEqual(
+            print_ast(document),
+            '{\n  devices(id: ["1", "2"]) {\n    name\n    platform {\n      name\n    }\n    _gc_batch_device_id: id\n  }\n}',
+        )
+
+    def test_batch_document_not_batchable(self):
+        """Queries not shaped as a single `device(id: $device_id)` selection are not rewritten."""
+        for query in (
+            "query ($device_id: ID!) { device(id: $device_id) { name } locations { name } }",
+            "query ($device_id: ID!) { gc: device(id: $device_id) { name } }",
+            "query ($device_id: ID!) { device(id: $device_id) { name interfaces(device_id: $device_id) { name } } }",
+            'query { device(id: "1") { name } }',
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(_batch_document(parse(query), ["1", "2"]))
+
+
+class SotAggBatchTest(TestCase):
+    """Test the chunked SoT aggregation."""
+
+    @patch("nautobot_golden_config.utilities.graphql.graph_ql_query")
+    @patch("nautobot_golden_config.utilities.graphql.graph_ql_query_batch")
+    def test_get(self, mock_batch, mock_query):
+        """The first device of a chunk runs the query for the chunk, missing devices fall back to a single query."""
+        mock_batch.side_effect = lambda _request, device_ids, _query: {
+            device_id: (200, {"id": device_id}) for device_id in device_ids if device_id != "b"
+        }
+        mock_query.return_value = (200, {"id": "single"})
+        sot_agg = SotAggBatch("request", {"a": "query", "b": "query", "c": "query"}, 2)
+
+        self.assertEqual(sot_agg.get(MagicMock(pk="a"), "query"), (200, {"id": "a"}))
+        mock_batch.assert_called_once_with("request", ["a", "b"], "query")
+        self.assertEqual(sot_agg.get(MagicMock(pk="b"), "query"), (200, {"id": "single"}))
+        self.assertEqual(mock_query.call_count, 1)
+        self.assertEqual(sot_agg.get(MagicMock(pk="c"), "query"), (200, {"id": "c"}))
+        self.assertEqual(mock_batch.call_count, 2)
+
+
+class SotAggCacheTest(TestCase):
+    """Test the keys of the SoT aggregation cache."""
+
+    def setUp(self):
+        """Start each test with an empty cache."""
+        super().setUp()
+        cache.clear()
+        self.request = MagicMock(user=MagicMock(pk=1))
+
+    def test_cache_disabled(self):
+        """No keys are returned when the cache is disabled."""
+        with patch.dict(PLUGIN_CFG, {"sot_agg_cache_ttl": 0}):
+            self.assertEqual(get_sot_agg_cache_keys(self.request, ["a"], "query"), {})
+
+    @patch.dict(PLUGIN_CFG, {"sot_agg_cache_ttl": 60})
+    def test_cache_keys(self):
+        """The keys are stable until the data of their device or of all devices is invalidated."""
+        keys = get_sot_agg_cache_keys(self.request, ["a", "b"], "query")
+        self.assertEqual(get_sot_agg_cache_keys(self.request, ["a", "b"], "query"), keys)
+        self.assertNotEqual(get_sot_agg_cache_keys(self.request, ["a"], "other query")["a"], keys["a"])
+        self.assertNotEqual(get_sot_agg_cache_keys(MagicMock(user=MagicMock(pk=2)), ["a"], "query")["a"], keys["a"])
+
+        invalidate_sot_agg_cache("a")
+        new_keys = get_sot_agg_cache_keys(self.request, ["a", "b"], "query")
+        self.assertNotEqual(new_keys["a"], keys["a"])
+        self.assertEqual(new_keys["b"], keys["b"])
+
+        invalidate_sot_agg_cache()
+        self.assertNotEqual(get_sot_agg_cache_keys(self.request, ["b"], "query")["b"], keys["b"])
+
+    @patch.dict(PLUGIN_CFG, {"sot_agg_cache_ttl": 60})
+    @patch("nautobot_golden_config.utilities.graphql.execute")
+    def test_graph_ql_query_cached(self, mock_execute):
+        """The query is executed once, the cached data is used until the device changes."""
+        mock_execute.return_value = MagicMock(errors=None, data={"device": {"name": "router"}})
+        device = MagicMock(pk="a")
+        query = "query ($device_id: ID!) { device(id: $device_id) { name } }"
+        self.assertEqual(graph_ql_query(self.request, device, query), (200, {"name": "router"}))
+        self.assertEqual(graph_ql_query(self.request, device, query), (200, {"name": "router"}))
+        self.assertEqual(mock_execute.call_count, 1)
+        invalidate_sot_agg_cache("a")
+        graph_ql_query(self.request, device, query)
+        self.assertEqual(mock_execute.call_count, 2)
+
+    @patch.dict(PLUGIN_CFG, {"sot_agg_cache_ttl": 60})
+    @patch("nautobot_golden_config.signals.invalidate_sot_agg_cache")
+    def test_invalidated_on_commit(self, mock_invalidate):
+        """The change of an object invalidates the data of its device, or of all devices, once committed."""
+        device = create_device()
+        mock_invalidate.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Interface.objects.create(
+                device=device, name="eth0", type="virtual", status=Status.objects.get_for_model(Interface).first()
+            )
+            mock_invalidate.assert_not_called()
+        self.assertTrue(callbacks)
+        mock_invalidate.assert_called_with(device.pk)
+
+        mock_invalidate.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            location = Location.objects.first()
+            location.description = "changed"
+            location.save()
+        mock_invalidate.assert_called_once_with(None)
+
+
+def batch_transposer(data_list):
+    """Batch transposer used by the tests."""
+    if any(data.get("fail") for data in data_list):
+        raise ValueError("Failed")
+    return [{**data, "batch_size": len(data_list)} for data in data_list]
+
+
+@patch.dict(PLUGIN_CFG, {"sot_agg_transposer": None, "sot_agg_batch_transposer": f"{__name__}.batch_transposer"})
+class BatchTransposerTest(TestCase):
+    """Test the batch transposer."""
+
+    def test_transpose_many(self):
+        """The data of all the devices is transposed with a single call."""
+        self.assertEqual(
+            _transpose_many({"a": {"name": "a"}, "b": {"name": "b"}}),
+            {"a": (200, {"name": "a", "batch_size": 2}), "b": (200, {"name": "b", "batch_size": 2})},
+        )
+
+    def test_transpose_many_failed(self):
+        """No result is returned when the batch transposer fails, so the devices are transposed one by one."""
+        self.assertEqual(_transpose_many({"a": {"name": "a"}, "b": {"fail": True}}), {})
+        self.assertEqual(_transpose({"name": "a"}), (200, {"name": "a", "batch_size": 1}))
+        self.assertEqual(_transpose({"fail": True}), (400, {"error": "Failed"}))
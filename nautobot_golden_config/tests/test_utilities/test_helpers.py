@@ -3,22 +3,43 @@
 import logging
 from unittest.mock import MagicMock, patch
 
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
 from django.template import engines
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from jinja2 import DictLoader, Environment
 from jinja2 import exceptions as jinja_errors
 from nautobot.dcim.models import Device, Location, LocationType, Platform
+from nautobot.extras.choices import DynamicGroupTypeChoices
 from nautobot.extras.management import populate_status_choices
 from nautobot.extras.models import DynamicGroup, GitRepository, GraphQLQuery, Status, Tag
+from nautobot_plugin_nornir.constants import NORNIR_SETTINGS
+from nautobot_plugin_nornir.plugins.inventory.nautobot_orm import NautobotORMInventory
 from nornir_nautobot.exceptions import NornirNautobotException
 
-from nautobot_golden_config.models import GoldenConfigSetting
+from nautobot_golden_config.models import GoldenConfig, GoldenConfigSetting, GoldenConfigSettingAssignment
 from nautobot_golden_config.tests.conftest import create_device, create_helper_repo, create_orphan_device
 from nautobot_golden_config.utilities.helper import (
+    DYNAMIC_GROUPS_REFRESHED_CACHE_KEY,
+    FRAMEWORK_METHODS,
+    DispatchParamsTable,
+    MemoryBytecodeCache,
     get_device_to_settings_map,
+    get_inventory_queryset,
     get_job_filter,
+    get_repository_sparse_paths,
+    invalidate_golden_config_in_sync,
+    is_golden_config_in_sync,
     null_to_empty,
+    provision_golden_configs,
     render_jinja_template,
+    set_golden_config_in_sync,
+    update_dynamic_groups_cache,
+    update_settings_assignments,
 )
 
 
@@ -318,3 +339,346 @@ class HelpersTest(TestCase):  # pylint: disable=too-many-instance-attributes
         # Regenerate the device to settings map to ensure it is up to date.
         temp_device_to_settings_map = get_device_to_settings_map(queryset=Device.objects.all())
         self.assertEqual(temp_device_to_settings_map[test_device.id], self.test_settings_a)
+
+    def test_get_repository_sparse_paths(self):
+        """Verify the directories of the files of the in-scope devices are returned for their repositories."""
+        self.test_settings_c.backup_path_template = "{{obj.location.name}}/{{obj.name}}.cfg"
+        self.test_settings_c.intended_path_template = "{{obj.name}}.cfg"
+        self.test_settings_c.save()
+        test_device = Device.objects.get(name="test_device")
+        queryset = Device.objects.filter(name="test_device")
+        device_to_settings_map = get_device_to_settings_map(queryset=queryset)
+        self.assertEqual(
+            get_repository_sparse_paths(
+                GitRepository.objects.get(name="backup-parent_region-3"), queryset, device_to_settings_map, self.logger
+            ),
+            {test_device.location.name},
+        )
+        self.assertEqual(
+            get_repository_sparse_paths(
+                GitRepository.objects.get(name="intended-parent_region-3"),
+                queryset,
+                device_to_settings_map,
+                self.logger,
+            ),
+            set(),
+        )
+        self.assertEqual(
+            get_repository_sparse_paths(
+                GitRepository.objects.get(name="backup-parent_region-1"), queryset, device_to_settings_map, self.logger
+            ),
+            set(),
+        )
+
+    def test_get_repository_sparse_paths_static_template(self):
+        """Verify a path template that does not depend on the device is not rendered for each device."""
+        self.test_settings_c.backup_path_template = "backups/all.cfg"
+        self.test_settings_c.save()
+        queryset = Device.objects.filter(name="test_device")
+        device_to_settings_map = get_device_to_settings_map(queryset=queryset)
+        with patch("nautobot_golden_config.utilities.helper.render_jinja_template") as mock_render:
+            self.assertEqual(
+                get_repository_sparse_paths(
+                    GitRepository.objects.get(name="backup-parent_region-3"),
+                    queryset,
+                    device_to_settings_map,
+                    self.logger,
+                ),
+                {"backups"},
+            )
+        mock_render.assert_not_called()
+
+    def test_update_dynamic_groups_cache_skipped_when_current(self):
+        """Verify the dynamic groups are not rebuilt while their membership is current, unless forced."""
+        with patch.dict(settings.PLUGINS_CONFIG["nautobot_golden_config"], {"dynamic_group_cache_ttl": 60}):
+            cache.delete(DYNAMIC_GROUPS_REFRESHED_CACHE_KEY)
+            with patch.object(DynamicGroup, "update_cached_members") as mock_update:
+                update_dynamic_groups_cache()
+                self.assertEqual(mock_update.call_count, 3)
+                update_dynamic_groups_cache()
+                self.assertEqual(mock_update.call_count, 3)
+                update_dynamic_groups_cache(force=True)
+                self.assertEqual(mock_update.call_count, 6)
+                self.test_settings_a.save()
+                update_dynamic_groups_cache()
+                self.assertEqual(mock_update.call_count, 9)
+
+    def test_update_dynamic_groups_cache_for_device(self):
+        """Verify a device change updates the membership without a rebuild."""
+        with patch.dict(settings.PLUGINS_CONFIG["nautobot_golden_config"], {"dynamic_group_cache_ttl": 60}):
+            update_dynamic_groups_cache(force=True)
+            test_device = Device.objects.get(name="test_device")
+            test_device.location = Location.objects.get(name="Site 4")
+            test_device.save()
+            with patch.object(DynamicGroup, "update_cached_members") as mock_update:
+                temp_device_to_settings_map = get_device_to_settings_map(queryset=Device.objects.all())
+            mock_update.assert_not_called()
+            self.assertEqual(temp_device_to_settings_map[test_device.id], self.test_settings_b)
+
+    def test_update_dynamic_groups_cache_for_device_static_group(self):
+        """Verify a static group used by a setting does not mark the membership as stale on a device change."""
+        self.test_settings_a.dynamic_group = DynamicGroup.objects.create(
+            name="static group",
+            content_type=ContentType.objects.get_for_model(Device),
+            group_type=DynamicGroupTypeChoices.TYPE_STATIC,
+        )
+        self.test_settings_a.save()
+        with patch.dict(settings.PLUGINS_CONFIG["nautobot_golden_config"], {"dynamic_group_cache_ttl": 60}):
+            update_dynamic_groups_cache(force=True)
+            Device.objects.get(name="test_device").save()
+            self.assertIsNotNone(cache.get(DYNAMIC_GROUPS_REFRESHED_CACHE_KEY))
+
+    def test_update_dynamic_groups_cache_for_existing_member(self):
+        """Verify saving a device that is already a member keeps a single membership."""
+        with patch.dict(settings.PLUGINS_CONFIG["nautobot_golden_config"], {"dynamic_group_cache_ttl": 60}):
+            update_dynamic_groups_cache(force=True)
+            test_device = Device.objects.get(name="test_device")
+            dynamic_group = get_device_to_settings_map(queryset=Device.objects.all())[test_device.id].dynamic_group
+            self.assertTrue(dynamic_group.members.filter(pk=test_device.pk).exists())
+            test_device.save()
+            test_device.save()
+            self.assertEqual(dynamic_group.members.filter(pk=test_device.pk).count(), 1)
+
+    def test_is_golden_config_in_sync_cached(self):
+        """Verify the sync status is only checked again after a GoldenConfig entry is added or deleted."""
+        test_device = Device.objects.get(name="test_device")
+        with patch.dict(settings.PLUGINS_CONFIG["nautobot_golden_config"], {"golden_config_sync_cache_ttl": 60}):
+            invalidate_golden_config_in_sync()
+            GoldenConfig.objects.filter(device=test_device).delete()
+            with patch.object(GoldenConfig, "get_dynamic_group_device_pks", return_value=set()) as mock_pks:
+                is_golden_config_in_sync()
+                self.assertEqual(mock_pks.call_count, 1)
+                is_golden_config_in_sync()
+                self.assertEqual(mock_pks.call_count, 1)
+                golden_config = GoldenConfig.objects.create(device=test_device)
+                self.assertFalse(is_golden_config_in_sync())
+                self.assertEqual(mock_pks.call_count, 2)
+                golden_config.save()
+                is_golden_config_in_sync()
+                self.assertEqual(mock_pks.call_count, 2)
+                set_golden_config_in_sync()
+                self.assertTrue(is_golden_config_in_sync())
+                self.assertEqual(mock_pks.call_count, 2)
+
+    def test_golden_config_in_sync_kept_without_membership_change(self):
+        """Verify a rebuild of an unchanged membership keeps the sync status, a bulk provisioning clears it."""
+        test_device = Device.objects.get(name="test_device")
+        GoldenConfig.objects.filter(device=test_device).delete()
+        with patch.dict(settings.PLUGINS_CONFIG["nautobot_golden_config"], {"golden_config_sync_cache_ttl": 60}):
+            update_dynamic_groups_cache(force=True)
+            set_golden_config_in_sync()
+            update_dynamic_groups_cache(force=True)
+            with patch.object(GoldenConfig, "get_dynamic_group_device_pks") as mock_pks:
+                self.assertTrue(is_golden_config_in_sync())
+                mock_pks.assert_not_called()
+            provision_golden_configs(
+                Device.objects.filter(pk=test_device.pk), "backup_last_attempt_date", timezone.now()
+            )
+            with patch.object(GoldenConfig, "get_dynamic_group_device_pks", return_value=set()) as mock_pks:
+                is_golden_config_in_sync()
+                mock_pks.assert_called_once()
+
+    def test_update_settings_assignments(self):
+        """Verify the assignments follow the dynamic groups membership and only changed rows are written."""
+        test_device = Device.objects.get(name="test_device")
+        orphan_device = Device.objects.get(name="orphan_device")
+        self.assertEqual(
+            dict(GoldenConfigSettingAssignment.objects.values_list("device_id", "golden_config_setting_id")),
+            {test_device.id: self.test_settings_c.id, orphan_device.id: self.test_settings_b.id},
+        )
+        orphan_assignment = GoldenConfigSettingAssignment.objects.get(device=orphan_device)
+
+        test_device.location = Location.objects.get(name="Site 4")
+        test_device.save()
+        self.test_settings_b.dynamic_group.update_cached_members()
+        update_settings_assignments(Device.objects.filter(pk=test_device.pk))
+
+        self.assertEqual(
+            GoldenConfigSettingAssignment.objects.get(device=test_device).golden_config_setting, self.test_settings_b
+        )
+        self.assertEqual(GoldenConfigSettingAssignment.objects.get(device=orphan_device).pk, orphan_assignment.pk)
+
+    def test_get_device_to_settings_map_reads_assignments(self):
+        """Verify the map is read from the assignments, which are only refreshed when the membership changes."""
+        test_device = Device.objects.get(name="test_device")
+        GoldenConfigSettingAssignment.objects.filter(device=test_device).update(
+            golden_config_setting=self.test_settings_a
+        )
+        queryset = Device.objects.filter(pk=test_device.pk)
+        with patch(
+            "nautobot_golden_config.utilities.helper.update_settings_assignments", wraps=update_settings_assignments
+        ) as mock_update:
+            self.assertEqual(get_device_to_settings_map(queryset=queryset), {test_device.id: self.test_settings_a})
+            mock_update.assert_not_called()
+            test_device.location = Location.objects.get(name="Site 4")
+            test_device.save()
+            self.assertEqual(get_device_to_settings_map(queryset=queryset), {test_device.id: self.test_settings_b})
+            mock_update.assert_called_once_with()
+
+    def test_update_settings_assignments_existing_row(self):
+        """Verify an assignment inserted by a concurrent refresh is updated rather than inserted again."""
+        test_device = Device.objects.get(name="test_device")
+        queryset = Device.objects.filter(pk=test_device.pk)
+        GoldenConfigSettingAssignment.objects.filter(device=test_device).update(
+            golden_config_setting=self.test_settings_a
+        )
+        with patch.object(GoldenConfigSettingAssignment.objects, "filter") as mock_filter:
+            # The refresh does not see the row inserted meanwhile.
+            mock_filter.return_value = GoldenConfigSettingAssignment.objects.none()
+            update_settings_assignments(queryset)
+        self.assertEqual(
+            GoldenConfigSettingAssignment.objects.get(device=test_device).golden_config_setting, self.test_settings_c
+        )
+
+    def test_settings_assignments_follow_weight(self):
+        """Verify a weight change is reflected in the assignments of the devices of the setting."""
+        test_device = Device.objects.get(name="test_device")
+        self.test_settings_c.weight = 3000
+        self.test_settings_c.save()
+        orphan_device = Device.objects.get(name="orphan_device")
+        self.assertEqual(
+            GoldenConfigSettingAssignment.objects.get(device=orphan_device).golden_config_setting, self.test_settings_c
+        )
+        self.assertEqual(
+            GoldenConfigSettingAssignment.objects.get(device=test_device).golden_config_setting, self.test_settings_c
+        )
+
+    def test_provision_golden_configs(self):
+        """Verify the missing GoldenConfig objects are created and the attempt date is set for all devices."""
+        test_device = Device.objects.get(name="test_device")
+        orphan_device = Device.objects.get(name="orphan_device")
+        existing = GoldenConfig.objects.create(device=test_device, backup_config="hostname test_device")
+        now = timezone.now()
+
+        golden_configs = provision_golden_configs(Device.objects.all(), "backup_last_attempt_date", now)
+
+        self.assertEqual(set(golden_configs), {test_device.id, orphan_device.id})
+        self.assertEqual(golden_configs[test_device.id].pk, existing.pk)
+        self.assertEqual(golden_configs[test_device.id].backup_last_attempt_date, now)
+        self.assertEqual(GoldenConfig.objects.get(device=orphan_device).backup_last_attempt_date, now)
+        self.assertIsNone(GoldenConfig.objects.get(device=orphan_device).intended_last_attempt_date)
+
+        golden_configs[test_device.id].backup_last_success_date = now
+        golden_configs[test_device.id].save()
+        self.assertEqual(GoldenConfig.objects.get(device=test_device).backup_config, "hostname test_device")
+
+
+class DispatchParamsTableTest(TestCase):
+    """Test DispatchParamsTable."""
+
+    def setUp(self):
+        """Replace the framework settings, read through FRAMEWORK_METHODS."""
+        super().setUp()
+        self.frameworks = {
+            "default": MagicMock(return_value={"all": "napalm", "arista_eos": "scrapli"}),
+            "get_config": MagicMock(return_value={"cisco_ios": "netmiko"}),
+            "merge_config": MagicMock(return_value={}),
+            "replace_config_framework": MagicMock(return_value={}),
+        }
+        patcher = patch.dict(FRAMEWORK_METHODS, self.frameworks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logger = MagicMock()
+
+    def test_resolution(self):
+        """The frameworks are resolved once, in the same order as dispatch_params."""
+        table = DispatchParamsTable(["get_config", "generate_config"], ["cisco_ios", "arista_eos", "cisco_ios"])
+        for _ in range(3):
+            self.assertEqual(
+                table.get("get_config", "cisco_ios", self.logger), {"method": "get_config", "framework": "netmiko"}
+            )
+        self.assertEqual(
+            table.get("get_config", "arista_eos", self.logger), {"method": "get_config", "framework": "scrapli"}
+        )
+        self.assertEqual(
+            table.get("generate_config", "cisco_ios", self.logger), {"method": "generate_config", "framework": "napalm"}
+        )
+        for get_framework in self.frameworks.values():
+            get_framework.assert_called_once_with()
+
+    def test_custom_dispatcher(self):
+        """A custom dispatcher takes precedence over the frameworks."""
+        with patch.dict(
+            settings.PLUGINS_CONFIG["nautobot_golden_config"], {"custom_dispatcher": {"cisco_ios": "mypkg.Driver"}}
+        ):
+            table = DispatchParamsTable(["get_config"], ["cisco_ios"])
+        self.assertEqual(
+            table.get("get_config", "cisco_ios", self.logger),
+            {"method": "get_config", "custom_dispatcher": "mypkg.Driver", "framework": ""},
+        )
+
+    def test_missing_framework(self):
+        """A method and platform without a framework fail when looked up, as with dispatch_params."""
+        self.frameworks["default"].return_value = {}
+        table = DispatchParamsTable(["merge_config"], ["cisco_ios"])
+        with self.assertRaises(NornirNautobotException):
+            table.get("merge_config", "cisco_ios", self.logger)
+        self.assertIn("E3022", self.logger.error.call_args.args[0])
+
+
+class InventoryQuerysetTest(TestCase):
+    """Test get_inventory_queryset."""
+
+    def test_query_budget(self):
+        """The related objects used by the inventory and the plays are fetched in the query of the devices."""
+        devices = [create_device(name="inventory1"), create_device(name="inventory2"), create_orphan_device()]
+        queryset = get_inventory_queryset(Device.objects.filter(pk__in=[device.pk for device in devices]))
+        with self.assertNumQueries(1):
+            for device in queryset:
+                self.assertEqual(device.platform.network_driver, "cisco_ios")
+                self.assertIsNotNone(device.platform.network_driver_mappings)
+                self.assertIsNotNone(device.location.name)
+                self.assertIsNotNone(device.role.name)
+                self.assertIsNotNone(device.device_type.model)
+                self.assertIsNotNone(device.status.name)
+                self.assertIsNone(device.tenant)
+                self.assertIsNone(device.primary_ip)
+                self.assertIsNotNone(device.location.natural_slug)
+                self.assertIsInstance(device.get_config_context(), dict)
+
+    def test_inventory_load_query_budget(self):
+        """Loading the Nornir inventory runs the same queries for any number of devices."""
+
+        def load_inventory(queryset):
+            return NautobotORMInventory(
+                queryset=get_inventory_queryset(queryset),
+                credentials_class=NORNIR_SETTINGS.get("credentials"),
+                params=NORNIR_SETTINGS.get("inventory_params"),
+            ).load()
+
+        devices = [create_device(name="inventory1"), create_device(name="inventory2"), create_orphan_device()]
+        load_inventory(Device.objects.filter(pk=devices[0].pk))
+        with CaptureQueriesContext(connection) as single_device_queries:
+            load_inventory(Device.objects.filter(pk=devices[1].pk))
+        with self.assertNumQueries(len(single_device_queries)):
+            inventory = load_inventory(Device.objects.filter(pk__in=[device.pk for device in devices]))
+        self.assertEqual(len(inventory.hosts), 3)
+
+    def test_distinct_queryset(self):
+        """A distinct queryset still has the config context of its devices annotated."""
+        device = create_device(name="inventory1")
+        queryset = get_inventory_queryset(Device.objects.filter(pk=device.pk).distinct())
+        self.assertEqual(list(queryset), [device])
+        self.assertTrue(hasattr(queryset.first(), "config_context_data"))
+
+
+class MemoryBytecodeCacheTest(TestCase):
+    """Test the in-memory jinja bytecode cache."""
+
+    def test_compiled_template_reused(self):
+        """A template is compiled once, and again once its source changes."""
+        bytecode_cache = MemoryBytecodeCache()
+        templates = {"main.j2": "hostname {{ name }}"}
+
+        def render():
+            jinja_env = Environment(loader=DictLoader(templates), bytecode_cache=bytecode_cache)
+            with patch.object(jinja_env, "compile", wraps=jinja_env.compile) as mock_compile:
+                output = jinja_env.get_template("main.j2").render(name="router")
+            return output, mock_compile.call_count
+
+        self.assertEqual(render(), ("hostname router", 1))
+        self.assertEqual(render(), ("hostname router", 0))
+        templates["main.j2"] = "hostname {{ name | upper }}"
+        self.assertEqual(render(), ("hostname ROUTER", 1))
+        bytecode_cache.clear()
+        self.assertEqual(render(), ("hostname ROUTER", 1))
@@ -0,0 +1,61 @@
+"""Unit tests for nautobot_golden_config utilities intended_inputs."""
+
+import os
+import tempfile
+import unittest
+
+from jinja2.sandbox import SandboxedEnvironment
+
+from nautobot_golden_config.utilities.intended_inputs import IntendedInputs, git_blob_hash
+
+
+class IntendedInputsTest(unittest.TestCase):
+    """Test the digest of the inputs of the intended configurations."""
+
+    def setUp(self):
+        """Create a Jinja repository."""
+        self.tempdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tempdir.cleanup)
+        self.root = self.tempdir.name
+        self._write("main.j2", '{% extends "base.j2" %}{% block body %}{% include "ios/ntp.j2" %}{% endblock %}')
+        self._write("base.j2", "{% block body %}{% endblock %}")
+        self._write("ios/ntp.j2", "ntp server {{ ntp }}")
+        self._write("dynamic.j2", "{% include platform ~ '.j2' %}")
+
+    def _write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as template_file:
+            template_file.write(content)
+
+    def _digest(self, template_name="main.j2", data=None):
+        return IntendedInputs(SandboxedEnvironment()).get_digest(
+            self.root, template_name, "/intended/device.cfg", data or {"ntp": "10.0.0.1"}
+        )
+
+    def test_git_blob_hash(self):
+        """The hash matches the one of `git hash-object`."""
+        self.assertEqual(git_blob_hash(b""), "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391")
+        self.assertEqual(git_blob_hash(b"hello\n"), "ce013625030ba8dba906f756967f9e9ca394464a")
+
+    def test_get_closure(self):
+        """The closure holds the templates extended and included, directly or not."""
+        closure = IntendedInputs(SandboxedEnvironment()).get_closure(self.root, "main.j2")
+        self.assertEqual(set(closure), {"main.j2", "base.j2", os.path.join("ios", "ntp.j2")})
+        self.assertEqual(closure["base.j2"], git_blob_hash(b"{% block body %}{% endblock %}"))
+
+    def test_get_closure_unknown(self):
+        """Computed or missing template names make the closure unknown."""
+        self.assertIsNone(IntendedInputs(SandboxedEnvironment()).get_closure(self.root, "dynamic.j2"))
+        self.assertIsNone(IntendedInputs(SandboxedEnvironment()).get_closure(self.root, "missing.j2"))
+        self.assertEqual(self._digest("dynamic.j2"), "")
+
+    def test_get_digest(self):
+        """The digest changes with the data and with any template of the closure."""
+        digest = self._digest()
+        self.assertEqual(self._digest(), digest)
+        self.assertNotEqual(self._digest(data={"ntp": "10.0.0.2"}), digest)
+        self._write("dynamic.j2", "changed")
+        self.assertEqual(self._digest(), digest)
+        self._write("ios/ntp.j2", "ntp server {{ ntp }} prefer")
+        self.assertNotEqual(self._digest(), digest)
@@ -0,0 +1,76 @@
+"""Unit tests for nautobot_golden_config utilities logger."""
+
+import logging
+from unittest.mock import patch
+
+from nautobot.apps.testing import TransactionTestCase
+from nautobot.extras.models import JobLogEntry, JobResult
+
+from nautobot_golden_config.tests.conftest import create_device
+from nautobot_golden_config.utilities.logger import NornirLogger
+
+
+class NornirLoggerTest(TransactionTestCase):
+    """Test the buffered NornirLogger."""
+
+    databases = ("default", "job_logs")
+
+    def setUp(self):
+        """Set up a JobResult to log to."""
+        super().setUp()
+        self.job_result = JobResult.objects.create(name="Golden Config")
+
+    def _entries(self):
+        return list(
+            JobLogEntry.objects.filter(job_result=self.job_result)
+            .order_by("created")
+            .values_list("log_level", "message", "grouping")
+        )
+
+    def test_entries_written_on_close(self):
+        """Entries below the log level are dropped, the others are written when the logger is closed."""
+        device = create_device()
+        with NornirLogger(self.job_result, logging.INFO) as logger:
+            logger.debug("Not written.")
+            logger.info("Written.", extra={"grouping": "test"})
+            logger.error("Failed.", extra={"object": device})
+        self.assertEqual(self._entries(), [("info", "Written.", "test"), ("error", "Failed.", "")])
+        self.assertEqual(JobLogEntry.objects.get(job_result=self.job_result, log_level="error").log_object, str(device))
+
+    def test_entries_without_object(self):
+        """Entries without an object, or with an object without URL, are written with empty object fields."""
+
+        class NoUrl:  # pylint: disable=too-few-public-methods
+            """Object whose URL can not be resolved."""
+
+            def __str__(self):
+                return "no-url"
+
+            def get_absolute_url(self):
+                raise NotImplementedError
+
+        with NornirLogger(self.job_result, logging.INFO) as logger:
+            logger.info("No object.")
+            logger.warning("No URL.", extra={"object": NoUrl()})
+        entries = JobLogEntry.objects.filter(job_result=self.job_result).order_by("created")
+        self.assertEqual(
+            list(entries.values_list("message", "log_object", "absolute_url")),
+            [("No object.", "", ""), ("No URL.", "no-url", "")],
+        )
+
+    @patch.object(NornirLogger, "batch_size", 2)
+    def test_entries_written_in_batches(self):
+        """Entries are written in batches of at most `batch_size`."""
+        with patch.object(NornirLogger, "_write", wraps=NornirLogger._write) as mock_write:  # pylint: disable=protected-access
+            with NornirLogger(self.job_result, logging.DEBUG) as logger:
+                for index in range(5):
+                    logger.debug(f"Message {index}.")
+        self.assertEqual(len(self._entries()), 5)
+        self.assertTrue(all(len(call.args[0]) <= 2 for call in mock_write.call_args_list))
+
+    def test_entries_after_close_written_directly(self):
+        """Entries logged after the logger is closed are written right away."""
+        logger = NornirLogger(self.job_result, logging.INFO)
+        logger.close()
+        logger.info("Late.")
+        self.assertEqual(self._entries(), [("info", "Late.", "")])
@@ -0,0 +1,46 @@
+"""Unit tests for nautobot_golden_config utilities render_pool."""
+
+import os
+import pickle
+import tempfile
+from unittest.mock import Mock
+
+from django.test import TestCase
+
+from nautobot_golden_config.utilities import render_pool
+
+
+class RenderTemplateTest(TestCase):
+    """Test the rendering of the templates in a render process."""
+
+    def setUp(self):
+        """Create a Jinja repository."""
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tempdir.cleanup)
+        with open(os.path.join(self.tempdir.name, "main.j2"), "w", encoding="utf-8") as template_file:
+            template_file.write("hostname {{ host.name | upper }} {{ host.hostname }}\n{% include 'ntp.j2' %}")
+        with open(os.path.join(self.tempdir.name, "ntp.j2"), "w", encoding="utf-8") as template_file:
+            template_file.write("ntp server {{ ntp }} {{ host['ntp'] }} {{ host.data.ntp }}")
+        self.addCleanup(render_pool._ENVIRONMENTS.clear)  # pylint: disable=protected-access
+
+    def test_render_template(self):
+        """The template is rendered with its includes and the Django filters, reusing the environment."""
+        host = render_pool.RenderHost({"ntp": "10.0.0.1"}, "router", "10.0.0.2", "cisco_ios")
+        self.assertEqual(
+            render_pool.render_template(self.tempdir.name, "main.j2", host),
+            "hostname ROUTER 10.0.0.2\nntp server 10.0.0.1 10.0.0.1 10.0.0.1",
+        )
+        jinja_env = render_pool._ENVIRONMENTS[self.tempdir.name]  # pylint: disable=protected-access
+        render_pool.render_template(self.tempdir.name, "main.j2", host)
+        self.assertIs(render_pool._ENVIRONMENTS[self.tempdir.name], jinja_env)  # pylint: disable=protected-access
+
+    def test_render_host_from_host(self):
+        """The stand-in of a Nornir host keeps its variables and attributes once pickled."""
+        nornir_host = Mock(hostname="10.0.0.2", platform="cisco_ios", data={"ntp": "10.0.0.1"})
+        nornir_host.name = "router"
+        nornir_host.items.return_value = [("ntp", "10.0.0.1"), ("now", "2024")]
+        host = pickle.loads(pickle.dumps(render_pool.RenderHost.from_host(nornir_host)))
+        self.assertEqual(dict(host), {"ntp": "10.0.0.1", "now": "2024"})
+        self.assertEqual(host.data, {"ntp": "10.0.0.1"})
+        self.assertEqual((str(host), host.hostname, host.platform), ("router", "10.0.0.2", "cisco_ios"))
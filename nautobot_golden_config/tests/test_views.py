@@ -24,6 +24,11 @@ from packaging import version
 
 from nautobot_golden_config import models, views
 from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+from nautobot_golden_config.utilities.helper import (
+    defer_compliance_matrix_update,
+    get_compliance_matrix_queryset,
+    update_compliance_matrix,
+)
 
 from .conftest import create_device_data, create_feature_rule_json, create_job_result
 
@@ -442,8 +447,8 @@ class ConfigComplianceUIViewSetTestCase(
                     # delete the permissions here so that we start from a clean slate on the next loop
                     self.remove_permissions(*required_permissions)
 
-    def test_alter_queryset(self):
-        """Test alter_queryset method returns the expected pivoted queryset."""
+    def test_filter_queryset(self):
+        """Test filter_queryset method returns the expected compliance matrix rows."""
 
         unused_features = (
             models.ComplianceFeature.objects.create(slug="unused-feature-1", name="Unused Feature 1"),
@@ -453,7 +458,8 @@ class ConfigComplianceUIViewSetTestCase(
             reverse("plugins:nautobot_golden_config:configcompliance_list")
         )
         request.user = self.user
-        queryset = views.ConfigComplianceUIViewSet(request=request, action="list").alter_queryset(request)
+        view = views.ConfigComplianceUIViewSet(request=request, action="list")
+        queryset = view.filter_queryset(view.alter_queryset(request))
         features = (
             models.ComplianceFeature.objects.filter(feature__rule__isnull=False)
             .values_list("slug", flat=True)
@@ -463,11 +469,76 @@ class ConfigComplianceUIViewSetTestCase(
         self.assertNotIn(unused_features[1].slug, features)
         self.assertGreater(len(features), 0)
         self.assertIsInstance(queryset, RestrictedQuerySet)
+        self.assertEqual(len(queryset), 4)
         for device in queryset:
             self.assertSequenceEqual(list(device.keys()), ["device", "device__name", *features])
             for feature in features:
                 self.assertIn(device[feature], [0, 1])
 
+    def test_compliance_matrix_updates(self):
+        """Test the compliance matrix follows the changes of the ConfigCompliance entries."""
+        device = Device.objects.get(name="Device 1")
+        compliance = models.ConfigCompliance.objects.filter(device=device).first()
+        feature = compliance.rule.feature.slug
+        self.assertEqual(device.config_compliance_matrix.features[feature], compliance.compliance_int)
+
+        compliance.compliance = not compliance.compliance
+        compliance.compliance_int = int(compliance.compliance)
+        compliance.save()
+        device.config_compliance_matrix.refresh_from_db()
+        self.assertEqual(device.config_compliance_matrix.features[feature], compliance.compliance_int)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            compliance.delete()
+        device.config_compliance_matrix.refresh_from_db()
+        self.assertNotIn(feature, device.config_compliance_matrix.features)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.ConfigCompliance.objects.filter(device=device).delete()
+        self.assertFalse(models.ConfigComplianceMatrix.objects.filter(device=device).exists())
+
+    def test_compliance_matrix_bulk_delete(self):
+        """Test the compliance matrix is refreshed once for the devices of a bulk delete."""
+        with mock.patch(
+            "nautobot_golden_config.utilities.helper.update_compliance_matrix", wraps=update_compliance_matrix
+        ) as mock_update:
+            with self.captureOnCommitCallbacks(execute=True):
+                models.ConfigCompliance.objects.filter(device__name__in=["Device 1", "Device 2"]).delete()
+                mock_update.assert_not_called()
+        mock_update.assert_called_once()
+        self.assertFalse(
+            models.ConfigComplianceMatrix.objects.filter(device__name__in=["Device 1", "Device 2"]).exists()
+        )
+
+    def test_compliance_matrix_filtered(self):
+        """Test the cells of a filtered queryset only come from the matching entries of each device."""
+        compliance = models.ConfigCompliance.objects.get(device__name="Device 2", rule__feature__name="TestFeature0")
+        compliance.intended = {"foo": {"bar-0": "baz"}}
+        compliance.save()
+        self.assertEqual(compliance.compliance_int, 0)
+
+        rows = {
+            row["device__name"]: row
+            for row in get_compliance_matrix_queryset(models.ConfigCompliance.objects.filter(compliance=False))
+        }
+        self.assertEqual(set(rows), {"Device 1", "Device 2", "Device 3"})
+        self.assertEqual(rows["Device 2"]["TestFeature0"], 0)
+        for feature in ("TestFeature1", "TestFeature2", "TestFeature3"):
+            self.assertIsNone(rows["Device 2"][feature])
+            self.assertEqual(rows["Device 1"][feature], 0)
+
+    def test_compliance_matrix_update_deferred(self):
+        """Test the compliance matrix is not refreshed on each save while the refresh is deferred."""
+        device = Device.objects.get(name="Device 2")
+        compliance = models.ConfigCompliance.objects.filter(device=device).first()
+        feature = compliance.rule.feature.slug
+        compliance.intended = {"foo": {"bar-0": "baz"}}
+        with defer_compliance_matrix_update():
+            compliance.save()
+        self.assertEqual(models.ConfigComplianceMatrix.objects.get(device=device).features[feature], 1)
+        update_compliance_matrix(Device.objects.filter(pk=device.pk))
+        self.assertEqual(models.ConfigComplianceMatrix.objects.get(device=device).features[feature], 0)
+
     def test_table_columns(self):
         """Test the columns of the ConfigCompliance table return the expected pivoted data."""
         response = self.client.get(reverse("plugins:nautobot_golden_config:configcompliance_list"))
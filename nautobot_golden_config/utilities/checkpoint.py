@@ -0,0 +1,141 @@
+"""Helpers to checkpoint the progress of Golden Config jobs and resume them after an interruption."""
+
+import os
+
+from nautobot.extras.models import JobResult
+
+from nautobot_golden_config.models import GoldenConfigJobCheckpoint
+
+
+def record_checkpoint(job_result, device, stage):
+    """Record that a job stage completed successfully for a device.
+
+    Args:
+        job_result (JobResult): The JobResult of the running job, nothing is recorded when `None`.
+        device (Device): The Device object the stage completed for.
+        stage (str): One of `GoldenConfigJobStageChoice`.
+    """
+    if job_result is None:
+        return
+    GoldenConfigJobCheckpoint.objects.bulk_create(
+        [GoldenConfigJobCheckpoint(job_result=job_result, device=device, stage=stage)],
+        ignore_conflicts=True,
+    )
+
+
+def defer_checkpoint(pending_checkpoints, device, stage, path):
+    """Keep the checkpoint of a stage whose output file is only kept once it is pushed, to be recorded after the push.
+
+    The repositories are reset to their remote branch when a job starts, so a file written by an interrupted run but
+    not pushed is lost, and the device must not be skipped when the job is resumed. The files are pushed every
+    `checkpoint_push_interval` devices while the job runs, so the progress of an interrupted run is kept.
+
+    Args:
+        pending_checkpoints (dict): The pending checkpoint of each output file, nothing is kept when `None`.
+        device (Device): The Device object the stage completed for.
+        stage (str): One of `GoldenConfigJobStageChoice`.
+        path (str): The path of the file written by the stage.
+    """
+    if pending_checkpoints is None:
+        return
+    pending_checkpoints[os.path.normpath(path)] = (device.pk, stage)
+
+
+def record_pushed_checkpoints(job_result, pending_checkpoints, pushed_directories):
+    """Record the pending checkpoints whose file is in one of the pushed repositories.
+
+    The recorded checkpoints are removed from `pending_checkpoints`, the ones of the other repositories are kept.
+
+    Args:
+        job_result (JobResult): The JobResult of the running job.
+        pending_checkpoints (dict): The pending checkpoint of each output file, as kept by `defer_checkpoint`.
+        pushed_directories (Iterable[str]): The directories of the repositories the files are durable in.
+
+    Returns:
+        int: The number of checkpoints recorded.
+    """
+    pushed_directories = [os.path.normpath(directory) for directory in pushed_directories]
+    # The Nornir threads may still add checkpoints, so the pending ones are copied first.
+    pushed_checkpoints = {
+        path: checkpoint
+        for path, checkpoint in pending_checkpoints.copy().items()
+        if any(os.path.commonpath([path, directory]) == directory for directory in pushed_directories)
+    }
+    checkpoints = set(pushed_checkpoints.values())
+    GoldenConfigJobCheckpoint.objects.bulk_create(
+        [
+            GoldenConfigJobCheckpoint(job_result=job_result, device_id=device_id, stage=stage)
+            for device_id, stage in checkpoints
+        ],
+        ignore_conflicts=True,
+    )
+    for path in pushed_checkpoints:
+        pending_checkpoints.pop(path, None)
+    return len(checkpoints)
+
+
+def get_previous_job_result(job_result):
+    """Return the most recent earlier run of the same job that recorded checkpoints.
+
+    Args:
+        job_result (JobResult): The JobResult of the running job.
+
+    Returns:
+        JobResult: The previous JobResult to resume from, or `None` when there is none.
+    """
+    return (
+        JobResult.objects.filter(job_model=job_result.job_model, golden_config_checkpoints__isnull=False)
+        .exclude(pk=job_result.pk)
+        .filter(date_created__lte=job_result.date_created)
+        .order_by("-date_created")
+        .distinct()
+        .first()
+    )
+
+
+def resume_checkpoints(job_result, queryset):
+    """Carry the checkpoints of the previous run of the job over to the running job.
+
+    The copied checkpoints are limited to the devices in scope of the running job, so that the running job can in
+    turn be resumed if it is interrupted as well.
+
+    Args:
+        job_result (JobResult): The JobResult of the running job.
+        queryset (QuerySet): The Device queryset in scope of the running job.
+
+    Returns:
+        tuple: The previous JobResult (or `None`) and the number of checkpoints carried over.
+    """
+    previous_job_result = get_previous_job_result(job_result)
+    if previous_job_result is None:
+        return None, 0
+    checkpoints = GoldenConfigJobCheckpoint.objects.filter(
+        job_result=previous_job_result, device__in=queryset.values("pk")
+    ).values_list("device_id", "stage")
+    current_checkpoints = GoldenConfigJobCheckpoint.objects.filter(job_result=job_result)
+    existing_count = current_checkpoints.count()
+    # With ignore_conflicts, bulk_create returns every object, inserted or not, so the rows are counted instead.
+    GoldenConfigJobCheckpoint.objects.bulk_create(
+        [
+            GoldenConfigJobCheckpoint(job_result=job_result, device_id=device_id, stage=stage)
+            for device_id, stage in checkpoints
+        ],
+        ignore_conflicts=True,
+    )
+    return previous_job_result, current_checkpoints.count() - existing_count
+
+
+def get_pending_queryset(job, stage):
+    """Return the devices in scope of the job that have not completed the stage yet.
+
+    Args:
+        job (Job): The Nautobot Job instance being run.
+        stage (str): One of `GoldenConfigJobStageChoice`.
+
+    Returns:
+        QuerySet: The Device queryset to run the stage against.
+    """
+    if job.resumed_from is None:
+        return job.qs
+    completed = GoldenConfigJobCheckpoint.objects.filter(job_result=job.job_result, stage=stage).values("device")
+    return job.qs.exclude(pk__in=completed)
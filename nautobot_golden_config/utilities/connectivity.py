@@ -0,0 +1,139 @@
+"""Helpers to check device reachability before running Nornir plays."""
+
+import errno
+import logging
+import selectors
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TCP_PORT = 22
+DEFAULT_RESOLVE_WORKERS = 32
+
+_CONNECT_IN_PROGRESS = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN}
+
+
+def get_tcp_port(obj, config_context=None):
+    """Return the management TCP port of a device, using the same lookup order as the nornir-nautobot dispatcher.
+
+    Args:
+        obj (Device): The Device object from Nautobot.
+        config_context (dict): Pre-computed config context of the device, to avoid rendering it again.
+
+    Returns:
+        int: The `tcp_port` custom field, the `tcp_port` config context key or the default port 22.
+    """
+    custom_field = obj.cf.get("tcp_port")
+    if isinstance(custom_field, int):
+        return custom_field
+    if config_context is None:
+        config_context = obj.get_config_context()
+    if isinstance(config_context.get("tcp_port"), int):
+        return config_context["tcp_port"]
+    return DEFAULT_TCP_PORT
+
+
+def _resolve(target):
+    """Resolve a ``(host, port)`` target to its first stream address info, or None when it can not be resolved."""
+    host, port = target
+    try:
+        return socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0]
+    except (socket.gaierror, UnicodeError, OSError):
+        return None
+
+
+def resolve_targets(targets, max_workers=DEFAULT_RESOLVE_WORKERS):
+    """Resolve the hosts of many targets concurrently, as ``getaddrinfo`` blocks until the DNS answers.
+
+    Args:
+        targets (dict): Mapping of an arbitrary key to a ``(host, port)`` tuple.
+        max_workers (int): Maximum number of hosts resolved at the same time.
+
+    Returns:
+        dict: Mapping of every key in ``targets`` to its address info, or None when the host can not be resolved.
+    """
+    unique_targets = list(set(targets.values()))
+    if not unique_targets:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_targets))) as executor:
+        addresses = dict(zip(unique_targets, executor.map(_resolve, unique_targets)))
+    return {key: addresses[target] for key, target in targets.items()}
+
+
+def _start_connect(address):
+    """Start a non-blocking TCP connection to a resolved address.
+
+    Returns:
+        tuple: The socket (or None) and whether the connection is already established.
+    """
+    if address is None:
+        return None, False
+    family, sock_type, proto, _, sockaddr = address
+    try:
+        sock = socket.socket(family, sock_type, proto)
+    except OSError:
+        return None, False
+    sock.setblocking(False)
+    result = sock.connect_ex(sockaddr)
+    if result not in _CONNECT_IN_PROGRESS:
+        sock.close()
+        return None, False
+    return sock, result == 0
+
+
+def tcp_probe(targets, timeout=5.0, max_concurrency=512):
+    """Concurrently check that a TCP port accepts connections on many hosts at once.
+
+    The hosts are first resolved by a thread pool, then the connections are opened with non-blocking
+    sockets and multiplexed with a selector, so the whole set of targets is probed in roughly ``timeout``
+    seconds per ``max_concurrency`` hosts that do not answer, instead of one timeout per host.
+
+    Args:
+        targets (dict): Mapping of an arbitrary key (e.g. the Nornir host name) to a ``(host, port)`` tuple.
+        timeout (float): Seconds to wait for a single connection to be established.
+        max_concurrency (int): Maximum number of connections in flight at the same time.
+
+    Returns:
+        dict: Mapping of every key in ``targets`` to ``True`` when the port accepted the connection.
+    """
+    results = {key: False for key in targets}
+    pending = iter(resolve_targets(targets, min(DEFAULT_RESOLVE_WORKERS, max_concurrency)).items())
+    in_flight = {}
+    with selectors.DefaultSelector() as selector:
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_concurrency:
+                try:
+                    key, address = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                sock, connected = _start_connect(address)
+                if connected:
+                    results[key] = True
+                    sock.close()
+                elif sock is not None:
+                    selector.register(sock, selectors.EVENT_WRITE, key)
+                    in_flight[sock] = time.monotonic() + timeout
+
+            if not in_flight:
+                break
+
+            wait = max(min(in_flight.values()) - time.monotonic(), 0)
+            for selector_key, _ in selector.select(timeout=wait):
+                sock = selector_key.fileobj
+                results[selector_key.data] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                selector.unregister(sock)
+                sock.close()
+                del in_flight[sock]
+
+            now = time.monotonic()
+            for sock in [sock for sock, deadline in in_flight.items() if deadline <= now]:
+                selector.unregister(sock)
+                sock.close()
+                del in_flight[sock]
+
+    LOGGER.debug("TCP probe completed, %s of %s target(s) reachable.", sum(results.values()), len(results))
+    return results
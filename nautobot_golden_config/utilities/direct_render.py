@@ -0,0 +1,74 @@
+"""Render intended configurations in the calling thread, without building a Nornir inventory."""
+
+from jinja2 import FileSystemLoader
+from nornir.core.inventory import Defaults, Host
+from nornir_nautobot.exceptions import NornirNautobotException
+
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
+
+
+def can_render_directly(device):
+    """Return whether the intended configuration of a device can be rendered without the dispatcher.
+
+    The `intended_direct_render` setting must be enabled, and the platform of the device must not have a custom
+    dispatcher, which may render the templates its own way.
+    """
+    if not PLUGIN_CFG.get("intended_direct_render") or device.platform is None:
+        return False
+    return not PLUGIN_CFG.get("custom_dispatcher", {}).get(device.platform.network_driver)
+
+
+def get_render_host(device, now, device_data=None):
+    """Return a Nornir host of a device holding what the templates are rendered with.
+
+    The host has the same data as the hosts of the `NautobotORMInventory` the Nornir plays use, updated with the SoT
+    aggregation data of the device as the intended play does.
+
+    Args:
+        device (Device): The device to render the intended configuration of.
+        now (datetime): The date of the render, available to the templates as `now`.
+        device_data (dict): The SoT aggregation data of the device, if already known.
+
+    Returns:
+        Host: The host, not part of any inventory and without credentials.
+    """
+    data = {
+        "id": device.id,
+        "type": device.device_type.model,
+        "location": device.location.natural_slug,
+        "role": device.role.name,
+        "config_context": dict(device.get_config_context()),
+        "custom_field_data": device.custom_field_data,
+        "obj": device,
+    }
+    for library, driver in device.platform.network_driver_mappings.items():
+        data[f"{library}_driver"] = driver
+    data.update(device_data or {})
+    return Host(
+        name=device.name or str(device.pk),
+        hostname=str(device.primary_ip.address.ip) if device.primary_ip else device.name,
+        platform=device.platform.network_driver,
+        data=data,
+        defaults=Defaults(data={"now": now}),
+    )
+
+
+def render_intended_config(host, logger, jinja_env, jinja_root_path, jinja_template):
+    """Render the template of a host the way the `generate_config` method of the default dispatcher does.
+
+    The template gets the `host` object, the `logger` and every data of the host as variables, and is loaded from the
+    `jinja_root_path` directory with `jinja_env`, whose loader is replaced as the dispatcher does.
+
+    Returns:
+        str: The rendered template.
+
+    Raises:
+        NornirNautobotException: When the template can not be rendered, logged as the dispatcher does.
+    """
+    jinja_env.loader = FileSystemLoader(jinja_root_path)
+    try:
+        return jinja_env.get_template(jinja_template).render(host=host, logger=logger, **host)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        error_msg = f"`E1014:` Failed with an unknown issue. `{error}`"
+        logger.error(error_msg, extra={"object": host.data["obj"]})
+        raise NornirNautobotException(error_msg) from error
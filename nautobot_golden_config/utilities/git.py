@@ -1,10 +1,21 @@
 """Git helper methods and class."""
 
+import fcntl
+import hashlib
 import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
 
+from git import Repo
 from git.exc import GitCommandError
 from nautobot.apps.utils import GitRepo as _GitRepo
 from nautobot.core.utils.git import GIT_ENVIRONMENT
+from nautobot.extras.datasources.git import get_repo_from_url_to_path_and_from_branch  # core-import-update
+
+from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 
 LOGGER = logging.getLogger(__name__)
 
@@ -15,6 +26,12 @@ _NON_FAST_FORWARD_MARKERS = (
     "[rejected]",
 )
 
+# Tip of the remote branch of each repository, with the time it was looked up, per worker.
+_REMOTE_HEADS = {}
+
+# Number of paths passed to a single git invocation, to stay below the command line length limit.
+_PATHS_PER_GIT_CALL = 1000
+
 
 def _is_non_fast_forward(exc: GitCommandError) -> bool:
     """Return True when a push failure looks like a non-fast-forward rejection."""
@@ -41,18 +58,44 @@ class GitRepo(_GitRepo):  # pylint: disable=too-many-instance-attributes
         self.base_url = base_url
         self.nautobot_repo_obj = nautobot_repo_obj
 
-    def commit_with_added(self, commit_description):
+    def commit_with_added(self, commit_description, paths=None, use_plumbing=False):
         """Make a force commit.
 
+        When `paths` is provided, only those paths are staged, instead of every untracked and modified file of the
+        working tree.
+
         Args:
             commit_description (str): the description of commit
+            paths (Iterable[str]): Paths written by the job, paths outside of the repository are ignored.
+            use_plumbing (bool): Write the paths to the index with `git update-index`, without scanning the working tree.
         """
         LOGGER.debug("Committing with message `%s`", commit_description)
-        self.repo.git.add(self.repo.untracked_files)
-        self.repo.git.add(update=True)
+        if paths is None:
+            self.repo.git.add(self.repo.untracked_files)
+            self.repo.git.add(update=True)
+        else:
+            relative_paths = self._relative_paths(paths)
+            LOGGER.debug("Staging %d path(s) written by the job", len(relative_paths))
+            for index in range(0, len(relative_paths), _PATHS_PER_GIT_CALL):
+                chunk = relative_paths[index : index + _PATHS_PER_GIT_CALL]
+                if use_plumbing:
+                    self.repo.git.update_index("--add", "--", *chunk)
+                else:
+                    self.repo.git.add("--", *chunk)
         self.repo.index.commit(commit_description)
         LOGGER.debug("Commit completed")
 
+    def _relative_paths(self, paths):
+        """Return the sorted paths relative to the repository root, dropping the ones outside of it."""
+        root = os.path.realpath(self.path)
+        relative_paths = set()
+        for path in paths:
+            relative_path = os.path.relpath(os.path.realpath(path), root)
+            if relative_path in (os.curdir, os.pardir) or relative_path.startswith(os.pardir + os.sep):
+                continue
+            relative_paths.add(relative_path)
+        return sorted(relative_paths)
+
     def _identity_environment(self) -> dict:
         """Retrieve identity environment variables derived from the HEAD commit."""
         head = self.repo.head.commit
@@ -98,3 +141,184 @@ class GitRepo(_GitRepo):  # pylint: disable=too-many-instance-attributes
                     LOGGER.debug("Rebase onto origin/%s failed; aborting and surfacing error.", branch)
                     self.repo.git.rebase("--abort")
                     raise
+
+
+def prepare_sparse_repository(repository_record, sparse_paths):
+    """Add the given directories to the working tree of a repository, cloning it as a blobless partial clone.
+
+    When the repository does not exist on the worker yet, it is cloned without any file content, which is then only
+    downloaded for the files checked out. The following `ensure_git_repository` fetches and checks out the repository
+    as usual, within the sparse checkout.
+
+    The clone is shared by the jobs running on the worker, so the directories are only ever added to the sparse
+    checkout, never removed, and a job never loses the files of another job running at the same time. A repository
+    already fully checked out is left as it is.
+
+    Args:
+        repository_record (GitRepository): The Nautobot GitRepository object.
+        sparse_paths (Iterable[str]): Directories, relative to the repository root, to check out. The files at the
+            root of the repository are always checked out.
+    """
+    git_info = get_repo_from_url_to_path_and_from_branch(repository_record)
+    if not os.path.isdir(repository_record.filesystem_path):
+        LOGGER.debug("Partial clone of repository %s", repository_record.name)
+        Repo.clone_from(
+            git_info.from_url,
+            to_path=repository_record.filesystem_path,
+            branch=git_info.from_branch,
+            env=GIT_ENVIRONMENT,
+            multi_options=["--filter=blob:none", "--sparse"],
+        )
+    repo = Repo(path=repository_record.filesystem_path)
+    try:
+        if not repo.config_reader().get_value("core", "sparseCheckout", False):
+            LOGGER.debug("Repository %s is fully checked out, not limiting it", repository_record.name)
+            return
+        sparse_paths = sorted(set(sparse_paths))
+        LOGGER.debug("Sparse checkout of %d directories of repository %s", len(sparse_paths), repository_record.name)
+        # The directories are passed on stdin, as there can be more of them than a command line allows.
+        with tempfile.TemporaryFile() as stdin:
+            stdin.write("".join(f"{path}\n" for path in sparse_paths).encode("utf-8"))
+            stdin.seek(0)
+            repo.git.sparse_checkout("add", "--stdin", istream=stdin)
+    finally:
+        repo.close()
+
+
+def is_repository_up_to_date(repository_record):
+    """Return whether the local clone of a repository is already at the tip of its remote branch.
+
+    The remote branch is looked up with `git ls-remote`, which is much cheaper than a fetch, and its tip is cached on
+    the worker for `git_remote_check_ttl` seconds. The local clone is checked on every call, so a working tree left
+    dirty or on another branch, for instance by a failed job, is always synchronized.
+
+    Args:
+        repository_record (GitRepository): The Nautobot GitRepository object.
+
+    Returns:
+        bool: True when the repository does not need to be synchronized.
+    """
+    if not os.path.isdir(repository_record.filesystem_path):
+        return False
+    repo = None
+    try:
+        repo = Repo(path=repository_record.filesystem_path)
+        git_info = get_repo_from_url_to_path_and_from_branch(repository_record)
+        if repo.head.is_detached or repo.active_branch.name != git_info.from_branch or repo.is_dirty():
+            return False
+        remote_head, checked = _REMOTE_HEADS.get(repository_record.pk, (None, 0))
+        if remote_head is None or time.monotonic() - checked >= PLUGIN_CFG["git_remote_check_ttl"]:
+            with repo.git.custom_environment(**GIT_ENVIRONMENT):
+                remote_refs = repo.git.ls_remote(git_info.from_url, f"refs/heads/{git_info.from_branch}")
+            remote_head = remote_refs.split("\t", 1)[0]
+            _REMOTE_HEADS[repository_record.pk] = (remote_head, time.monotonic())
+        return remote_head == repo.head.commit.hexsha
+    except (GitCommandError, ValueError) as error:
+        LOGGER.debug("Unable to compare repository %s with its remote: %s", repository_record.name, error)
+        return False
+    finally:
+        if repo is not None:
+            repo.close()
+
+
+def _get_directory_size(path):
+    """Return the size in bytes of the files of a directory."""
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _evict_branch_checkouts(cache_dir, max_size, keep):
+    """Delete the least recently used branch checkouts until the cache fits in `max_size` bytes.
+
+    The checkouts in use by other requests are never deleted, nor is `keep`, the one of the current request.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith(".lock") or path == keep or not os.path.isdir(path):
+            continue
+        entries.append((os.stat(path).st_mtime, path))
+    total_size = _get_directory_size(cache_dir)
+    for _, path in sorted(entries):
+        if total_size <= max_size:
+            return
+        with open(f"{path}.lock", "a+", encoding="utf-8") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            size = _get_directory_size(path)
+            LOGGER.debug("Evicting branch checkout %s of %d bytes", path, size)
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+
+def _refresh_branch_checkout(path, from_url, branch):
+    """Clone the branch into `path`, or update the existing checkout when the tip of the remote branch moved."""
+    if os.path.isdir(os.path.join(path, ".git")):
+        try:
+            repo = Repo(path=path)
+            with repo.git.custom_environment(**GIT_ENVIRONMENT):
+                remote_refs = repo.git.ls_remote(from_url, f"refs/heads/{branch}")
+                if not remote_refs:
+                    raise ValueError(f"Branch {branch} not found")
+                if remote_refs.split("\t", 1)[0] != repo.head.commit.hexsha or repo.is_dirty(untracked_files=True):
+                    LOGGER.debug("Updating branch checkout %s to the tip of %s", path, branch)
+                    repo.git.fetch("--depth", "1", from_url, f"refs/heads/{branch}")
+                    repo.git.reset("--hard", "FETCH_HEAD")
+                    repo.git.clean("-ffdx")
+            return
+        except (GitCommandError, ValueError) as error:
+            # A broken checkout is cloned again, a missing branch fails the clone below.
+            LOGGER.debug("Unable to update branch checkout %s, cloning it again: %s", path, error)
+            shutil.rmtree(path, ignore_errors=True)
+    LOGGER.debug("Cloning branch %s into %s", branch, path)
+    Repo.clone_from(from_url, to_path=path, branch=branch, depth=1, single_branch=True, env=GIT_ENVIRONMENT)
+
+
+@contextmanager
+def branch_checkout_context(repository_record, branch):
+    """Provide a checkout of a branch of a repository, reused by the following requests for the same branch.
+
+    The checkouts are kept under the `git_branch_cache_dir` setting, one shallow clone per repository and branch. Each
+    use checks the tip of the remote branch with `git ls-remote`, and fetches it only when it moved. Once the cache is
+    larger than `git_branch_cache_max_size` megabytes, the least recently used checkouts are deleted. The checkouts
+    are locked with `flock`, so concurrent requests of any worker process never update or delete a checkout in use.
+    Without the setting, the branch is cloned into a temporary directory as by `clone_to_directory_context`.
+
+    Args:
+        repository_record (GitRepository): The Nautobot GitRepository object.
+        branch (str): The branch to check out.
+
+    Yields:
+        str: The path of the checkout, only valid inside the context.
+    """
+    cache_dir = PLUGIN_CFG.get("git_branch_cache_dir")
+    if not cache_dir:
+        with repository_record.clone_to_directory_context(branch=branch, depth=1) as path:
+            yield path
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = hashlib.sha256(f"{repository_record.pk}:{branch}".encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, key)
+    git_info = get_repo_from_url_to_path_and_from_branch(repository_record)
+    with open(f"{path}.lock", "a+", encoding="utf-8") as lock_file:
+        while True:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            _refresh_branch_checkout(path, git_info.from_url, branch)
+            # The modification time of the directory orders the checkouts from the least recently used.
+            os.utime(path)
+            # Other requests can use the checkout at the same time, but not update or delete it. The conversion of
+            # the lock is not atomic, start over if the checkout was evicted in between.
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            if os.path.isdir(path):
+                break
+        _evict_branch_checkouts(cache_dir, PLUGIN_CFG["git_branch_cache_max_size"] * 1024 * 1024, keep=path)
+        yield path
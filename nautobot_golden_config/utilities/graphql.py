@@ -1,28 +1,155 @@
 """Example code to execute GraphQL query from the ORM."""
 
+import hashlib
 import logging
+import threading
+import uuid
+from functools import lru_cache
+from itertools import islice
 
+from django.core.cache import cache
 from django.utils.module_loading import import_string
 from graphene_django.settings import graphene_settings
-from graphql import execute, parse
+from graphql import (
+    ArgumentNode,
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    ListValueNode,
+    NameNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    StringValueNode,
+    VariableNode,
+    Visitor,
+    execute,
+    parse,
+    visit,
+)
 from graphql.error import GraphQLSyntaxError
 
 from nautobot_golden_config.utilities.constant import PLUGIN_CFG
 
 LOGGER = logging.getLogger(__name__)
 
+# Alias of the `id` field added to the batched query to match each result back to its device.
+BATCH_ID_ALIAS = "_gc_batch_device_id"
+
+SOT_AGG_CACHE_PREFIX = "nautobot_golden_config:sotagg"
+SOT_AGG_CACHE_GLOBAL_VERSION = "global"
+
+
+@lru_cache(maxsize=128)
+def parse_query(query):
+    """Parse a GraphQL query, caching the document by query text for the life of the process.
+
+    Editing a saved query changes its text, so the stale document is never looked up again and ages out of the cache.
+    """
+    return parse(query)
+
+
+def _get_cache_versions(names):
+    """Return the current version of each of the `names` SoT aggregation cache scopes, creating the missing ones."""
+    keys = {name: f"{SOT_AGG_CACHE_PREFIX}:version:{name}" for name in names}
+    versions = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in versions]
+    if missing:
+        # A new random version, rather than a default one, never matches the entries of a version that was evicted.
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {name: versions.get(key) for name, key in keys.items()}
+
+
+def get_sot_agg_cache_keys(request, device_ids, query):
+    """Return the SoT aggregation cache key of each device id, or an empty dict when the cache is disabled.
+
+    The keys hold the query text, the user the query is run as, and the versions of the device and global scopes, which
+    `invalidate_sot_agg_cache` replaces to invalidate the entries.
+    """
+    if not PLUGIN_CFG.get("sot_agg_cache_ttl"):
+        return {}
+    query_hash = hashlib.sha256(query.encode()).hexdigest()
+    user_id = getattr(getattr(request, "user", None), "pk", None)
+    versions = _get_cache_versions([SOT_AGG_CACHE_GLOBAL_VERSION, *[str(pk) for pk in device_ids]])
+    global_version = versions[SOT_AGG_CACHE_GLOBAL_VERSION]
+    return {
+        pk: f"{SOT_AGG_CACHE_PREFIX}:{pk}:{user_id}:{query_hash}:{global_version}:{versions[str(pk)]}"
+        for pk in device_ids
+    }
+
+
+def invalidate_sot_agg_cache(device_id=None):
+    """Invalidate the cached SoT aggregation data of a device, or of all devices when `device_id` is `None`."""
+    name = SOT_AGG_CACHE_GLOBAL_VERSION if device_id is None else str(device_id)
+    cache.set(f"{SOT_AGG_CACHE_PREFIX}:version:{name}", uuid.uuid4().hex, timeout=None)
+
+
+@lru_cache(maxsize=None)
+def _import_transposer(path):
+    """Import a transposer function once per process."""
+    return import_string(path)
+
+
+def _transpose(data):
+    """Run the configured transposer, if any, on the data of a single device."""
+    if PLUGIN_CFG.get("sot_agg_transposer"):
+        LOGGER.debug("GraphQL - transform data with function: `%s`", str(PLUGIN_CFG.get("sot_agg_transposer")))
+        try:
+            data = _import_transposer(PLUGIN_CFG.get("sot_agg_transposer"))(data)
+        except Exception as error:  # pylint: disable=broad-except
+            return (400, {"error": str(error)})
+    elif PLUGIN_CFG.get("sot_agg_batch_transposer"):
+        LOGGER.debug("GraphQL - transform data with function: `%s`", str(PLUGIN_CFG.get("sot_agg_batch_transposer")))
+        try:
+            data = _import_transposer(PLUGIN_CFG.get("sot_agg_batch_transposer"))([data])[0]
+        except Exception as error:  # pylint: disable=broad-except
+            return (400, {"error": str(error)})
+    return (200, data)
+
+
+def _transpose_many(data_by_device):
+    """Run the configured transposer, if any, on the data of many devices, with a single call to the batch transposer.
+
+    Returns:
+        dict: The `graph_ql_query` result of each device id, empty when the batch transposer fails so the devices are
+            transposed one by one and get their own error.
+    """
+    if not PLUGIN_CFG.get("sot_agg_batch_transposer") or not data_by_device:
+        return {pk: _transpose(data) for pk, data in data_by_device.items()}
+    LOGGER.debug("GraphQL - transform data of %d devices with batch function", len(data_by_device))
+    try:
+        transposed = list(_import_transposer(PLUGIN_CFG.get("sot_agg_batch_transposer"))(list(data_by_device.values())))
+    except Exception as error:  # pylint: disable=broad-except
+        LOGGER.debug("GraphQL - batch transform failed, running it per device: `%s`", str(error))
+        return {}
+    if len(transposed) != len(data_by_device):
+        LOGGER.debug(
+            "GraphQL - batch transform returned %d results for %d devices", len(transposed), len(data_by_device)
+        )
+        return {}
+    return {pk: (200, data) for pk, data in zip(data_by_device, transposed)}
+
 
 def graph_ql_query(request, device, query):
     """Function to run graphql and transposer command."""
     LOGGER.debug("GraphQL - request for `%s`", str(device))
     schema = graphene_settings.SCHEMA.graphql_schema
 
+    cache_key = get_sot_agg_cache_keys(request, [device.pk], query).get(device.pk)
+    if cache_key:
+        data = cache.get(cache_key)
+        if data is not None:
+            LOGGER.debug("GraphQL - data found in cache")
+            return _transpose(data)
+
     LOGGER.debug("GraphQL - set query variable to device.")
     variables = {"device_id": str(device.pk)}
 
     try:
         LOGGER.debug("GraphQL - test query: `%s`", str(query))
-        document = parse(query)
+        document = parse_query(query)
 
     except GraphQLSyntaxError as error:
         LOGGER.warning("GraphQL - test query Failed: `%s`", str(query))
@@ -38,13 +165,211 @@ def graph_ql_query(request, device, query):
     data = result.data
 
     data = data.get("device", {})
+    if cache_key:
+        cache.set(cache_key, data, PLUGIN_CFG["sot_agg_cache_ttl"])
 
-    if PLUGIN_CFG.get("sot_agg_transposer"):
-        LOGGER.debug("GraphQL - transform data with function: `%s`", str(PLUGIN_CFG.get("sot_agg_transposer")))
-        try:
-            data = import_string(PLUGIN_CFG.get("sot_agg_transposer"))(data)
-        except Exception as error:  # pylint: disable=broad-except
-            return (400, {"error": str(error)})
+    status, data = _transpose(data)
+    if status == 200:  # noqa: PLR2004
+        LOGGER.debug("GraphQL - request successful")
+    return (status, data)
 
-    LOGGER.debug("GraphQL - request successful")
-    return (200, data)
+
+class _DeviceIdVariableCounter(Visitor):
+    """Count the uses of the `$device_id` variable."""
+
+    def __init__(self):
+        """Initialize the counter."""
+        super().__init__()
+        self.count = 0
+
+    def enter_variable(self, node, *_args):
+        """Count a use of the variable."""
+        if node.name.value == "device_id":
+            self.count += 1
+
+
+def _batch_document(document, device_ids):
+    """Rewrite a `device(id: $device_id)` document to select the same fields for a list of devices.
+
+    Args:
+        document (DocumentNode): The parsed SoT aggregation query.
+        device_ids (list): The ids of the devices to select.
+
+    Returns:
+        DocumentNode: The `devices(id: [...])` document, or `None` when the query is not shaped as a single
+            `device(id: $device_id)` selection and must be run device by device.
+    """
+    operations = [node for node in document.definitions if isinstance(node, OperationDefinitionNode)]
+    fragments = [node for node in document.definitions if isinstance(node, FragmentDefinitionNode)]
+    if len(operations) != 1 or len(operations) + len(fragments) != len(document.definitions):
+        return None
+    operation = operations[0]
+    if operation.operation != OperationType.QUERY or len(operation.selection_set.selections) != 1:
+        return None
+    field = operation.selection_set.selections[0]
+    if (
+        not isinstance(field, FieldNode)
+        or field.name.value != "device"
+        or field.alias
+        or field.directives
+        or not field.selection_set
+        or len(field.arguments) != 1
+        or field.arguments[0].name.value != "id"
+        or not isinstance(field.arguments[0].value, VariableNode)
+        or field.arguments[0].value.name.value != "device_id"
+    ):
+        return None
+    # `$device_id` has to be used by the `device` field only, it has no single value in the batched query.
+    counter = _DeviceIdVariableCounter()
+    for node in [operation.selection_set, *fragments]:
+        visit(node, counter)
+    if counter.count != 1:
+        return None
+
+    # The alias is selected last, so the remaining keys of each device keep the order of the original query.
+    batch_field = FieldNode(
+        alias=None,
+        name=NameNode(value="devices"),
+        arguments=(
+            ArgumentNode(
+                name=NameNode(value="id"),
+                value=ListValueNode(values=tuple(StringValueNode(value=str(pk)) for pk in device_ids)),
+            ),
+        ),
+        directives=(),
+        selection_set=SelectionSetNode(
+            selections=(
+                *field.selection_set.selections,
+                FieldNode(
+                    alias=NameNode(value=BATCH_ID_ALIAS),
+                    name=NameNode(value="id"),
+                    arguments=(),
+                    directives=(),
+                    selection_set=None,
+                ),
+            )
+        ),
+    )
+    batch_operation = OperationDefinitionNode(
+        operation=operation.operation,
+        name=operation.name,
+        variable_definitions=tuple(
+            definition
+            for definition in operation.variable_definitions or ()
+            if definition.variable.name.value != "device_id"
+        ),
+        directives=operation.directives,
+        selection_set=SelectionSetNode(selections=(batch_field,)),
+    )
+    return DocumentNode(definitions=(batch_operation, *fragments))
+
+
+def _get_batch_data(request, device_ids, query):
+    """Return the GraphQL data of the devices found in the cache or by a single GraphQL execution, not transposed."""
+    cache_keys = get_sot_agg_cache_keys(request, device_ids, query)
+    cached = cache.get_many(cache_keys.values()) if cache_keys else {}
+    batch_data = {pk: cached[cache_keys[pk]] for pk in device_ids if cache_keys.get(pk) in cached}
+    device_ids = [pk for pk in device_ids if pk not in batch_data]
+    if not device_ids:
+        return batch_data
+
+    try:
+        document = _batch_document(parse_query(query), device_ids)
+    except GraphQLSyntaxError:
+        return batch_data
+    if document is None:
+        LOGGER.debug("GraphQL - query can not be batched, running it per device.")
+        return batch_data
+
+    LOGGER.debug("GraphQL - execute batched query for %d devices", len(device_ids))
+    schema = graphene_settings.SCHEMA.graphql_schema
+    result = execute(schema=schema, document=document, context_value=request, variable_values={})
+    if result.errors:
+        LOGGER.debug("GraphQL - batched query executed unsuccessfully, running it per device.")
+        return batch_data
+
+    executed_data = {}
+    for data in result.data.get("devices") or []:
+        executed_data[data.pop(BATCH_ID_ALIAS)] = data
+    executed_data = {pk: executed_data[str(pk)] for pk in device_ids if str(pk) in executed_data}
+    if cache_keys:
+        cache.set_many({cache_keys[pk]: data for pk, data in executed_data.items()}, PLUGIN_CFG["sot_agg_cache_ttl"])
+    batch_data.update(executed_data)
+    return batch_data
+
+
+def graph_ql_query_batch(request, device_ids, query):
+    """Run the SoT aggregation query of many devices with a single GraphQL execution.
+
+    Args:
+        request (Request): The request, used as context of the GraphQL execution.
+        device_ids (list): The ids of the devices to run the query for.
+        query (str): The SoT aggregation query, expecting a `$device_id` variable.
+
+    Returns:
+        dict: The `graph_ql_query` result of each device id. Devices left out, or all of them when the query cannot
+            be batched or fails, have to be queried with `graph_ql_query` to get their result or error.
+    """
+    return _transpose_many(_get_batch_data(request, device_ids, query))
+
+
+class SotAggBatch:
+    """Run the SoT aggregation queries of the devices of a job in chunks, handing out the data device by device.
+
+    The first device of a chunk to be requested runs the query for the whole chunk, the other devices pick up their
+    data from it. Devices that could not be batched fall back to `graph_ql_query`, so the results are always the same
+    as running the query per device.
+    """
+
+    def __init__(self, request, device_queries, batch_size):
+        """Initialize the object.
+
+        Args:
+            request (Request): The request, used as context of the GraphQL executions.
+            device_queries (dict): The SoT aggregation query of each device id, in the expected order of requests.
+            batch_size (int): The maximum number of devices to run a query for at once, `0` or `1` runs every query per
+                device.
+        """
+        self.request = request
+        self.batch_size = batch_size
+        self._pending = {}
+        if batch_size > 1:
+            for device_id, query in device_queries.items():
+                self._pending.setdefault(query, {})[device_id] = None
+        self._in_flight = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get(self, device, query):
+        """Return the `graph_ql_query` result of a device."""
+        chunk = None
+        with self._lock:
+            event = self._in_flight.get(device.pk)
+            pending = self._pending.get(query, {})
+            if event is None and device.pk in pending:
+                del pending[device.pk]
+                chunk = [device.pk, *islice(pending, self.batch_size - 1)]
+                for device_id in chunk[1:]:
+                    del pending[device_id]
+                event = threading.Event()
+                for device_id in chunk:
+                    self._in_flight[device_id] = event
+
+        if chunk:
+            results = {}
+            try:
+                results = graph_ql_query_batch(self.request, chunk, query)
+            finally:
+                with self._lock:
+                    self._results.update(results)
+                    for device_id in chunk:
+                        del self._in_flight[device_id]
+                event.set()
+        elif event is not None:
+            event.wait()
+
+        with self._lock:
+            result = self._results.pop(device.pk, None)
+        if result is None:
+            return graph_ql_query(self.request, device, query)
+        return result
@@ -1,30 +1,45 @@
 """Helper functions."""
 
 # pylint: disable=raise-missing-from
+import hashlib
 import json
+import os
+import threading
+from contextlib import contextmanager
 from copy import deepcopy
+from types import MappingProxyType
 
 from django.conf import settings
 from django.contrib import messages
-from django.db.models import OuterRef, Q, Subquery
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Q, Subquery
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
 from django.template import engines
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.html import format_html
+from jinja2 import BytecodeCache, FileSystemBytecodeCache
 from jinja2 import exceptions as jinja_errors
 from jinja2.sandbox import SandboxedEnvironment
 from lxml import etree
 from nautobot.apps.utils import render_jinja2
 from nautobot.dcim.filters import DeviceFilterSet
-from nautobot.dcim.models import Device
+from nautobot.dcim.models import Device, Location
 from nautobot.extras.choices import DynamicGroupTypeChoices  # core-import-update
-from nautobot.extras.models import Job
+from nautobot.extras.models import Job, StaticGroupAssociation
 from nornir_nautobot.exceptions import NornirNautobotException
 
 from nautobot_golden_config import config as app_config
 from nautobot_golden_config import models
 from nautobot_golden_config.error_codes import ERROR_CODES
 from nautobot_golden_config.utilities import utils
-from nautobot_golden_config.utilities.constant import JINJA_ENV
+from nautobot_golden_config.utilities.constant import JINJA_ENV, PLUGIN_CFG
+
+DYNAMIC_GROUPS_REFRESHED_CACHE_KEY = "nautobot_golden_config:dynamic_groups_refreshed"
+GOLDEN_CONFIG_IN_SYNC_CACHE_KEY = "nautobot_golden_config:golden_config_in_sync"
+DYNAMIC_GROUPS_MEMBERSHIP_CACHE_KEY = "nautobot_golden_config:dynamic_groups_membership"
 
 FRAMEWORK_METHODS = {
     "default": utils.default_framework,
@@ -47,6 +62,19 @@ FIELDS_PK = {
 
 FIELDS_NAME = {"tags", "status"}
 
+# The related objects of a device the Nornir inventory, the plays and the usual path templates access.
+INVENTORY_RELATED_FIELDS = (
+    "device_type",
+    "location",
+    "platform",
+    "primary_ip4",
+    "primary_ip6",
+    "role",
+    "secrets_group",
+    "status",
+    "tenant",
+)
+
 
 def get_job_filter(data=None):
     """Helper function to return a the filterable list of OS's based on platform.name and a specific custom value."""
@@ -100,6 +128,20 @@ def get_job_filter(data=None):
     return devices_filtered.qs
 
 
+def get_inventory_queryset(queryset):
+    """Return the devices of `queryset` to build a Nornir inventory from, with their related objects fetched at once.
+
+    The inventory and the tasks access the platform, location, role and so on of every device, which otherwise runs
+    queries for each of them. The parents of the locations are fetched for their natural slug, and the config context
+    of the devices is annotated. As the config context can not be annotated on a `distinct()` queryset, such a
+    queryset is filtered by the primary keys of its devices instead.
+    """
+    if queryset.query.distinct:
+        queryset = queryset.model.objects.filter(pk__in=queryset.values("pk"))
+    location_parents = "location" + "__parent" * Location.objects.max_tree_depth()
+    return queryset.select_related(*INVENTORY_RELATED_FIELDS, location_parents).with_config_context()
+
+
 def null_to_empty(val):
     """Convert to empty string if the value is currently null."""
     if not val:
@@ -116,6 +158,51 @@ def verify_settings(logger, global_settings, attrs):
             raise NornirNautobotException(error_msg)
 
 
+class MemoryBytecodeCache(BytecodeCache):
+    """Jinja bytecode cache kept in memory, shared by all the threads of a process."""
+
+    def __init__(self):
+        """Initialize the object."""
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def load_bytecode(self, bucket):
+        """Load the compiled template of the bucket, if any."""
+        with self._lock:
+            bytecode = self._cache.get(bucket.key)
+        if bytecode is not None:
+            bucket.bytecode_from_string(bytecode)
+
+    def dump_bytecode(self, bucket):
+        """Store the compiled template of the bucket."""
+        bytecode = bucket.bytecode_to_string()
+        with self._lock:
+            self._cache[bucket.key] = bytecode
+
+    def clear(self):
+        """Drop all the compiled templates."""
+        with self._lock:
+            self._cache.clear()
+
+
+def _get_jinja_bytecode_cache():
+    """Build the bytecode cache of the jinja environments returned by `get_django_env`.
+
+    Jinja keys the compiled templates by template path and discards them when the checksum of the template source
+    changes, so templates are only compiled again once they are changed by a repository sync.
+    """
+    if not PLUGIN_CFG.get("jinja_bytecode_cache_dir"):
+        return MemoryBytecodeCache()
+    # The compiled code depends on the environment options, the file names keep apart the caches of other options.
+    options_hash = hashlib.sha1(repr(sorted(JINJA_ENV.items())).encode(), usedforsecurity=False).hexdigest()[:12]
+    directory = PLUGIN_CFG["jinja_bytecode_cache_dir"]
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory, pattern=f"__nautobot_golden_config_{options_hash}_%s.cache")
+
+
+JINJA_BYTECODE_CACHE = _get_jinja_bytecode_cache()
+
+
 def get_django_env():
     """Load Django Jinja filters from the Django jinja template engine, and add them to the jinja_env.
 
@@ -124,6 +211,7 @@ def get_django_env():
     """
     # Use a custom Jinja2 environment instead of Django's to avoid HTML escaping
     jinja_env = SandboxedEnvironment(**JINJA_ENV)
+    jinja_env.bytecode_cache = JINJA_BYTECODE_CACHE
     jinja_env.filters = engines["jinja"].env.filters
     return jinja_env
 
@@ -174,9 +262,39 @@ def render_jinja_template(obj, logger, template):
 
 
 def get_device_to_settings_map(queryset):
-    """Helper function to map heightest weighted GC settings to devices."""
+    """Helper function to map heightest weighted GC settings to devices.
+
+    The settings are read from the GoldenConfigSettingAssignment table, which is refreshed when the dynamic groups
+    membership is rebuilt, a device is changed or a GoldenConfigSetting is saved.
+    """
     update_dynamic_groups_cache()
-    annotated_queryset = queryset.all().annotate(
+    gcs = {
+        gc.id: gc
+        for gc in models.GoldenConfigSetting.objects.select_related(
+            "backup_repository", "intended_repository", "jinja_repository"
+        )
+    }
+    assignments = models.GoldenConfigSettingAssignment.objects.filter(device__in=queryset.values("pk")).values_list(
+        "device_id", "golden_config_setting_id"
+    )
+    return {device_id: gcs[setting_id] for device_id, setting_id in assignments}
+
+
+def update_settings_assignments(queryset=None):
+    """Refresh the highest weighted GC setting assigned to devices from the dynamic groups membership.
+
+    Only the assignments that changed are written. An assignment inserted meanwhile by a concurrent refresh is updated
+    instead.
+
+    Args:
+        queryset (QuerySet): The Device queryset to refresh, all devices when `None`.
+    """
+    if queryset is None:
+        queryset = Device.objects.all()
+        current_assignments = models.GoldenConfigSettingAssignment.objects.all()
+    else:
+        current_assignments = models.GoldenConfigSettingAssignment.objects.filter(device__in=queryset.values("pk"))
+    annotated_queryset = queryset.annotate(
         gc_settings=Subquery(
             models.GoldenConfigSetting.objects.filter(
                 dynamic_group__static_group_associations__associated_object_id=OuterRef("id"),
@@ -188,8 +306,226 @@ def get_device_to_settings_map(queryset):
             .values("id")[:1]
         )
     )
-    gcs = {gc.id: gc for gc in models.GoldenConfigSetting.objects.all()}
-    return {device.id: gcs[device.gc_settings] for device in annotated_queryset}
+    winning_settings = dict(annotated_queryset.filter(gc_settings__isnull=False).values_list("id", "gc_settings"))
+    current_settings = dict(current_assignments.values_list("device_id", "golden_config_setting_id"))
+    with transaction.atomic():
+        models.GoldenConfigSettingAssignment.objects.filter(
+            device_id__in=[device_id for device_id in current_settings if device_id not in winning_settings]
+        ).delete()
+        models.GoldenConfigSettingAssignment.objects.bulk_create(
+            [
+                models.GoldenConfigSettingAssignment(device_id=device_id, golden_config_setting_id=setting_id)
+                for device_id, setting_id in winning_settings.items()
+                if current_settings.get(device_id) != setting_id
+            ],
+            update_conflicts=True,
+            unique_fields=["device"],
+            update_fields=["golden_config_setting"],
+        )
+
+
+# Whether the ConfigCompliance signals of the current thread leave the compliance matrix refresh to the caller.
+_compliance_matrix_state = threading.local()
+
+
+@contextmanager
+def defer_compliance_matrix_update():
+    """Skip the compliance matrix refresh of each ConfigCompliance saved or deleted in the calling thread.
+
+    Used by the callers saving many entries of a device, which then refresh the matrix row of the device once.
+    """
+    _compliance_matrix_state.deferred = True
+    try:
+        yield
+    finally:
+        _compliance_matrix_state.deferred = False
+
+
+def is_compliance_matrix_update_deferred():
+    """Return whether the compliance matrix refresh is deferred in the calling thread."""
+    return getattr(_compliance_matrix_state, "deferred", False)
+
+
+def schedule_compliance_matrix_update(device_id):
+    """Refresh the compliance matrix row of a device once the current transaction is committed.
+
+    The devices of the ConfigCompliance entries deleted in a transaction, e.g. by a bulk delete or a cascade, are
+    collected and refreshed by a single update.
+
+    Args:
+        device_id (UUID): The id of the Device to refresh.
+    """
+    pending_device_ids = getattr(_compliance_matrix_state, "pending_device_ids", None)
+    if pending_device_ids is None:
+        pending_device_ids = _compliance_matrix_state.pending_device_ids = set()
+    pending_device_ids.add(device_id)
+    # Registered for each device, as the callbacks of a rolled back transaction are dropped; only the first callback
+    # run finds devices to refresh.
+    transaction.on_commit(_run_scheduled_compliance_matrix_update)
+
+
+def _run_scheduled_compliance_matrix_update():
+    """Refresh the compliance matrix rows of the devices collected by `schedule_compliance_matrix_update`."""
+    device_ids = getattr(_compliance_matrix_state, "pending_device_ids", None)
+    _compliance_matrix_state.pending_device_ids = set()
+    if device_ids:
+        update_compliance_matrix(Device.objects.filter(pk__in=device_ids))
+
+
+def update_compliance_matrix(queryset=None):
+    """Refresh the compliance matrix rows of devices from their ConfigCompliance entries.
+
+    Only the rows that changed are written. As with the pivot the matrix replaces, the highest compliance_int wins when
+    several rules of a device share a feature.
+
+    Args:
+        queryset (QuerySet): The Device queryset to refresh, all devices when `None`.
+    """
+    compliance = models.ConfigCompliance.objects.all()
+    current_rows = models.ConfigComplianceMatrix.objects.all()
+    if queryset is not None:
+        compliance = compliance.filter(device__in=queryset.values("pk"))
+        current_rows = current_rows.filter(device__in=queryset.values("pk"))
+    matrix = {}
+    for entry in (
+        compliance.values("device_id", "rule__feature__slug").order_by().annotate(compliance_int=Max("compliance_int"))
+    ):
+        features = matrix.setdefault(entry["device_id"], {})
+        if entry["compliance_int"] is not None:
+            features[entry["rule__feature__slug"]] = entry["compliance_int"]
+    current_matrix = dict(current_rows.values_list("device_id", "features"))
+    with transaction.atomic():
+        models.ConfigComplianceMatrix.objects.filter(
+            device_id__in=[device_id for device_id in current_matrix if device_id not in matrix]
+        ).delete()
+        models.ConfigComplianceMatrix.objects.bulk_create(
+            [
+                models.ConfigComplianceMatrix(device_id=device_id, features=features)
+                for device_id, features in matrix.items()
+                if device_id not in current_matrix
+            ],
+            batch_size=1000,
+        )
+        changed_rows = list(
+            models.ConfigComplianceMatrix.objects.filter(
+                device_id__in=[
+                    device_id
+                    for device_id, features in matrix.items()
+                    if device_id in current_matrix and current_matrix[device_id] != features
+                ]
+            )
+        )
+        for row in changed_rows:
+            row.features = matrix[row.device_id]
+        models.ConfigComplianceMatrix.objects.bulk_update(changed_rows, ["features"], batch_size=1000)
+
+
+def get_compliance_matrix_queryset(compliance_queryset):
+    """Return the compliance of each device and feature of a ConfigCompliance queryset, read from the compliance matrix.
+
+    The rows are dictionaries with the `device` id, the `device__name` and the compliance_int of each feature slug, the
+    shape `django_pivot.pivot` gave them. When the ConfigCompliance queryset is filtered or restricted, only its devices
+    are included, and each cell is computed from the matching entries of the device only, as the pivot did, so a cell
+    without a matching entry is empty.
+
+    Args:
+        compliance_queryset (QuerySet): The ConfigCompliance queryset.
+
+    Returns:
+        QuerySet: The ConfigComplianceMatrix values queryset, ordered by device name.
+    """
+    matrix = models.ConfigComplianceMatrix.objects.all()
+    filtered = compliance_queryset.query.has_filters()
+    if filtered:
+        matrix = matrix.filter(device__in=compliance_queryset.values("device"))
+    # Every feature with a rule gets a column, so the table can be sorted by any of them.
+    features = models.ComplianceFeature.objects.filter(feature__isnull=False).values_list("slug", flat=True).distinct()
+    columns = {}
+    for feature in features:
+        if filtered:
+            columns[feature] = Subquery(
+                compliance_queryset.filter(device=OuterRef("device"), rule__feature__slug=feature)
+                .order_by()
+                .values("device")
+                .annotate(compliance_int=Max("compliance_int"))
+                .values("compliance_int"),
+                output_field=IntegerField(),
+            )
+        else:
+            columns[feature] = Cast(KeyTextTransform(feature, "features"), output_field=IntegerField())
+    return matrix.annotate(**columns).values("device", "device__name", *columns).order_by("device__name")
+
+
+def get_repository_sparse_paths(repository_record, queryset, device_to_settings_map, logger):
+    """Return the directories of the backup and intended files stored in a repository by the devices in scope.
+
+    A path template that does not depend on the device is used once as is, the others are rendered for each device,
+    with the related objects of the devices fetched along with them.
+
+    Args:
+        repository_record (GitRepository): The Nautobot GitRepository object.
+        queryset (QuerySet): The Device queryset in scope of the job.
+        device_to_settings_map (dict): The GoldenConfigSetting of each device id.
+        logger (logging.logger): Logger to log error messages to.
+
+    Returns:
+        set: The directories, relative to the repository root, the root of the repository is not included.
+    """
+    sparse_paths = set()
+    device_templates = {}
+    for gc_setting in set(device_to_settings_map.values()):
+        for repo_type, path_template in (
+            ("backup_repository", "backup_path_template"),
+            ("intended_repository", "intended_path_template"),
+        ):
+            if getattr(gc_setting, f"{repo_type}_id") != repository_record.id:
+                continue
+            template = getattr(gc_setting, path_template) or ""
+            # Any Jinja delimiter starts with a brace.
+            if "{" in template:
+                device_templates.setdefault(gc_setting.pk, set()).add(template)
+            elif os.path.dirname(template):
+                sparse_paths.add(os.path.dirname(template))
+    if not device_templates:
+        return sparse_paths
+    for device in queryset.select_related(*INVENTORY_RELATED_FIELDS):
+        gc_setting = device_to_settings_map.get(device.id)
+        for template in device_templates.get(gc_setting.pk if gc_setting else None, ()):
+            directory = os.path.dirname(render_jinja_template(device, logger, template))
+            if directory:
+                sparse_paths.add(directory)
+    return sparse_paths
+
+
+def provision_golden_configs(queryset, attempt_date_field, now):
+    """Create the missing GoldenConfig objects of the devices in bulk, and set their last attempt date in one update.
+
+    The configurations are deferred, as only the one being generated by the play is set on the returned objects.
+
+    Args:
+        queryset (QuerySet): The Device queryset in scope of the play.
+        attempt_date_field (str): The `*_last_attempt_date` field of the play.
+        now (datetime): The date of the attempt.
+
+    Returns:
+        dict: The GoldenConfig object of each device id.
+    """
+    device_ids = set(queryset.values_list("pk", flat=True))
+    golden_configs = models.GoldenConfig.objects.filter(device__in=queryset.values("pk"))
+    existing_device_ids = set(golden_configs.values_list("device_id", flat=True))
+    missing_device_ids = device_ids - existing_device_ids
+    models.GoldenConfig.objects.bulk_create(
+        [models.GoldenConfig(device_id=device_id) for device_id in missing_device_ids],
+        ignore_conflicts=True,
+    )
+    if missing_device_ids:
+        # bulk_create does not send the post_save signal the GoldenConfig entries are otherwise tracked with.
+        invalidate_golden_config_in_sync()
+    golden_configs.update(**{attempt_date_field: now, "last_updated": now})
+    return {
+        golden_config.device_id: golden_config
+        for golden_config in golden_configs.defer("backup_config", "intended_config", "compliance_config")
+    }
 
 
 def get_json_config(config):
@@ -234,9 +570,15 @@ def add_message(combo_check, request):
         messages.warning(request, format_html(f"The Job(s) {list_to_string(multiple_messages)} are not yet enabled."))
 
 
-def dispatch_params(method, platform, logger):
-    """Utility method to map user defined platform network_driver to netutils named entity."""
-    custom_dispatcher = settings.PLUGINS_CONFIG[app_config.name].get("custom_dispatcher", {})
+def _resolve_dispatch_params(method, platform, custom_dispatcher, frameworks):
+    """Return the dispatcher parameters of a method and platform network_driver, or `None` if no framework is found.
+
+    Args:
+        method (str): The dispatcher method, e.g. `get_config`.
+        platform (str): The platform network_driver, e.g. `cisco_ios`.
+        custom_dispatcher (dict): The `custom_dispatcher` setting.
+        frameworks (dict): The framework setting of each key of `FRAMEWORK_METHODS` already read.
+    """
     params = {"method": method}
 
     # If there is a custom driver we can simply return that
@@ -249,21 +591,70 @@ def dispatch_params(method, platform, logger):
     #   2. method & all
     #   3. default and driver
     #   4. default & all
-    if FRAMEWORK_METHODS.get(method) and FRAMEWORK_METHODS[method]().get(platform):
-        params["framework"] = FRAMEWORK_METHODS[method]()[platform]
-    elif FRAMEWORK_METHODS.get(method) and FRAMEWORK_METHODS[method]().get("all"):
-        params["framework"] = FRAMEWORK_METHODS[method]()["all"]
-    elif utils.default_framework().get(platform):
-        params["framework"] = utils.default_framework()[platform]
-    elif utils.default_framework().get("all"):
-        params["framework"] = utils.default_framework()["all"]
-    if not params.get("framework"):
-        error_msg = "`E3022:` Could not find a valid framework (e.g. netmiko) given a method (e.g. merge_config) and a driver (e.g. cisco_ios)."
-        logger.error(error_msg)
-        raise NornirNautobotException(error_msg)
+    for framework in (frameworks.get(method) or {}, frameworks["default"]):
+        for key in (platform, "all"):
+            if framework.get(key):
+                params["framework"] = framework[key]
+                return params
+    return None
+
+
+def _raise_dispatch_params_error(logger):
+    """Log and raise the error of a method and platform without a framework."""
+    error_msg = "`E3022:` Could not find a valid framework (e.g. netmiko) given a method (e.g. merge_config) and a driver (e.g. cisco_ios)."
+    logger.error(error_msg)
+    raise NornirNautobotException(error_msg)
+
+
+def dispatch_params(method, platform, logger):
+    """Utility method to map user defined platform network_driver to netutils named entity."""
+    custom_dispatcher = settings.PLUGINS_CONFIG[app_config.name].get("custom_dispatcher", {})
+    frameworks = {"default": utils.default_framework()}
+    if method != "default" and FRAMEWORK_METHODS.get(method):
+        frameworks[method] = FRAMEWORK_METHODS[method]()
+    params = _resolve_dispatch_params(method, platform, custom_dispatcher, frameworks)
+    if params is None:
+        _raise_dispatch_params_error(logger)
     return params
 
 
+class DispatchParamsTable:
+    """The `dispatch_params` of every method and platform of a play, resolved once when the play starts.
+
+    The framework settings are read a single time, possibly from Constance, so getting the parameters of a device
+    afterwards is a lookup in an immutable mapping.
+    """
+
+    def __init__(self, methods, platforms):
+        """Resolve the dispatcher parameters.
+
+        Args:
+            methods (list): The dispatcher methods the play runs, e.g. `["get_config"]`.
+            platforms (iterable): The platform network_driver of the devices of the play.
+        """
+        custom_dispatcher = settings.PLUGINS_CONFIG[app_config.name].get("custom_dispatcher", {})
+        frameworks = {name: get_framework() for name, get_framework in FRAMEWORK_METHODS.items()}
+        table = {}
+        for method in methods:
+            for platform in set(platforms):
+                params = _resolve_dispatch_params(method, platform, custom_dispatcher, frameworks)
+                if params is not None:
+                    table[(method, platform)] = MappingProxyType(params)
+        self._table = MappingProxyType(table)
+
+    @classmethod
+    def for_queryset(cls, methods, queryset):
+        """Resolve the dispatcher parameters of the platforms of the devices of `queryset`."""
+        return cls(methods, queryset.order_by().values_list("platform__network_driver", flat=True).distinct())
+
+    def get(self, method, platform, logger):
+        """Return the dispatcher parameters of a method and platform, failing the same way as `dispatch_params`."""
+        params = self._table.get((method, platform))
+        if params is None:
+            _raise_dispatch_params_error(logger)
+        return params
+
+
 def get_xml_subtree_with_full_path(config_xml, match_config):
     """
     Extracts a subtree from an XML configuration based on a provided XPath expression and rebuilds the full path from the root.
@@ -290,11 +681,113 @@ def get_xml_subtree_with_full_path(config_xml, match_config):
     return etree.tostring(new_root, encoding="unicode", pretty_print=True)
 
 
-def update_dynamic_groups_cache():
-    """Update dynamic group cache for all golden config dynamic groups."""
-    if not settings.PLUGINS_CONFIG[app_config.name].get("_manual_dynamic_group_mgmt"):
-        for setting in models.GoldenConfigSetting.objects.all():
-            setting.dynamic_group.update_cached_members()
+def update_dynamic_groups_cache(force=False):
+    """Update dynamic group cache for all golden config dynamic groups.
+
+    When the `dynamic_group_cache_ttl` setting is enabled, the rebuild is skipped if the membership was rebuilt less than
+    `dynamic_group_cache_ttl` seconds ago, as it is then kept current by `update_dynamic_groups_cache_for_device`. The
+    settings assigned to the devices are refreshed, and the GoldenConfig entries checked again, when the membership
+    changed since the last update.
+
+    Args:
+        force (bool): Rebuild the membership even when it is current.
+    """
+    app_settings = settings.PLUGINS_CONFIG[app_config.name]
+    cache_ttl = app_settings["dynamic_group_cache_ttl"]
+    if force or not cache_ttl or not cache.get(DYNAMIC_GROUPS_REFRESHED_CACHE_KEY):
+        # The membership may also be managed outside of the app, and is then only checked for changes.
+        if not app_settings.get("_manual_dynamic_group_mgmt"):
+            for setting in models.GoldenConfigSetting.objects.select_related("dynamic_group"):
+                setting.dynamic_group.update_cached_members()
+        membership = get_dynamic_groups_membership_marker()
+        if cache.get(DYNAMIC_GROUPS_MEMBERSHIP_CACHE_KEY) != membership:
+            invalidate_golden_config_in_sync()
+            update_settings_assignments()
+            cache.set(DYNAMIC_GROUPS_MEMBERSHIP_CACHE_KEY, membership, None)
+        if cache_ttl:
+            cache.set(DYNAMIC_GROUPS_REFRESHED_CACHE_KEY, timezone.now(), cache_ttl)
+
+
+def get_dynamic_groups_membership_marker():
+    """Return a marker of the golden config dynamic groups membership, which changes when a member is added or removed.
+
+    The number and the latest creation date of the memberships are aggregated in a single query, rather than comparing
+    the members of each dynamic group.
+    """
+    return tuple(
+        StaticGroupAssociation.all_objects.filter(dynamic_group__golden_config_setting__isnull=False)
+        .aggregate(count=Count("pk"), latest=Max("created"))
+        .values()
+    )
+
+
+def invalidate_dynamic_groups_cache():
+    """Mark the golden config dynamic groups membership as stale, the next update rebuilds it."""
+    cache.delete(DYNAMIC_GROUPS_REFRESHED_CACHE_KEY)
+
+
+def is_golden_config_in_sync():
+    """Return whether the GoldenConfig entries are the devices of the GoldenConfigSetting dynamic groups.
+
+    When the `golden_config_sync_cache_ttl` setting is enabled, the result is kept in the Django cache for that many
+    seconds. It is set by the sync job, and invalidated by the changes of the GoldenConfig entries, of the devices and
+    of the dynamic groups, so the check only runs again after one of them.
+    """
+    cache_ttl = PLUGIN_CFG["golden_config_sync_cache_ttl"]
+    if cache_ttl:
+        in_sync = cache.get(GOLDEN_CONFIG_IN_SYNC_CACHE_KEY)
+        if in_sync is not None:
+            return in_sync
+    in_sync = models.GoldenConfig.get_dynamic_group_device_pks() == models.GoldenConfig.get_golden_config_device_ids()
+    if cache_ttl:
+        cache.set(GOLDEN_CONFIG_IN_SYNC_CACHE_KEY, in_sync, cache_ttl)
+    return in_sync
+
+
+def set_golden_config_in_sync():
+    """Record that the GoldenConfig entries were just synchronized with the GoldenConfigSetting dynamic groups."""
+    cache_ttl = PLUGIN_CFG["golden_config_sync_cache_ttl"]
+    if cache_ttl:
+        cache.set(GOLDEN_CONFIG_IN_SYNC_CACHE_KEY, True, cache_ttl)
+
+
+def invalidate_golden_config_in_sync():
+    """Mark whether the GoldenConfig entries are in sync as unknown, the next check computes it again."""
+    cache.delete(GOLDEN_CONFIG_IN_SYNC_CACHE_KEY)
+
+
+def update_dynamic_groups_cache_for_device(device, deleted=False):
+    """Update the golden config dynamic groups membership of a single device, without rebuilding the whole membership.
+
+    Only filter based dynamic groups can be updated for a single device. Static groups do not depend on the device, and
+    the membership is marked as stale when a set based dynamic group is used by a GoldenConfigSetting.
+
+    Args:
+        device (Device): The Device object that was changed.
+        deleted (bool): Whether the device was deleted.
+    """
+    app_settings = settings.PLUGINS_CONFIG[app_config.name]
+    if app_settings.get("_manual_dynamic_group_mgmt") or not app_settings["dynamic_group_cache_ttl"]:
+        return
+    for setting in models.GoldenConfigSetting.objects.select_related("dynamic_group"):
+        dynamic_group = setting.dynamic_group
+        if dynamic_group.group_type == DynamicGroupTypeChoices.TYPE_STATIC:
+            # The members of a static group are assigned explicitly, they do not depend on the device attributes.
+            continue
+        if dynamic_group.group_type != DynamicGroupTypeChoices.TYPE_DYNAMIC_FILTER:
+            invalidate_dynamic_groups_cache()
+            continue
+        is_member = dynamic_group.members.filter(pk=device.pk).exists()
+        # The private helpers are used as the public ones only accept static groups. `_add_members` expects devices
+        # that are not members yet, as the membership is unique per device.
+        # pylint: disable=protected-access
+        if not deleted and Device.objects.filter(pk=device.pk).filter(dynamic_group.generate_query()).exists():
+            if not is_member:
+                dynamic_group._add_members([device])
+        elif is_member:
+            dynamic_group._remove_members([device])
+    if not deleted:
+        update_settings_assignments(Device.objects.filter(pk=device.pk))
 
 
 def get_error_message(error_code, **kwargs):
@@ -0,0 +1,91 @@
+"""Track the inputs of the intended configuration of each device, to only render again the devices they changed for."""
+
+import hashlib
+import json
+import os
+import threading
+
+from jinja2 import TemplateSyntaxError, meta
+
+
+def git_blob_hash(content):
+    """Return the hash Git gives to a file with the `content` bytes."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content, usedforsecurity=False).hexdigest()
+
+
+class IntendedInputs:
+    """Compute a digest of everything the intended configuration of a device is rendered from.
+
+    The digest covers the SoT aggregation data of the device, the output path, and the blob hash of every template
+    file the main template includes, imports or extends, directly or not. The template closures are computed once per
+    repository and template, so an instance is meant to be used for a single play.
+    """
+
+    def __init__(self, jinja_env):
+        """Initialize the object.
+
+        Args:
+            jinja_env (SandboxedEnvironment): The environment the templates are rendered with, used to parse them.
+        """
+        self.jinja_env = jinja_env
+        self._closures = {}
+        self._lock = threading.Lock()
+
+    def _get_closure(self, jinja_root_path, template_name):
+        """Return the blob hash of each template file used to render `template_name`.
+
+        Returns:
+            dict: The blob hash of each template path, or `None` when the templates used can not be known in advance,
+                because a template is missing or the name of a referenced template is computed while rendering.
+        """
+        closure = {}
+        to_visit = [template_name]
+        while to_visit:
+            name = os.path.normpath(to_visit.pop())
+            if name in closure:
+                continue
+            path = os.path.join(jinja_root_path, name)
+            if name.startswith(os.pardir) or os.path.isabs(name) or not os.path.isfile(path):
+                return None
+            with open(path, "rb") as template_file:
+                content = template_file.read()
+            closure[name] = git_blob_hash(content)
+            try:
+                references = list(meta.find_referenced_templates(self.jinja_env.parse(content.decode())))
+            except (TemplateSyntaxError, UnicodeDecodeError):
+                return None
+            if None in references:
+                return None
+            to_visit.extend(references)
+        return closure
+
+    def get_closure(self, jinja_root_path, template_name):
+        """Return the blob hash of each template file used to render `template_name`, computed once per play."""
+        key = (jinja_root_path, template_name)
+        with self._lock:
+            if key not in self._closures:
+                self._closures[key] = self._get_closure(jinja_root_path, template_name)
+            return self._closures[key]
+
+    def get_digest(self, jinja_root_path, template_name, output_file_location, device_data):
+        """Return the digest of the inputs of the intended configuration of a device.
+
+        Args:
+            jinja_root_path (str): The path of the Jinja repository.
+            template_name (str): The path of the main template, relative to `jinja_root_path`.
+            output_file_location (str): The path the intended configuration is written to.
+            device_data (dict): The SoT aggregation data of the device.
+
+        Returns:
+            str: The digest, or an empty string when the templates used can not be known in advance.
+        """
+        closure = self.get_closure(jinja_root_path, template_name)
+        if closure is None:
+            return ""
+        inputs = {
+            "data": device_data,
+            "output_file_location": output_file_location,
+            "template": os.path.normpath(template_name),
+            "templates": closure,
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
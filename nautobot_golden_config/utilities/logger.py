@@ -1,8 +1,21 @@
 """Customer logger to support writing to console and db."""
 
 import logging
+import queue
+import threading
+import time
 from typing import Any
 
+from django.db import connections
+from django.utils import timezone
+from nautobot.core.utils.logging import sanitize
+from nautobot.extras.constants import (
+    JOB_LOG_MAX_ABSOLUTE_URL_LENGTH,
+    JOB_LOG_MAX_GROUPING_LENGTH,
+    JOB_LOG_MAX_LOG_OBJECT_LENGTH,
+)
+from nautobot.extras.models import JobLogEntry
+
 LOGGER = logging.getLogger("NORNIR_LOGGER")
 
 handler = logging.StreamHandler()
@@ -10,21 +23,123 @@ handler.setLevel(logging.NOTSET)
 LOGGER.addHandler(handler)
 LOGGER_ADAPTER = logging.LoggerAdapter(LOGGER, extra={})
 
+# Database Nautobot writes job logs to, outside of the job transaction so they are visible while the job runs, unless
+# the `use_job_logs_db` attribute of the JobResult is False.
+JOB_LOGS_DATABASE = "job_logs"
+
 
 class NornirLogger:
-    """Logger that handles same signature as standard Python Library logging but also write to db."""
+    """Logger that handles same signature as standard Python Library logging but also write to db.
+
+    The entries are buffered and written to the database in batches by a background thread, the logger must be closed,
+    or used as a context manager, for the remaining entries to be written.
+    """
+
+    batch_size = 500
+    flush_interval = 1.0
+    max_buffered_entries = 10000
 
     def __init__(self, job_result, log_level: int):
         """Initialize the object."""
         self.job_result = job_result
+        self.log_level = log_level
         LOGGER.setLevel(log_level)
+        # The queue is bounded, worker threads wait for the flusher when it is full.
+        self._queue = queue.Queue(maxsize=self.max_buffered_entries)
+        self._flusher = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._database = JOB_LOGS_DATABASE if getattr(job_result, "use_job_logs_db", True) else "default"
+
+    def __enter__(self):
+        """Return the logger to be used in a with statement."""
+        return self
+
+    def __exit__(self, *args):
+        """Write the remaining entries when leaving the with statement."""
+        self.close()
+
+    def close(self):
+        """Write the remaining entries and stop the background flusher, later entries are written directly."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            flusher = self._flusher
+        if flusher is not None:
+            self._queue.put(None)
+            flusher.join()
+
+    def _start_flusher(self):
+        """Start the background flusher on the first entry, return False once the logger is closed."""
+        with self._lock:
+            if self._closed:
+                return False
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_worker, name="NornirLoggerFlusher", daemon=True)
+                self._flusher.start()
+            return True
+
+    def _flush_worker(self):
+        """Write the buffered entries in batches until the logger is closed."""
+        try:
+            stopping = False
+            while not stopping:
+                entries = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(entries) < self.batch_size:
+                    try:
+                        entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if entry is None:
+                        stopping = True
+                        break
+                    entries.append(entry)
+                if entries:
+                    self._write(entries, self._database)
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def _write(entries, using):
+        """Write a batch of entries to the `using` database."""
+        try:
+            JobLogEntry.objects.using(using).bulk_create(entries)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            LOGGER.error("Unable to write %d job log entries: %s", len(entries), error)
+
+    def _build_entry(self, attr: str, message: str, obj: Any, grouping: str):
+        """Build a JobLogEntry the same way as `JobResult.log`, without saving it."""
+        entry = JobLogEntry(
+            job_result=self.job_result,
+            log_level=attr,
+            grouping=grouping[:JOB_LOG_MAX_GROUPING_LENGTH],
+            message=sanitize(str(message)),
+            created=timezone.now(),
+            log_object="",
+            absolute_url="",
+        )
+        if obj:
+            if hasattr(obj, "get_absolute_url"):
+                try:
+                    entry.absolute_url = obj.get_absolute_url()[:JOB_LOG_MAX_ABSOLUTE_URL_LENGTH]
+                except (AttributeError, NotImplementedError):
+                    pass
+            entry.log_object = str(obj)[:JOB_LOG_MAX_LOG_OBJECT_LENGTH]
+        return entry
 
     def _logging_helper(self, attr: str, message: str, extra: Any = None):
         """Logger helper to set both db and console logs at once."""
+        if logging.getLevelName(attr.upper()) < self.log_level:
+            return
         if not extra:
             extra = {}
         getattr(LOGGER_ADAPTER, attr)(message, extra=extra)
-        self.job_result.log(message, level_choice=attr, obj=extra.get("object"), grouping=extra.get("grouping", ""))
+        if self._start_flusher():
+            self._queue.put(self._build_entry(attr, message, extra.get("object"), extra.get("grouping", "")))
+        else:
+            self.job_result.log(message, level_choice=attr, obj=extra.get("object"), grouping=extra.get("grouping", ""))
 
     def debug(self, message: str, extra: Any = None):
         """Match standard Python Library debug signature."""
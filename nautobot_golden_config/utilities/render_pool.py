@@ -0,0 +1,105 @@
+"""Render the intended configurations in a pool of processes, away from the GIL of the Nornir worker threads."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import nautobot
+from jinja2 import FileSystemLoader
+
+from nautobot_golden_config.utilities.helper import get_django_env
+
+# The environment of each Jinja repository, kept for the life of a render process so the compiled templates are reused.
+_ENVIRONMENTS = {}
+
+
+class RenderHost(dict):
+    """Picklable stand-in of a Nornir host, given to the templates rendered in a render process as `host`.
+
+    As the Nornir host, it is a mapping of the data of the host and of the inventory defaults, and has the `name`,
+    `hostname`, `platform` and `data` attributes. It holds no credentials and no connection.
+    """
+
+    def __init__(self, variables, name, hostname=None, platform=None, data=None):
+        """Initialize the object.
+
+        Args:
+            variables (dict): The data of the host along with the inventory defaults, as given by `Host.items()`.
+            name (str): The name of the host.
+            hostname (str): The hostname of the host.
+            platform (str): The platform of the host.
+            data (dict): The data of the host only.
+        """
+        super().__init__(variables)
+        self.name = name
+        self.hostname = hostname
+        self.platform = platform
+        self.data = data if data is not None else dict(variables)
+
+    def __str__(self):
+        """Return the name of the host, as the Nornir host does."""
+        return self.name
+
+    @classmethod
+    def from_host(cls, host):
+        """Return the stand-in of a Nornir host."""
+        return cls(dict(host.items()), host.name, host.hostname, host.platform, dict(host.data))
+
+
+def render_template(jinja_root_path, jinja_template, host):
+    """Render a template of a Jinja repository, reusing the environment of the repository.
+
+    The template gets the `host` and each of its variables, as with the `generate_config` method of the dispatcher.
+
+    Args:
+        jinja_root_path (str): The path of the Jinja repository.
+        jinja_template (str): The path of the template, relative to `jinja_root_path`.
+        host (RenderHost): The host to render the template for.
+
+    Returns:
+        str: The rendered template.
+    """
+    jinja_env = _ENVIRONMENTS.get(jinja_root_path)
+    if jinja_env is None:
+        jinja_env = get_django_env()
+        jinja_env.loader = FileSystemLoader(jinja_root_path)
+        _ENVIRONMENTS[jinja_root_path] = jinja_env
+    return jinja_env.get_template(jinja_template).render(host=host, **host)
+
+
+class IntendedRenderPool:
+    """Pool of processes rendering the intended configurations, to be used as a context manager.
+
+    The processes are spawned rather than forked, so they never share the database connections or the locks of the
+    threads of the job. Each process sets up Nautobot from the `NAUTOBOT_CONFIG` configuration before loading this
+    module, so the Jinja filters of Django and of the apps are available, and is started on the first render it is
+    needed for.
+    """
+
+    def __init__(self, max_workers):
+        """Initialize the object.
+
+        Args:
+            max_workers (int): The number of render processes.
+        """
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=nautobot.setup,
+        )
+
+    def __enter__(self):
+        """Return the pool to be used in a with statement."""
+        return self
+
+    def __exit__(self, *args):
+        """Stop the render processes when leaving the with statement."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def render(self, jinja_root_path, jinja_template, host):
+        """Render a template for a Nornir host in one of the processes, waiting for the result.
+
+        The exceptions raised while rendering, such as the Jinja errors, are raised again in the calling thread.
+        """
+        return self._executor.submit(
+            render_template, jinja_root_path, jinja_template, RenderHost.from_host(host)
+        ).result()
@@ -8,14 +8,13 @@ import yaml
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, ExpressionWrapper, FloatField, Max, Q, Sum, Value
+from django.db.models import Count, ExpressionWrapper, FloatField, Q, Sum, Value
 from django.db.models.functions import Coalesce, NullIf
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.timezone import make_aware
 from django.views.generic import TemplateView, View
-from django_pivot.pivot import pivot
 from django_tables2 import RequestConfig
 from nautobot.apps import views
 from nautobot.apps.ui import (
@@ -36,7 +35,13 @@ from nautobot_golden_config.api import serializers
 from nautobot_golden_config.utilities import constant
 from nautobot_golden_config.utilities.config_postprocessing import get_config_postprocessing
 from nautobot_golden_config.utilities.graphql import graph_ql_query
-from nautobot_golden_config.utilities.helper import add_message, calculate_aggr_percentage, get_device_to_settings_map
+from nautobot_golden_config.utilities.helper import (
+    add_message,
+    calculate_aggr_percentage,
+    get_compliance_matrix_queryset,
+    get_device_to_settings_map,
+    is_golden_config_in_sync,
+)
 
 # TODO: Future #4512
 PERMISSIONS_ACTION_MAP.update(
@@ -92,18 +97,15 @@ class GoldenConfigUIViewSet(  # pylint: disable=abstract-method
         if self.filter_params:
             return queryset
 
-        sync_job = Job.objects.get(
-            module_name="nautobot_golden_config.jobs", job_class_name="SyncGoldenConfigWithDynamicGroups"
-        )
-        sync_job_url = f"<a href='{reverse('extras:job_run', kwargs={'pk': sync_job.pk})}'>{sync_job.name}</a>"
-        out_of_sync_message = format_html(
-            "The expected devices and actual devices here are not in sync. "
-            f"Running the job {sync_job_url} will put it back in sync."
-        )
-
-        gc_dynamic_group_device_pks = models.GoldenConfig.get_dynamic_group_device_pks()
-        gc_device_pks = models.GoldenConfig.get_golden_config_device_ids()
-        if gc_dynamic_group_device_pks != gc_device_pks:
+        if not is_golden_config_in_sync():
+            sync_job = Job.objects.get(
+                module_name="nautobot_golden_config.jobs", job_class_name="SyncGoldenConfigWithDynamicGroups"
+            )
+            sync_job_url = f"<a href='{reverse('extras:job_run', kwargs={'pk': sync_job.pk})}'>{sync_job.name}</a>"
+            out_of_sync_message = format_html(
+                "The expected devices and actual devices here are not in sync. "
+                f"Running the job {sync_job_url} will put it back in sync."
+            )
             messages.warning(self.request, message=out_of_sync_message)
 
         return queryset
@@ -351,16 +353,17 @@ class ConfigComplianceUIViewSet(  # pylint: disable=abstract-method
         return context
 
     def alter_queryset(self, request):
-        """Build actual runtime queryset as the build time queryset of table `pivoted`."""
+        """Keep the restricted ConfigCompliance queryset, also used to find the entries to delete."""
         # Super because alter_queryset() calls get_queryset(), which is what calls queryset.restrict()
         self.queryset = super().alter_queryset(request)
-        return pivot(
-            self.queryset,
-            ["device", "device__name"],
-            "rule__feature__slug",
-            "compliance_int",
-            aggregation=Max,
-        )
+        return self.queryset
+
+    def filter_queryset(self, queryset):
+        """Filter the ConfigCompliance entries, then read the compliance of their devices from the compliance matrix."""
+        queryset = super().filter_queryset(queryset)
+        if self.action != "list":
+            return queryset
+        return get_compliance_matrix_queryset(queryset)
 
     def perform_bulk_destroy(self, request, **kwargs):
         """Overwrite perform_bulk_destroy to handle special use case in which the UI shows devices but want to delete ConfigCompliance objects."""